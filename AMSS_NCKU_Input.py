@@ -150,6 +150,7 @@ GW_M_max        = 4                      ## maximal M number in gravitational wa
 Detector_Number = 12                     ## number of dector
 Detector_Rmin   = 50.0                   ## nearest dector distance
 Detector_Rmax   = 160.0                  ## farest dector distance
+Extrapolation_Order = 2                  ## order in 1/R of the extrapolation of psi4 to infinity (needs order+1 detectors)
 
 #################################################
 
@@ -166,6 +167,19 @@ AHF_Dump_Time  = 20.0
 #################################################
 
 
+#################################################
+
+## Setting the plotting of the binary output
+
+Plot_Workers       = 1                   ## processes rendering the binary data plots (1: serial, None: all cores)
+Plot_Worker_Memory = 0                   ## memory cap of each plotting process in MB (0: no cap)
+Plot_Fast_Mode     = "no"                ## "yes": reuse the figures between dumps and write PNG instead of PDF
+Plot_DPI           = 150                 ## resolution of the PNG figures in fast mode
+Plot_Surface       = "no"                ## fast mode: also draw the 3D surface plot ("yes" or "no")
+
+#################################################
+
+
 #################################################
 
 ## Other parameters (testing)
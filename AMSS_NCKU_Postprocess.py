@@ -0,0 +1,252 @@
+
+##################################################################
+##
+## AMSS-NCKU post-processing of an existing run directory
+##
+## Runs the analysis and plotting stages of AMSS_NCKU_Program.py on a
+## finished (or running) simulation without touching its output,
+## copying the sources or recompiling ABE. The parameters are read from
+## the copy of AMSS_NCKU_Input.py inside the run directory.
+##
+## Usage:
+##     python AMSS_NCKU_Postprocess.py GW150914                  (all plotting stages)
+##     python AMSS_NCKU_Postprocess.py GW150914 --stages info    (quick summary, no plotting)
+##     python AMSS_NCKU_Postprocess.py GW150914 --stages orbit psi4 --figure-dir figure_new
+##     python AMSS_NCKU_Postprocess.py GW150914 --stages movie --movie-variables chi trK --movie-level 2
+##
+## matplotlib and scipy are only imported by the stages that plot.
+##
+##################################################################
+
+import os
+import sys
+import shutil
+import time
+import argparse
+import importlib.util
+
+
+##################################################################
+
+## Stages in the order AMSS_NCKU_Program.py runs them
+
+POSTPROCESS_STAGES = ( "info", "orbit", "psi4", "strain", "extrapolate", "fluxes", "adm", "constraint", "binary", "movie" )
+
+## Stages run when none are selected
+
+DEFAULT_STAGES = ( "orbit", "psi4", "strain", "extrapolate", "fluxes", "adm", "constraint", "binary" )
+
+##################################################################
+
+
+
+##################################################################
+
+## load_run_input(run_directory)
+## Import the AMSS_NCKU_Input.py of a run directory and register it as the
+## AMSS_NCKU_Input module, so that the plotting modules imported afterwards
+## use the parameters of that run.
+
+def load_run_input( run_directory ):
+
+    filename = os.path.join( run_directory, "AMSS_NCKU_Input.py" )
+    if not os.path.exists( filename ):
+        raise FileNotFoundError( f"{run_directory} has no AMSS_NCKU_Input.py; is it an AMSS-NCKU run directory?" )
+
+    spec   = importlib.util.spec_from_file_location( "AMSS_NCKU_Input", filename )
+    module = importlib.util.module_from_spec( spec )
+    sys.modules["AMSS_NCKU_Input"] = module
+    spec.loader.exec_module( module )
+
+    return module
+
+##################################################################
+
+
+
+##################################################################
+
+## Directories of a run (same layout as AMSS_NCKU_Program.py)
+
+def run_directories( run_directory, input_data, figure_directory=None ):
+
+    output_directory         = os.path.join( run_directory, "AMSS_NCKU_output" )
+    binary_results_directory = os.path.join( output_directory, input_data.Output_directory )
+    if figure_directory is None:
+        figure_directory = os.path.join( run_directory, "figure" )
+
+    return binary_results_directory, figure_directory
+
+##################################################################
+
+
+
+##################################################################
+
+## Stage "info": parameters, monitor files and dumps of the run (no plotting modules)
+
+def print_run_summary( input_data, run_data ):
+
+    import monitor_data
+    import binary_data_archive
+
+    binary_results_directory = run_data.directory
+
+    print( " Equation class  =", input_data.Equation_Class )
+    print( " Grid            =", input_data.basic_grid_set, input_data.grid_center_set, ",", input_data.grid_level, "levels" )
+    print( " Symmetry        =", input_data.Symmetry )
+    print( " Detectors       =", input_data.Detector_Number, "from r =", input_data.Detector_Rmin, "to", input_data.Detector_Rmax )
+    print( " Evolution time  =", input_data.Start_Evolution_Time, "to", input_data.Final_Evolution_Time )
+    print()
+
+    for name in ( "bssn_BH.dat", "bssn_psi4.dat", "bssn_ADMQs.dat", "bssn_constraint.dat" ):
+        if not monitor_data.find_monitor_segments( binary_results_directory, name ):
+            print( " " + name.ljust(20), "missing" )
+            continue
+        series = run_data.series( name )
+        times  = series.time
+        if len(times) == 0:
+            print( " " + name.ljust(20), "empty" )
+        else:
+            print( " " + name.ljust(20), len(times), "rows, t =", times[0], "to", times[-1] )
+    print()
+
+    if os.path.isdir( binary_results_directory ):
+        entries  = binary_data_archive.list_binary_data( binary_results_directory )
+        archived = sum( binary_data_archive.ARCHIVE_MEMBER_SEPARATOR in entry.filename for entry in entries )
+        print( " Binary dumps    =", len(entries) - archived, "files" )
+        if archived:
+            print( " Archived dumps  =", archived, "in", len( binary_data_archive.find_archives( binary_results_directory ) ), "archives" )
+        if entries:
+            print( " Dump variables  =", ", ".join( sorted( { str(entry.variable) for entry in entries } ) ) )
+            print( " Dump times      =", min( entry.time for entry in entries ), "to", max( entry.time for entry in entries ) )
+
+    return
+
+##################################################################
+
+
+
+##################################################################
+
+## run_stages(run_directory, stages, figure_directory=None, workers=None, force=False, movie_variables=("chi",), movie_level=0)
+## Run the selected post-processing stages on a run directory.
+## The movie stage writes <figure_directory>/movie/<variable>_Lev<level>.mp4 (a PNG directory without ffmpeg).
+
+def run_stages( run_directory, stages=DEFAULT_STAGES, figure_directory=None, workers=None, force=False,
+                movie_variables=("chi",), movie_level=0 ):
+
+    input_data = load_run_input( run_directory )
+    binary_results_directory, figure_directory = run_directories( run_directory, input_data, figure_directory )
+
+    if not os.path.isdir( binary_results_directory ):
+        raise FileNotFoundError( f"no simulation output in {binary_results_directory}" )
+    if any( stage != "info" for stage in stages ):
+        os.makedirs( figure_directory, exist_ok=True )
+
+    ## monitor files are loaded once and shared by all stages
+    import monitor_data
+    run_data = monitor_data.RunData( binary_results_directory )
+
+    for stage in POSTPROCESS_STAGES:
+
+        if stage not in stages:
+            continue
+
+        start_time = time.time()
+        print(                                )
+        print( " Post-processing stage:", stage )
+        print(                                )
+
+        if stage == "info":
+            print_run_summary( input_data, run_data )
+
+        elif stage == "orbit":
+            import plot_xiaoqu
+            plot_xiaoqu.generate_puncture_orbit_plot(    run_data, figure_directory )
+            plot_xiaoqu.generate_puncture_orbit_plot3D(  run_data, figure_directory )
+            plot_xiaoqu.generate_puncture_distence_plot( run_data, figure_directory )
+            import orbit_analysis
+            orbit_analysis.write_orbit_summary( run_data, run_directory, input_data.puncture_number )
+
+        elif stage == "psi4":
+            import plot_xiaoqu
+            for i in range(input_data.Detector_Number):
+                plot_xiaoqu.generate_gravitational_wave_psi4_plot( run_data, figure_directory, i )
+
+        elif stage == "strain":
+            import plot_GW_strain_amplitude_xiaoqu
+            for i in range(input_data.Detector_Number):
+                plot_GW_strain_amplitude_xiaoqu.generate_gravitational_wave_amplitude_plot( run_data, figure_directory, i )
+
+        elif stage == "extrapolate":
+            import plot_GW_strain_amplitude_xiaoqu
+            plot_GW_strain_amplitude_xiaoqu.generate_extrapolated_waveform_plot( run_data, figure_directory )
+
+        elif stage == "fluxes":
+            import plot_GW_strain_amplitude_xiaoqu
+            plot_GW_strain_amplitude_xiaoqu.generate_radiated_flux_plot( run_data, figure_directory, run_directory )
+
+        elif stage == "adm":
+            import plot_xiaoqu
+            for i in range(input_data.Detector_Number):
+                plot_xiaoqu.generate_ADMmass_plot( run_data, figure_directory, i )
+
+        elif stage == "constraint":
+            import plot_xiaoqu
+            for i in range(input_data.grid_level):
+                plot_xiaoqu.generate_constraint_check_plot( run_data, figure_directory, i )
+
+        elif stage == "binary":
+            import plot_xiaoqu
+            plot_xiaoqu.generate_binary_data_plot( binary_results_directory, figure_directory, workers, force=force )
+
+        elif stage == "movie":
+            import binary_data_movie
+            movie_directory = os.path.join( figure_directory, "movie" )
+            os.makedirs( movie_directory, exist_ok=True )
+            suffix = ".mp4" if shutil.which( "ffmpeg" ) else ""
+            for variable in movie_variables:
+                destination = os.path.join( movie_directory, f"{variable}_Lev{movie_level:02d}" + suffix )
+                binary_data_movie.generate_movie( binary_results_directory, destination, variable, movie_level,
+                                                  workers=workers or getattr(input_data, "Plot_Workers", 1) )
+
+        print( f" Stage {stage} took {time.time() - start_time:.2f} seconds" )
+
+    return
+
+##################################################################
+
+
+
+##################################################################
+
+## Command line
+
+def main( argv=None ):
+
+    parser = argparse.ArgumentParser( description="Post-process an existing AMSS-NCKU run directory" )
+    parser.add_argument( "run_directory", help="run directory (File_directory of the run, containing AMSS_NCKU_Input.py)" )
+    parser.add_argument( "--stages", nargs="+", choices=POSTPROCESS_STAGES, default=list(DEFAULT_STAGES),
+                         help="stages to run (default: all plotting stages)" )
+    parser.add_argument( "--figure-dir", default=None, help="figure directory (default: <run_directory>/figure)" )
+    parser.add_argument( "--workers", type=int, default=None, help="processes for the binary data plots (default: Plot_Workers)" )
+    parser.add_argument( "--force", action="store_true", help="re-render binary data plots even if they are up to date" )
+    parser.add_argument( "--movie-variables", nargs="+", default=["chi"], help="dumped variables animated by the movie stage" )
+    parser.add_argument( "--movie-level", type=int, default=0, help="grid level animated by the movie stage" )
+    args = parser.parse_args( argv )
+
+    try:
+        run_stages( args.run_directory, args.stages, args.figure_dir, args.workers, args.force,
+                    args.movie_variables, args.movie_level )
+    except FileNotFoundError as error:
+        print( " Error:", error )
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit( main() )
+
+##################################################################
@@ -424,26 +424,40 @@ print(
 
 import plot_xiaoqu
 import plot_GW_strain_amplitude_xiaoqu
+import monitor_data
+
+## Monitor files of the run, each loaded once and shared by all plots below
+run_data = monitor_data.RunData( binary_results_directory )
 
 ## Plot black hole trajectory
-plot_xiaoqu.generate_puncture_orbit_plot(   binary_results_directory, figure_directory )
-plot_xiaoqu.generate_puncture_orbit_plot3D( binary_results_directory, figure_directory )
+plot_xiaoqu.generate_puncture_orbit_plot(   run_data, figure_directory )
+plot_xiaoqu.generate_puncture_orbit_plot3D( run_data, figure_directory )
 
 ## Plot black hole separation vs. time
-plot_xiaoqu.generate_puncture_distence_plot( binary_results_directory, figure_directory )
+plot_xiaoqu.generate_puncture_distence_plot( run_data, figure_directory )
+
+## Orbit summary (separations, merger time, eccentricity) in the run summary file
+import orbit_analysis
+orbit_analysis.write_orbit_summary( run_data, File_directory, input_data.puncture_number )
 
 ## Plot gravitational waveforms (psi4 and strain amplitude)
 for i in range(input_data.Detector_Number):
-    plot_xiaoqu.generate_gravitational_wave_psi4_plot( binary_results_directory, figure_directory, i )
-    plot_GW_strain_amplitude_xiaoqu.generate_gravitational_wave_amplitude_plot( binary_results_directory, figure_directory, i )
+    plot_xiaoqu.generate_gravitational_wave_psi4_plot( run_data, figure_directory, i )
+    plot_GW_strain_amplitude_xiaoqu.generate_gravitational_wave_amplitude_plot( run_data, figure_directory, i )
+
+## Extrapolate psi4 of all detectors to null infinity
+plot_GW_strain_amplitude_xiaoqu.generate_extrapolated_waveform_plot( run_data, figure_directory )
+
+## Radiated energy, momentum and kick, written to the run summary
+plot_GW_strain_amplitude_xiaoqu.generate_radiated_flux_plot( run_data, figure_directory, File_directory )
 
 ## Plot ADM mass evolution
 for i in range(input_data.Detector_Number):
-    plot_xiaoqu.generate_ADMmass_plot( binary_results_directory, figure_directory, i )
+    plot_xiaoqu.generate_ADMmass_plot( run_data, figure_directory, i )
 
 ## Plot Hamiltonian constraint violation over time
 for i in range(input_data.grid_level):
-    plot_xiaoqu.generate_constraint_check_plot( binary_results_directory, figure_directory, i )
+    plot_xiaoqu.generate_constraint_check_plot( run_data, figure_directory, i )
 
 ## Plot stored binary data
 plot_xiaoqu.generate_binary_data_plot( binary_results_directory, figure_directory )
@@ -0,0 +1,22 @@
+
+#ifndef Ansorg_sidecar_H
+#define Ansorg_sidecar_H
+
+/* binary sidecar of the TwoPunctures spectral output (Ansorg.psid.bin)
+
+   written next to the text file by TwoPunctures::Save and read by Ansorg
+   (instead of the text file, unless the text file is newer) and by
+   ansorg_reader.py
+
+   layout (native byte order, no padding):
+     char   magic[8]                  "AMSSPSID"
+     int    version, n1, n2, n3, nheader
+     char   header[nheader]           lines of the text file up to and including "data n1 n2 n3"
+     double data[n1*n2*n3]            the values of the text file, in the same order
+*/
+
+#define ANSORG_SIDECAR_MAGIC "AMSSPSID"
+#define ANSORG_SIDECAR_VERSION 1
+#define ANSORG_SIDECAR_SUFFIX ".bin"
+
+#endif /* Ansorg_sidecar_H */
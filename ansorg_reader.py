@@ -0,0 +1,220 @@
+
+#################################################
+##
+## Reader for the spectral initial data of TwoPunctureABE (Ansorg.psid)
+##
+## Ansorg.psid is a text file: a header of "#..." comment lines and
+## "name = value" lines (bhmass1, bhx1, ...), a line "data n1 n2 n3" and then
+## n1*n2*n3 values, one per line. TwoPunctures::Save also writes the same
+## content as a binary sidecar Ansorg.psid.bin (AMSS_NCKU_source/Ansorg_sidecar.h),
+## native byte order, no padding:
+##
+##   char   magic[8]                  "AMSSPSID"
+##   int    version, n1, n2, n3, nheader
+##   char   header[nheader]           text lines up to and including "data n1 n2 n3"
+##   double data[n1*n2*n3]
+##
+## load_ansorg() reads the sidecar when it is not older than the text file
+## and otherwise parses the text once and writes the sidecar, so the text is
+## parsed at most once per initial-data solve (the ABE executable prefers
+## the sidecar in the same way).
+##
+#################################################
+
+import os
+import numpy
+
+
+#########################################################################################
+
+## Sidecar file name suffix, magic and version (as in Ansorg_sidecar.h)
+
+ANSORG_SIDECAR_SUFFIX  = ".bin"
+ANSORG_SIDECAR_MAGIC   = b"AMSSPSID"
+ANSORG_SIDECAR_VERSION = 1
+
+## Fixed part of the sidecar (28 bytes)
+
+ANSORG_SIDECAR_DTYPE = numpy.dtype( [ ("magic",   "S8"                  ),
+                                      ("version", numpy.int32           ),
+                                      ("shape",   numpy.int32, (3,)     ),
+                                      ("nheader", numpy.int32           ) ] )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## AnsorgData(header, shape, data)
+## Contents of an Ansorg.psid file.
+##
+## Attributes:
+##  - header:     header text (lines up to and including "data n1 n2 n3")
+##  - shape:      (n1, n2, n3) = (nA, nB, nphi)
+##  - data:       the n1*n2*n3 spectral values in file order (float64)
+##  - parameters: the "name = value" numbers of the header (bhmass1, bhx1, ...)
+
+class AnsorgData:
+
+    def __init__( self, header, shape, data ):
+
+        self.header     = header
+        self.shape      = tuple( int(n) for n in shape )
+        self.data       = data
+        self.parameters = header_parameters( header )
+
+    @property
+    def size( self ):
+        return self.shape[0] * self.shape[1] * self.shape[2]
+
+## header_parameters(header)
+## Numeric "name = value" lines of a header as a dictionary.
+
+def header_parameters( header ):
+
+    parameters = {}
+    for line in header.splitlines():
+        if line.startswith( "#" ) or "=" not in line:
+            continue
+        name, value = line.split( "=", 1 )
+        try:
+            parameters[name.strip()] = float( value )
+        except ValueError:
+            continue
+    return parameters
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## split_ansorg_text(text)
+## Split the text of an Ansorg.psid file into (header, shape, body): header up to
+## and including the "data n1 n2 n3" line, body the text of the values after it.
+## shape and body are None if there is no data line.
+
+def split_ansorg_text( text ):
+
+    if text.startswith( "data " ):
+        position = 0
+    else:
+        position = text.find( "\ndata " ) + 1
+        if position == 0:
+            return text, None, None
+
+    end   = text.find( "\n", position )
+    end   = len(text) if end < 0 else end + 1
+    shape = tuple( int(n) for n in text[position+5:end].split()[:3] )
+    return text[:end], shape, text[end:]
+
+## parse_ansorg_text(text)
+## AnsorgData from the text of an Ansorg.psid file (values parsed by numpy in one pass).
+
+def parse_ansorg_text( text, filename="Ansorg.psid" ):
+
+    header, shape, body = split_ansorg_text( text )
+    if shape is None or len(shape) != 3:
+        raise ValueError( f"{filename}: no 'data n1 n2 n3' line" )
+
+    data = numpy.array( body.split(), dtype=numpy.float64 )
+    if len(data) != shape[0] * shape[1] * shape[2]:
+        raise ValueError( f"{filename}: {len(data)} values for data {shape[0]} {shape[1]} {shape[2]}" )
+
+    return AnsorgData( header, shape, data )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## sidecar_filename(filename)
+## Name of the binary sidecar of an Ansorg.psid file.
+
+def sidecar_filename( filename ):
+    return filename + ANSORG_SIDECAR_SUFFIX
+
+## write_ansorg_sidecar(ansorg, filename)
+## Write AnsorgData as the binary sidecar filename (replaced atomically).
+
+def write_ansorg_sidecar( ansorg, filename ):
+
+    header_bytes      = ansorg.header.encode( "utf-8" )
+    record            = numpy.zeros( 1, dtype=ANSORG_SIDECAR_DTYPE )
+    record["magic"]   = ANSORG_SIDECAR_MAGIC
+    record["version"] = ANSORG_SIDECAR_VERSION
+    record["shape"]   = ansorg.shape
+    record["nheader"] = len(header_bytes)
+
+    temporary = filename + ".tmp"
+    with open( temporary, "wb" ) as file:
+        file.write( record.tobytes() )
+        file.write( header_bytes )
+        file.write( numpy.ascontiguousarray( ansorg.data, dtype=numpy.float64 ).tobytes() )
+    os.replace( temporary, filename )
+
+## read_ansorg_sidecar(filename)
+## AnsorgData from a binary sidecar; ValueError if it is not a valid sidecar.
+
+def read_ansorg_sidecar( filename ):
+
+    with open( filename, "rb" ) as file:
+        record = numpy.fromfile( file, dtype=ANSORG_SIDECAR_DTYPE, count=1 )
+        if len(record) != 1 or record["magic"][0] != ANSORG_SIDECAR_MAGIC:
+            raise ValueError( f"{filename}: not an Ansorg sidecar" )
+        if record["version"][0] != ANSORG_SIDECAR_VERSION:
+            raise ValueError( f"{filename}: sidecar version {record['version'][0]}, expected {ANSORG_SIDECAR_VERSION}" )
+
+        shape  = tuple( int(n) for n in record["shape"][0] )
+        header = file.read( int(record["nheader"][0]) ).decode( "utf-8" )
+        size   = shape[0] * shape[1] * shape[2]
+        data   = numpy.fromfile( file, dtype=numpy.float64, count=size )
+        if len(data) != size or file.read( 1 ):
+            raise ValueError( f"{filename}: expected {size} values for data {shape[0]} {shape[1]} {shape[2]}" )
+
+    return AnsorgData( header, shape, data )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## sidecar_is_current(filename)
+## True if the sidecar of filename exists and is not older than the text file.
+
+def sidecar_is_current( filename ):
+
+    sidecar = sidecar_filename( filename )
+    if not os.path.exists( sidecar ):
+        return False
+    if not os.path.exists( filename ):
+        return True
+    return os.stat( sidecar ).st_mtime_ns >= os.stat( filename ).st_mtime_ns
+
+## load_ansorg(filename="Ansorg.psid", write_sidecar=True)
+## AnsorgData of an Ansorg.psid file, from its sidecar when that is current;
+## otherwise the text is parsed and (with write_sidecar) the sidecar written.
+
+def load_ansorg( filename="Ansorg.psid", write_sidecar=True ):
+
+    if sidecar_is_current( filename ):
+        try:
+            return read_ansorg_sidecar( sidecar_filename( filename ) )
+        except ValueError:
+            pass
+
+    with open( filename, encoding="utf-8" ) as file:
+        ansorg = parse_ansorg_text( file.read(), filename )
+
+    if write_sidecar:
+        try:
+            write_ansorg_sidecar( ansorg, sidecar_filename( filename ) )
+        except OSError:
+            pass
+
+    return ansorg
+
+#########################################################################################
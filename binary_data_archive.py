@@ -0,0 +1,333 @@
+
+#################################################
+##
+## Archive of a run's binary dump series (*.bin, Parallel::writefile format)
+## in one chunked container (see chunked_container.py).
+##
+## Every dump becomes one block of the container, named after the original
+## file and holding its payload, optionally stored as float32 and/or
+## compressed with zlib or lzma. The header fields (time, shape, bbox) and
+## the fields parsed from the file name (variable, level, grid, rank, dump
+## counter) are kept in the container index, so any dump is found and read
+## without scanning the archive.
+##
+## ArchivedBinaryData offers the same lazy interface as
+## binary_data_reader.BinaryDataFile (time, shape, rmin, rmax, data,
+## read_plane, read_line, read_box), and open_binary_data() accepts either a
+## plain .bin path or "<archive>::<dump name>". list_binary_data() enumerates
+## both the loose dumps of an output directory and the dumps of the archives
+## stored there, so the plots and movies work on either.
+##
+#################################################
+
+import os
+import zlib
+import numpy
+
+import binary_data_reader
+import binary_data_catalog
+import chunked_container
+
+
+#########################################################################################
+
+## Separator between archive path and dump name in open_binary_data()
+
+ARCHIVE_MEMBER_SEPARATOR = "::"
+
+## Payload types an archive can store
+
+ARCHIVE_DTYPES = ( "float64", "float32" )
+
+## File suffix of archives found by list_binary_data, and the container kind they carry
+
+ARCHIVE_SUFFIX = ".cc"
+ARCHIVE_KIND   = "binary dump series"
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Worker: read one dump, convert its payload and compress it
+
+def _pack_dump( task ):
+
+    filename, dtype, codec, level = task
+    with binary_data_reader.BinaryDataFile( filename ) as dump:
+        payload = numpy.ascontiguousarray( dump.data, dtype=dtype ).tobytes()
+        info    = binary_data_catalog.parse_binary_filename( filename ) or {}
+        info.update( { "time": dump.time, "shape": list(dump.shape), "rmin": list(dump.rmin),
+                       "rmax": list(dump.rmax), "dtype": dtype } )
+
+    return ( os.path.basename(filename), len(payload), zlib.crc32(payload),
+             chunked_container.compress_block( payload, codec, level ), info )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## pack_binary_data(directory, destination, dtype="float64", codec="zlib", level=6, processes=None, **query)
+## Pack the dumps of an output directory into an archive.
+##
+##  - dtype:     "float64" keeps the values exactly, "float32" halves the size
+##  - codec:     "zlib", "lzma" or "none" (lossless)
+##  - processes: compression processes (None: all cores, 1: no pool)
+##  - query:     catalog filters selecting the dumps, e.g. variable="chi", level=3
+##
+## Return the BinaryDataArchive of the new archive.
+
+def pack_binary_data( directory, destination, dtype="float64", codec="zlib", level=6, processes=None, **query ):
+
+    if dtype not in ARCHIVE_DTYPES:
+        raise ValueError( f"unknown payload type {dtype!r}, choose one of {ARCHIVE_DTYPES}" )
+
+    with binary_data_catalog.BinaryDataCatalog( directory ) as catalog:
+        filenames = [ entry.filename for entry in catalog.query( **query ) ]
+    if not filenames:
+        raise FileNotFoundError( f"no binary data files selected in {directory}" )
+
+    tasks  = [ (filename, dtype, codec, level) for filename in filenames ]
+    writer = chunked_container.ContainerWriter( destination, codec, level, { "kind": ARCHIVE_KIND, "dtype": dtype } )
+    try:
+        for name, size, crc, payload, info in chunked_container.ordered_map( _pack_dump, tasks, processes ):
+            writer.add_compressed( name, size, crc, payload, info )
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+    print( " packed", len(filenames), "binary data files into", destination )
+
+    return BinaryDataArchive( destination )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## BinaryDataArchive(filename)
+## Index of an archive; dumps are looked up by name or by their file name fields.
+##
+##  - names:                     dump names in archive order
+##  - query(variable=..., ...)   names matching the fields (same filters as the catalog)
+##  - checksum(name)             CRC32 of the stored payload of a dump (from the index)
+##  - open(name)                 ArchivedBinaryData of one dump; nothing is decompressed yet
+##  - extract(name, directory)   write the dump back as a Parallel::writefile .bin file
+
+class BinaryDataArchive:
+
+    def __init__( self, filename ):
+
+        self.filename  = filename
+        self.container = chunked_container.ContainerFile( filename )
+        self.names     = list( self.container.names )
+        self._info     = { block["name"]: block.get("info", {}) for block in self.container.blocks }
+        self._crc32    = { block["name"]: block["crc32"] for block in self.container.blocks }
+
+    def __contains__( self, name ):
+        return name in self._info
+
+    def info( self, name ):
+        if name not in self._info:
+            raise KeyError( f"{self.filename}: no dump {name!r}" )
+        return self._info[name]
+
+    def checksum( self, name ):
+        self.info( name )
+        return self._crc32[name]
+
+    def query( self, variable=None, level=None, grid=None, rank=None, shell=None, tag=None,
+               ncount=None, tmin=None, tmax=None ):
+
+        wanted  = { "variable": variable, "level": level, "grid": grid, "rank": rank,
+                    "shell": shell, "tag": tag, "ncount": ncount }
+        wanted  = { key: value for key, value in wanted.items() if value is not None }
+        matches = []
+        for name in self.names:
+            info = self._info[name]
+            if any( info.get(key) != value for key, value in wanted.items() ):
+                continue
+            if ( tmin is not None and info["time"] < tmin ) or ( tmax is not None and info["time"] > tmax ):
+                continue
+            matches.append( name )
+        return sorted( matches, key=lambda name: ( self._info[name]["time"], name ) )
+
+    def open( self, name ):
+        return ArchivedBinaryData( self, name )
+
+    def extract( self, name, directory ):
+
+        dump     = self.open( name )
+        filename = os.path.join( directory, name )
+        header   = numpy.zeros( 1, dtype=binary_data_reader.BINARY_HEADER_DTYPE )
+        header["time"]  = dump.time
+        header["shape"] = dump.shape
+        header["bbox"]  = [ dump.rmin[0], dump.rmax[0], dump.rmin[1], dump.rmax[1], dump.rmin[2], dump.rmax[2] ]
+        with open( filename, "wb" ) as file:
+            header.tofile( file )
+            numpy.ascontiguousarray( dump.data, dtype=numpy.float64 ).tofile( file )
+        return filename
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## ArchivedBinaryData(archive, name)
+## One dump inside an archive, with the interface of binary_data_reader.BinaryDataFile.
+## The block is decompressed on the first access to the payload.
+
+class ArchivedBinaryData:
+
+    def __init__( self, archive, name ):
+
+        info = archive.info( name )
+
+        self.archive  = archive
+        self.name     = name
+        self.filename = archive.filename + ARCHIVE_MEMBER_SEPARATOR + name
+        self.time     = float( info["time"] )
+        self.shape    = tuple( info["shape"] )
+        self.rmin     = tuple( info["rmin"] )
+        self.rmax     = tuple( info["rmax"] )
+        self.dtype    = numpy.dtype( info["dtype"] )
+        self.size     = self.shape[0] * self.shape[1] * self.shape[2]
+        self._data    = None
+
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    def close( self ):
+        self._data = None
+
+    @property
+    def array_shape( self ):
+        nx, ny, nz = self.shape
+        return ( nz, ny, nx )
+
+    ## payload in (nz, ny, nx) order (read-only, in the stored dtype)
+    @property
+    def data( self ):
+        if self._data is None:
+            block      = self.archive.container.read_block( self.name )
+            self._data = numpy.frombuffer( block, dtype=self.dtype ).reshape( self.array_shape )
+        return self._data
+
+    def read_plane( self, index, axis="z" ):
+        if axis == "z":
+            return numpy.array( self.data[index] )
+        elif axis == "y":
+            return numpy.array( self.data[:, index, :] )
+        elif axis == "x":
+            return numpy.array( self.data[:, :, index] )
+        else:
+            raise ValueError( f"unknown axis {axis!r}, choose 'x', 'y' or 'z'" )
+
+    def read_line( self, j, k ):
+        return numpy.array( self.data[k, j, :] )
+
+    def read_box( self, x_range, y_range, z_range ):
+        nx, ny, nz = self.shape
+        i0, i1 = binary_data_reader._clip_range( x_range, nx )
+        j0, j1 = binary_data_reader._clip_range( y_range, ny )
+        k0, k1 = binary_data_reader._clip_range( z_range, nz )
+        return numpy.array( self.data[k0:k1, j0:j1, i0:i1] )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## open_archive(archive_path)
+## BinaryDataArchive of a file, reused while the file is unchanged.
+
+_ARCHIVES = {}
+
+def open_archive( archive_path ):
+
+    stat = os.stat( archive_path )
+    key  = ( os.path.abspath(archive_path), stat.st_size, stat.st_mtime_ns )
+    if key not in _ARCHIVES:
+        _ARCHIVES[key] = BinaryDataArchive( archive_path )
+    return _ARCHIVES[key]
+
+## open_binary_data(path)
+## Open a plain dump file or "<archive>::<dump name>" with the same interface.
+
+def open_binary_data( path ):
+
+    if ARCHIVE_MEMBER_SEPARATOR not in path:
+        return binary_data_reader.BinaryDataFile( path )
+
+    archive_path, name = path.split( ARCHIVE_MEMBER_SEPARATOR, 1 )
+    return open_archive( archive_path ).open( name )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## find_archives(directory)
+## Paths of the dump archives (*.cc files written by pack_binary_data) in directory;
+## other chunked containers, e.g. packed checkpoints, are left out.
+
+def find_archives( directory ):
+
+    archives = []
+    for name in sorted( os.listdir( directory ) ):
+        path = os.path.join( directory, name )
+        if not name.endswith( ARCHIVE_SUFFIX ) or not os.path.isfile( path ):
+            continue
+        try:
+            archive = open_archive( path )
+        except ValueError:
+            continue
+        if archive.container.metadata.get( "kind" ) == ARCHIVE_KIND:
+            archives.append( path )
+    return archives
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## list_binary_data(directory, **query)
+## Dumps of an output directory matching the catalog filters (variable, level, grid,
+## rank, shell, tag, ncount, tmin, tmax), as binary_data_catalog.BinaryDataEntry rows:
+## first the loose .bin files (through the catalog), then the dumps of each archive
+## in directory with filename "<archive>::<dump name>" (data_offset None). A dump
+## present as a loose file or in several archives is listed once, the first time.
+
+def list_binary_data( directory, **query ):
+
+    with binary_data_catalog.BinaryDataCatalog( directory ) as catalog:
+        entries = catalog.query( **query )
+
+    loose = { os.path.basename( entry.filename ) for entry in entries }
+    for archive_path in find_archives( directory ):
+        archive = open_archive( archive_path )
+        for name in archive.query( **query ):
+            if name in loose:
+                continue
+            loose.add( name )
+            info = archive.info( name )
+            entries.append( binary_data_catalog.BinaryDataEntry(
+                archive_path + ARCHIVE_MEMBER_SEPARATOR + name, info.get("tag"), info.get("level"),
+                info.get("grid"), info.get("rank"), info.get("shell"), info.get("variable"), info.get("ncount"),
+                info["time"], tuple(info["shape"]), tuple(info["rmin"]), tuple(info["rmax"]), None ) )
+
+    return entries
+
+#########################################################################################
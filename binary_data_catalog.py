@@ -0,0 +1,209 @@
+
+#################################################
+##
+## Persistent catalog of the binary dumps (*.bin) in one run's output directory.
+##
+## The catalog is a small SQLite database stored next to the dumps. It holds
+## one row per file with the fields encoded in the file name (level, grid,
+## rank, variable, dump counter) and the header metadata (time, shape, bbox,
+## payload offset). update() only re-reads files whose size or mtime changed,
+## so repeated post-processing passes do not rescan thousands of headers.
+##
+## File names written by the ABE executable:
+##   [tag_]Lev%02d-%02d_%s_%05d.bin        Parallel::Dump_Data       (level, grid)
+##   [tag_]Lev%02d-%02d_%02d_%s_%05d.bin   Parallel::Dump_CPU_Data   (level, block, rank)
+##   [tag_]Lev%02d_%s_%05d.bin             Parallel::Dump_Data (whole level)
+##   [tag_]LevSH-%s_%s_%05d.bin            ShellPatch::Dump_Data     (shell patch)
+##
+#################################################
+
+import os
+import re
+import sqlite3
+import collections
+
+import binary_data_reader
+
+
+#########################################################################################
+
+## Default catalog file name inside the output directory
+
+CATALOG_FILENAME = "binary_data_catalog.sqlite"
+
+## Recognised dump file names, tried in order
+
+BINARY_FILENAME_PATTERNS = [
+    re.compile( r"^(?:(?P<tag>.+)_)?Lev(?P<level>\d{2})-(?P<grid>\d{2})_(?P<rank>\d{2,})_(?P<variable>.+)_(?P<ncount>\d{5,})\.bin$" ),
+    re.compile( r"^(?:(?P<tag>.+)_)?Lev(?P<level>\d{2})-(?P<grid>\d{2})_(?P<variable>.+)_(?P<ncount>\d{5,})\.bin$" ),
+    re.compile( r"^(?:(?P<tag>.+)_)?Lev(?P<level>\d{2})_(?P<variable>.+)_(?P<ncount>\d{5,})\.bin$" ),
+    re.compile( r"^(?:(?P<tag>.+)_)?LevSH-(?P<shell>[^_]+)_(?P<variable>.+)_(?P<ncount>\d{5,})\.bin$" ),
+]
+
+## One catalog row
+
+BinaryDataEntry = collections.namedtuple( "BinaryDataEntry",
+    [ "filename", "tag", "level", "grid", "rank", "shell", "variable", "ncount", "time",
+      "shape", "rmin", "rmax", "data_offset" ] )
+
+_COLUMNS = ( "name", "tag", "level", "grid", "rank", "shell", "variable", "ncount", "time",
+             "nx", "ny", "nz", "xmin", "ymin", "zmin", "xmax", "ymax", "zmax",
+             "data_offset", "size", "mtime" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## parse_binary_filename(name)
+## Split a dump file name into its fields; return None for unrelated files.
+## Missing fields (grid for whole-level dumps, rank for gathered dumps,
+## level for shell patches, ...) are None.
+
+def parse_binary_filename( name ):
+
+    name = os.path.basename( name )
+    for pattern in BINARY_FILENAME_PATTERNS:
+        match = pattern.match( name )
+        if match is None:
+            continue
+        fields = dict.fromkeys( ("tag", "level", "grid", "rank", "shell") )
+        fields.update( match.groupdict() )
+        for key in ( "level", "grid", "rank", "ncount" ):
+            if fields[key] is not None:
+                fields[key] = int( fields[key] )
+        return fields
+
+    return None
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## BinaryDataCatalog(directory, catalog_file=None)
+## Open (or create) the catalog of directory and bring it up to date.
+##
+## Typical use:
+##   with BinaryDataCatalog( binary_outdir ) as catalog:
+##       for entry in catalog.query( variable="chi", level=3, tmin=200.0, tmax=400.0 ):
+##           ...
+
+class BinaryDataCatalog:
+
+    def __init__( self, directory, catalog_file=None, update=True ):
+
+        self.directory    = directory
+        self.catalog_file = catalog_file or os.path.join( directory, CATALOG_FILENAME )
+
+        self.connection = sqlite3.connect( self.catalog_file )
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS dumps ("
+            " name TEXT PRIMARY KEY, tag TEXT, level INTEGER, grid INTEGER, rank INTEGER, shell TEXT,"
+            " variable TEXT NOT NULL, ncount INTEGER NOT NULL, time REAL NOT NULL,"
+            " nx INTEGER, ny INTEGER, nz INTEGER, xmin REAL, ymin REAL, zmin REAL, xmax REAL, ymax REAL, zmax REAL,"
+            " data_offset INTEGER, size INTEGER NOT NULL, mtime INTEGER NOT NULL )" )
+        self.connection.execute( "CREATE INDEX IF NOT EXISTS dumps_lookup ON dumps ( variable, level, time )" )
+        self.connection.commit()
+
+        if update:
+            self.update()
+
+    ## context manager support
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    def close( self ):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    ## update()
+    ## Rescan the directory; only new files and files whose size or mtime
+    ## changed have their header read. Rows of deleted files are dropped.
+    ## Return the number of (added or refreshed, removed) rows.
+    def update( self ):
+
+        known = { name: (size, mtime) for name, size, mtime in
+                  self.connection.execute( "SELECT name, size, mtime FROM dumps" ) }
+
+        rows  = []
+        found = set()
+        with os.scandir( self.directory ) as scan:
+            for item in scan:
+                if not item.is_file():
+                    continue
+                fields = parse_binary_filename( item.name )
+                if fields is None:
+                    continue
+                found.add( item.name )
+                stat = item.stat()
+                if known.get( item.name ) == ( stat.st_size, stat.st_mtime_ns ):
+                    continue
+                try:
+                    dump = binary_data_reader.BinaryDataFile( item.path )
+                except ValueError as error:
+                    ## a dump that is still being written; pick it up next time
+                    print( " skip incomplete binary data file:", error )
+                    found.discard( item.name )
+                    continue
+                rows.append( ( item.name, fields["tag"], fields["level"], fields["grid"], fields["rank"],
+                               fields["shell"], fields["variable"], fields["ncount"], dump.time )
+                             + dump.shape + dump.rmin + dump.rmax
+                             + ( dump.data_offset, stat.st_size, stat.st_mtime_ns ) )
+
+        removed = [ (name,) for name in known if name not in found ]
+
+        with self.connection:
+            self.connection.executemany( "DELETE FROM dumps WHERE name = ?", removed )
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO dumps ( {', '.join(_COLUMNS)} ) VALUES ( {', '.join('?' * len(_COLUMNS))} )",
+                rows )
+
+        return len(rows), len(removed)
+
+    ## query(variable=None, level=None, grid=None, rank=None, shell=None, tag=None, ncount=None, tmin=None, tmax=None)
+    ## Return the matching entries ordered by variable, level, grid, rank and time.
+    ## Arguments left as None are not filtered on; tmin/tmax bound the physical time (inclusive).
+    def query( self, variable=None, level=None, grid=None, rank=None, shell=None, tag=None,
+               ncount=None, tmin=None, tmax=None ):
+
+        conditions = []
+        values     = []
+        for column, value in ( ("variable", variable), ("level", level), ("grid", grid), ("rank", rank),
+                               ("shell", shell), ("tag", tag), ("ncount", ncount) ):
+            if value is not None:
+                conditions.append( f"{column} = ?" )
+                values.append( value )
+        if tmin is not None:
+            conditions.append( "time >= ?" )
+            values.append( tmin )
+        if tmax is not None:
+            conditions.append( "time <= ?" )
+            values.append( tmax )
+
+        sql = f"SELECT {', '.join(_COLUMNS)} FROM dumps"
+        if conditions:
+            sql += " WHERE " + " AND ".join( conditions )
+        sql += " ORDER BY variable, level, grid, rank, shell, time, name"
+
+        return [ self._entry(row) for row in self.connection.execute( sql, values ) ]
+
+    ## distinct values of one column, e.g. catalog.distinct( "variable" )
+    def distinct( self, column ):
+        if column not in _COLUMNS:
+            raise ValueError( f"unknown catalog column {column!r}" )
+        return [ row[0] for row in self.connection.execute( f"SELECT DISTINCT {column} FROM dumps ORDER BY {column}" ) ]
+
+    def _entry( self, row ):
+        ( name, tag, level, grid, rank, shell, variable, ncount, time,
+          nx, ny, nz, xmin, ymin, zmin, xmax, ymax, zmax, data_offset, size, mtime ) = row
+        return BinaryDataEntry( os.path.join(self.directory, name), tag, level, grid, rank, shell, variable,
+                                ncount, time, (nx, ny, nz), (xmin, ymin, zmin), (xmax, ymax, zmax), data_offset )
+
+#########################################################################################
@@ -0,0 +1,205 @@
+
+#################################################
+##
+## Mosaic of the per-rank tiles written by Parallel::Dump_CPU_Data.
+##
+## Every MPI rank writes the blocks it owns to its own file
+##   [tag_]Lev%02d-%02d_%02d_<var>_%05d.bin   (level, block, rank, variable, count)
+## using the same layout as Parallel::writefile (see binary_data_reader.py).
+## The bbox/shape header of each tile places it on the level grid, so the
+## tiles can be stitched back into one virtual level-wide array without
+## going through the gathering Dump_Data path.
+##
+#################################################
+
+import os
+import re
+import glob
+import numpy
+
+import binary_data_reader
+
+
+#########################################################################################
+
+## File name of one per-rank tile
+
+TILE_FILENAME_PATTERN = re.compile( r"^(?:(?P<tag>.+)_)?Lev(?P<level>\d{2})-(?P<block>\d{2})_(?P<rank>\d{2,})"
+                                    r"_(?P<variable>.+)_(?P<count>\d{5,})\.bin$" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## find_tiles(directory, variable, level, count, tag=None)
+## Return the sorted tile file names of one variable on one level at one dump count.
+
+def find_tiles( directory, variable, level, count, tag=None ):
+
+    tiles = []
+    for filename in glob.glob( os.path.join(directory, "*.bin") ):
+        match = TILE_FILENAME_PATTERN.match( os.path.basename(filename) )
+        if match is None:
+            continue
+        if ( match["variable"] != variable or int(match["level"]) != level or int(match["count"]) != count ):
+            continue
+        if ( match["tag"] != tag ):
+            continue
+        tiles.append( filename )
+
+    return sorted( tiles )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## BinaryDataMosaic(filenames, centering="Cell")
+## Virtual level-wide array assembled from the tiles of one level.
+##
+## Only the tile headers are read on construction. read_box / read_plane open
+## just the tiles that intersect the requested region; points covered by no
+## tile are filled with numpy.nan. Overlapping ghost zones hold the same
+## values after the synchronisation step, so the later tile simply wins.
+##
+## centering is "Cell" (dx = (xmax-xmin)/nx) or "Vertex" (dx = (xmax-xmin)/(nx-1)),
+## matching the Cell/Vertex build option of ABE.
+##
+## Attributes:
+##  - time:    physical time shared by all tiles
+##  - shape:   grid points of the whole mosaic (nx, ny, nz)
+##  - rmin:    lower coordinate bound (xmin, ymin, zmin)
+##  - rmax:    upper coordinate bound (xmax, ymax, zmax)
+##  - spacing: grid spacing (dx, dy, dz)
+##  - tiles:   BinaryDataFile of every tile
+##  - offsets: index (i, j, k) of the first point of every tile in the mosaic
+
+class BinaryDataMosaic:
+
+    def __init__( self, filenames, centering="Cell" ):
+
+        if not filenames:
+            raise ValueError( "no tiles given for the mosaic" )
+        if centering not in ( "Cell", "Vertex" ):
+            raise ValueError( f"unknown centering {centering!r}, choose 'Cell' or 'Vertex'" )
+
+        self.centering = centering
+        self.tiles     = [ binary_data_reader.BinaryDataFile(filename) for filename in filenames ]
+        self.time      = self.tiles[0].time
+
+        for tile in self.tiles:
+            if not numpy.isclose( tile.time, self.time ):
+                raise ValueError( f"{tile.filename}: time {tile.time} differs from {self.time}" )
+
+        self.spacing = self._tile_spacing( self.tiles[0] )
+        for tile in self.tiles[1:]:
+            if not numpy.allclose( self._tile_spacing(tile), self.spacing ):
+                raise ValueError( f"{tile.filename}: grid spacing differs from the other tiles" )
+
+        self.rmin = tuple( min(tile.rmin[axis] for tile in self.tiles) for axis in range(3) )
+        self.rmax = tuple( max(tile.rmax[axis] for tile in self.tiles) for axis in range(3) )
+
+        self.offsets = [ self._index_of(tile.rmin) for tile in self.tiles ]
+        last         = self._index_of( self.rmax )
+        if centering == "Vertex":
+            self.shape = tuple( n + 1 for n in last )
+        else:
+            self.shape = last
+
+    ## grid spacing of one tile
+    def _tile_spacing( self, tile ):
+        points = [ n - 1 if self.centering == "Vertex" else n for n in tile.shape ]
+        return tuple( (tile.rmax[axis] - tile.rmin[axis]) / max(points[axis], 1) for axis in range(3) )
+
+    ## mosaic index of a coordinate on the level grid
+    def _index_of( self, position ):
+        return tuple( int(round( (position[axis] - self.rmin[axis]) / self.spacing[axis] )) for axis in range(3) )
+
+    ## numpy shape of the mosaic: (nz, ny, nx)
+    @property
+    def array_shape( self ):
+        nx, ny, nz = self.shape
+        return ( nz, ny, nx )
+
+    ## coordinates(axis)
+    ## Grid point coordinates of the mosaic along axis 0 (x), 1 (y) or 2 (z).
+    def coordinates( self, axis ):
+        if self.centering == "Vertex":
+            return self.rmin[axis] + numpy.arange( self.shape[axis] ) * self.spacing[axis]
+        return self.rmin[axis] + ( numpy.arange(self.shape[axis]) + 0.5 ) * self.spacing[axis]
+
+    ## tiles_in_box(x_range, y_range, z_range)
+    ## Return (tile, offset) for every tile that intersects the index box.
+    def tiles_in_box( self, x_range, y_range, z_range ):
+
+        box = ( x_range, y_range, z_range )
+        hits = []
+        for tile, offset in zip( self.tiles, self.offsets ):
+            if all( offset[axis] < box[axis][1] and box[axis][0] < offset[axis] + tile.shape[axis] for axis in range(3) ):
+                hits.append( (tile, offset) )
+        return hits
+
+    ## read_box(x_range, y_range, z_range)
+    ## Return the mosaic sub-box [i0:i1, j0:j1, k0:k1] in (nz, ny, nx) order.
+    ## Each range is a (start, stop) pair of mosaic indices.
+    def read_box( self, x_range, y_range, z_range ):
+
+        box = [ binary_data_reader._clip_range( index_range, n )
+                for index_range, n in zip( (x_range, y_range, z_range), self.shape ) ]
+        (i0, i1), (j0, j1), (k0, k1) = box
+
+        values = numpy.full( (k1-k0, j1-j0, i1-i0), numpy.nan )
+        for tile, offset in self.tiles_in_box( *box ):
+            ## intersection in mosaic indices
+            lower = [ max(box[axis][0], offset[axis])                    for axis in range(3) ]
+            upper = [ min(box[axis][1], offset[axis] + tile.shape[axis]) for axis in range(3) ]
+            part  = tile.read_box( *[ (lower[axis] - offset[axis], upper[axis] - offset[axis]) for axis in range(3) ] )
+            values[ lower[2]-k0:upper[2]-k0, lower[1]-j0:upper[1]-j0, lower[0]-i0:upper[0]-i0 ] = part
+
+        return values
+
+    ## read_plane(index, axis)
+    ## Return one coordinate plane of the mosaic; only the tiles crossing it are read.
+    ##  - axis "z": shape (ny, nx)
+    ##  - axis "y": shape (nz, nx)
+    ##  - axis "x": shape (nz, ny)
+    def read_plane( self, index, axis="z" ):
+
+        nx, ny, nz = self.shape
+
+        if axis == "z":
+            return self.read_box( (0, nx), (0, ny), (index, index+1) )[0]
+        elif axis == "y":
+            return self.read_box( (0, nx), (index, index+1), (0, nz) )[:, 0, :]
+        elif axis == "x":
+            return self.read_box( (index, index+1), (0, ny), (0, nz) )[:, :, 0]
+        else:
+            raise ValueError( f"unknown axis {axis!r}, choose 'x', 'y' or 'z'" )
+
+    ## the whole level as one array (reads every tile)
+    @property
+    def data( self ):
+        nx, ny, nz = self.shape
+        return self.read_box( (0, nx), (0, ny), (0, nz) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## open_level(directory, variable, level, count, tag=None, centering="Cell")
+## Build the mosaic of one variable on one level from the tiles in directory.
+
+def open_level( directory, variable, level, count, tag=None, centering="Cell" ):
+
+    tiles = find_tiles( directory, variable, level, count, tag )
+    if not tiles:
+        raise FileNotFoundError( f"no tiles of {variable} on level {level} at count {count} in {directory}" )
+
+    return BinaryDataMosaic( tiles, centering )
+
+#########################################################################################
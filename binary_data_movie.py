@@ -0,0 +1,298 @@
+
+#################################################
+##
+## Movies of xy slices through a series of binary dumps
+##
+## The dumps are streamed one at a time: each frame reads only the slice it
+## shows (binary_data_reader.read_plane, or one block of an archive), draws
+## it into a figure that is created once per process and hands the RGBA
+## pixels to a writer. The writer either pipes raw frames into an ffmpeg
+## subprocess or writes a numbered PNG sequence. Frames can be rendered by
+## several processes; at most a fixed number of frames is in flight, so the
+## memory use does not grow with the length of the series.
+##
+#################################################
+
+import os
+import shutil
+import subprocess
+import collections
+import multiprocessing
+import numpy
+
+import AMSS_NCKU_Input as input_data
+import binary_data_archive
+import grid_upsample
+
+
+#########################################################################################
+
+## Default frame size in pixels (even, as required by yuv420p video)
+
+MOVIE_FRAME_SIZE = ( 960, 720 )
+
+## Frame resolution used to convert the frame size into a figure size
+
+MOVIE_DPI = 100
+
+## Frames rendered ahead of the writer per worker process
+
+MOVIE_FRAMES_IN_FLIGHT = 2
+
+## Suffixes written through ffmpeg; any other destination is a PNG directory
+
+MOVIE_VIDEO_SUFFIXES = ( ".mp4", ".mkv", ".mov", ".avi", ".webm" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## slice_index(nz, symmetry)
+## z index of the slice shown for a dump with nz points in z: the middle
+## plane without symmetry, the plane next to z = 0 otherwise (as in plot_binary_data).
+
+def slice_index( nz, symmetry ):
+
+    if symmetry == "no-symmetry":
+        return nz // 2
+    return 0
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## SliceFrameRenderer(title, clim, frame_size=MOVIE_FRAME_SIZE, centering="Cell", symmetry="equatorial-symmetry")
+## One figure and image, reused for every frame; render(filename) returns the
+## frame as a (height, width, 4) uint8 RGBA array.
+
+class SliceFrameRenderer:
+
+    def __init__( self, title, clim, frame_size=MOVIE_FRAME_SIZE, centering="Cell", symmetry="equatorial-symmetry" ):
+
+        ## an Agg canvas of its own: no pyplot state, whatever backend the caller uses
+        from matplotlib.figure               import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.title     = title
+        self.centering = centering
+        self.symmetry  = symmetry
+
+        width, height = frame_size
+        self.figure   = Figure( figsize=( width / MOVIE_DPI, height / MOVIE_DPI ), dpi=MOVIE_DPI )
+        FigureCanvasAgg( self.figure )
+        self.axes     = self.figure.add_subplot( 111 )
+        self.image    = self.axes.imshow( numpy.zeros( (2, 2) ), origin="lower", cmap="RdYlGn_r",
+                                          vmin=clim[0], vmax=clim[1], interpolation="bicubic" )
+        self.figure.colorbar( self.image )
+        self.axes.set_xlabel( "X [M]" )
+        self.axes.set_ylabel( "Y [M]" )
+        self.heading  = self.axes.set_title( title )
+
+    def render( self, filename ):
+
+        with binary_data_archive.open_binary_data( filename ) as dump:
+            plane = dump.read_plane( slice_index( dump.shape[2], self.symmetry ), "z" )
+            time  = dump.time
+            rmin, rmax, shape = dump.rmin, dump.rmax, dump.shape
+
+        ## extent of the image: the box for cell-centred points, half a cell beyond the vertices otherwise
+        x = grid_upsample.grid_coordinates( rmin[0], rmax[0], shape[0], self.centering )
+        y = grid_upsample.grid_coordinates( rmin[1], rmax[1], shape[1], self.centering )
+        dx = ( x[-1] - x[0] ) / max( len(x) - 1, 1 )
+        dy = ( y[-1] - y[0] ) / max( len(y) - 1, 1 )
+
+        self.image.set_data( plane )
+        self.image.set_extent( ( x[0] - dx/2, x[-1] + dx/2, y[0] - dy/2, y[-1] + dy/2 ) )
+        self.heading.set_text( self.title + "  physical time = " + str(time) )
+
+        self.figure.canvas.draw()
+        return numpy.asarray( self.figure.canvas.buffer_rgba() ).copy()
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Frame writers: write(frame) for every frame in order, then close()
+
+## Raw RGBA frames piped into ffmpeg
+
+class FFmpegWriter:
+
+    def __init__( self, destination, frame_size, fps, ffmpeg="ffmpeg" ):
+
+        executable = shutil.which( ffmpeg )
+        if executable is None:
+            raise FileNotFoundError( f"{ffmpeg} not found; write a PNG sequence instead (destination without a video suffix)" )
+
+        width, height    = frame_size
+        self.destination = destination
+        self.process     = subprocess.Popen(
+            [ executable, "-y", "-loglevel", "error",
+              "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+              "-c:v", "libx264", "-pix_fmt", "yuv420p", destination ],
+            stdin=subprocess.PIPE )
+
+    def write( self, frame ):
+        self.process.stdin.write( frame.tobytes() )
+
+    def close( self ):
+        self.process.stdin.close()
+        if self.process.wait() != 0:
+            raise RuntimeError( f"ffmpeg failed writing {self.destination} (exit code {self.process.returncode})" )
+
+## Numbered PNG files in a directory
+
+class PNGSequenceWriter:
+
+    def __init__( self, destination ):
+
+        import matplotlib.image
+
+        self.destination = destination
+        self.count       = 0
+        self._imsave     = matplotlib.image.imsave
+        os.makedirs( destination, exist_ok=True )
+
+    def write( self, frame ):
+        self._imsave( os.path.join( self.destination, f"frame_{self.count:05d}.png" ), frame )
+        self.count += 1
+
+    def close( self ):
+        return
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Worker side: one renderer per process
+
+_renderer = None
+
+def _init_movie_worker( title, clim, frame_size, centering, symmetry ):
+    global _renderer
+    _renderer = SliceFrameRenderer( title, clim, frame_size, centering, symmetry )
+
+def _render_frame( filename ):
+    return _renderer.render( filename )
+
+## Yield function(item) in order with at most window items submitted ahead
+
+def _bounded_imap( pool, function, items, window ):
+
+    pending = collections.deque()
+    for item in items:
+        pending.append( pool.apply_async( function, ( item, ) ) )
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## slice_limits(filenames, symmetry)
+## Colour range over the shown slices of all dumps (only the slices are read).
+
+def slice_limits( filenames, symmetry ):
+
+    vmin, vmax = numpy.inf, -numpy.inf
+    for filename in filenames:
+        with binary_data_archive.open_binary_data( filename ) as dump:
+            plane = dump.read_plane( slice_index( dump.shape[2], symmetry ), "z" )
+        if numpy.isfinite( plane ).any():
+            vmin = min( vmin, numpy.nanmin(plane) )
+            vmax = max( vmax, numpy.nanmax(plane) )
+
+    if not numpy.isfinite( vmin ):
+        return ( 0.0, 1.0 )
+    if vmin == vmax:
+        return ( vmin - 0.5, vmax + 0.5 )
+    return ( vmin, vmax )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## render_movie(filenames, destination, title="", fps=10, clim=None, workers=1, frame_size=MOVIE_FRAME_SIZE,
+##              centering=None, symmetry=None, ffmpeg="ffmpeg")
+## Render one frame per dump (in the given order) into destination.
+##
+##  - destination: a video file (.mp4, .mkv, ...: encoded by ffmpeg) or a directory for a PNG sequence
+##  - clim:        fixed colour range (None: range over all shown slices)
+##  - workers:     frame rendering processes (None: all cores)
+##  - centering, symmetry: None takes grid_center_set and Symmetry of the input file
+##
+## Return the number of frames written.
+
+def render_movie( filenames, destination, title="", fps=10, clim=None, workers=1, frame_size=MOVIE_FRAME_SIZE,
+                  centering=None, symmetry=None, ffmpeg="ffmpeg" ):
+
+    if centering is None:
+        centering = input_data.grid_center_set
+    if symmetry is None:
+        symmetry = input_data.Symmetry
+    if clim is None:
+        clim = slice_limits( filenames, symmetry )
+
+    if destination.lower().endswith( MOVIE_VIDEO_SUFFIXES ):
+        writer = FFmpegWriter( destination, frame_size, fps, ffmpeg )
+    else:
+        writer = PNGSequenceWriter( destination )
+
+    arguments = ( title, clim, frame_size, centering, symmetry )
+    workers   = workers or os.cpu_count() or 1
+    count     = 0
+    try:
+        if workers == 1 or len(filenames) < 2:
+            renderer = SliceFrameRenderer( *arguments )
+            for filename in filenames:
+                writer.write( renderer.render( filename ) )
+                count += 1
+        else:
+            with multiprocessing.Pool( workers, _init_movie_worker, arguments ) as pool:
+                for frame in _bounded_imap( pool, _render_frame, filenames, workers * MOVIE_FRAMES_IN_FLIGHT ):
+                    writer.write( frame )
+                    count += 1
+    finally:
+        writer.close()
+
+    print( " Movie", destination, "written with", count, "frames" )
+
+    return count
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## generate_movie(binary_outdir, destination, variable, level=0, grid=0, **options)
+## Movie of the gathered dumps of one variable on one grid of a level, in time order
+## (loose .bin files and dumps of archives in binary_outdir alike).
+
+def generate_movie( binary_outdir, destination, variable, level=0, grid=0, **options ):
+
+    entries = [ entry for entry in binary_data_archive.list_binary_data( binary_outdir, variable=variable, level=level, grid=grid )
+                if entry.rank is None and entry.shell is None ]
+    if not entries:
+        raise FileNotFoundError( f"no dumps of {variable} on level {level} grid {grid} in {binary_outdir}" )
+
+    entries.sort( key=lambda entry: ( entry.time, entry.filename ) )
+    options.setdefault( "title", f"{variable} Lev{level:02d}-{grid:02d}" )
+
+    return render_movie( [ entry.filename for entry in entries ], destination, **options )
+
+#########################################################################################
@@ -0,0 +1,180 @@
+
+#################################################
+##
+## Lazy reader for the binary field dumps (*.bin) written by
+## Parallel::writefile in the AMSS-NCKU ABE executable.
+##
+## File layout (native byte order, no padding):
+##   double time
+##   int    nx, ny, nz
+##   double xmin, xmax, ymin, ymax, zmin, zmax
+##   double data[nz][ny][nx]          (x varies fastest)
+##
+#################################################
+
+import os
+import numpy
+
+
+#########################################################################################
+
+## Header record of a Parallel::writefile dump (68 bytes)
+
+BINARY_HEADER_DTYPE = numpy.dtype( [ ("time",  numpy.float64               ),
+                                     ("shape", numpy.int32,   (3,)         ),
+                                     ("bbox",  numpy.float64, (6,)         ) ] )
+
+BINARY_HEADER_SIZE  = BINARY_HEADER_DTYPE.itemsize
+BINARY_VALUE_SIZE   = numpy.dtype(numpy.float64).itemsize
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## BinaryDataFile(filename)
+## Parse the fixed header of one dump once and give lazy access to its payload.
+##
+## Attributes:
+##  - time:  physical time of the dump
+##  - shape: grid points (nx, ny, nz)
+##  - rmin:  lower coordinate bound (xmin, ymin, zmin)
+##  - rmax:  upper coordinate bound (xmax, ymax, zmax)
+##  - data:  zero-copy numpy.memmap of the payload in (nz, ny, nx) order
+##
+## read_plane / read_line / read_box seek directly to the requested values,
+## so only those bytes are read from disk.
+
+class BinaryDataFile:
+
+    def __init__( self, filename ):
+
+        self.filename = filename
+        self._data    = None
+
+        header = numpy.fromfile( filename, dtype=BINARY_HEADER_DTYPE, count=1 )
+        if ( header.size != 1 ):
+            raise ValueError( f"{filename}: file is shorter than the binary dump header" )
+
+        self.time   = float( header["time"][0] )
+        self.shape  = tuple( int(n) for n in header["shape"][0] )
+        bbox        = header["bbox"][0]
+        self.rmin   = ( float(bbox[0]), float(bbox[2]), float(bbox[4]) )
+        self.rmax   = ( float(bbox[1]), float(bbox[3]), float(bbox[5]) )
+
+        self.data_offset = BINARY_HEADER_SIZE
+        self.size        = self.shape[0] * self.shape[1] * self.shape[2]
+
+        file_size = os.path.getsize( filename )
+        if ( min(self.shape) <= 0 or file_size < self.data_offset + self.size * BINARY_VALUE_SIZE ):
+            raise ValueError( f"{filename}: header shape {self.shape} does not match file size {file_size}" )
+
+    ## context manager support, so the memmap is released on exit
+    def __enter__( self ):
+        return self
+
+    def __exit__( self, *exc ):
+        self.close()
+
+    def close( self ):
+        self._data = None
+
+    ## numpy shape of the payload: (nz, ny, nx)
+    @property
+    def array_shape( self ):
+        nx, ny, nz = self.shape
+        return ( nz, ny, nx )
+
+    ## zero-copy view of the whole payload; pages are only read when touched
+    @property
+    def data( self ):
+        if self._data is None:
+            self._data = numpy.memmap( self.filename, dtype=numpy.float64, mode="r",
+                                       offset=self.data_offset, shape=self.array_shape )
+        return self._data
+
+    ## read count values starting at flat payload index start
+    def _read_values( self, file, start, count ):
+        file.seek( self.data_offset + start * BINARY_VALUE_SIZE )
+        values = numpy.fromfile( file, dtype=numpy.float64, count=count )
+        if ( values.size != count ):
+            raise ValueError( f"{self.filename}: unexpected end of file" )
+        return values
+
+    ## read_plane(index, axis)
+    ## Return one coordinate plane of the payload as a new array.
+    ##  - axis "z": shape (ny, nx), one contiguous read
+    ##  - axis "y": shape (nz, nx), one contiguous row per z
+    ##  - axis "x": shape (nz, ny), read through the memmap
+    ## An index outside the axis raises IndexError.
+    def read_plane( self, index, axis="z" ):
+
+        nx, ny, nz = self.shape
+        if axis not in ( "x", "y", "z" ):
+            raise ValueError( f"unknown axis {axis!r}, choose 'x', 'y' or 'z'" )
+        index = _check_index( index, { "x": nx, "y": ny, "z": nz }[axis], axis )
+
+        if axis == "z":
+            with open( self.filename, "rb" ) as file:
+                return self._read_values( file, index*nx*ny, nx*ny ).reshape( (ny, nx) )
+        elif axis == "y":
+            return self.read_box( (0, nx), (index, index+1), (0, nz) )[:, 0, :]
+        else:
+            return numpy.array( self.data[:, :, index] )
+
+    ## read_line(j, k)
+    ## Return the x-line at y index j and z index k (nx values, one contiguous read).
+    ## An index outside the grid raises IndexError.
+    def read_line( self, j, k ):
+        nx, ny, nz = self.shape
+        j = _check_index( j, ny, "y" )
+        k = _check_index( k, nz, "z" )
+        with open( self.filename, "rb" ) as file:
+            return self._read_values( file, (k*ny + j)*nx, nx )
+
+    ## read_box(x_range, y_range, z_range)
+    ## Return the sub-box [i0:i1, j0:j1, k0:k1] in (nz, ny, nx) order.
+    ## Each range is a (start, stop) pair of grid indices.
+    ## One contiguous block of y-rows is read per z-plane.
+    def read_box( self, x_range, y_range, z_range ):
+
+        nx, ny, nz = self.shape
+        i0, i1 = _clip_range( x_range, nx )
+        j0, j1 = _clip_range( y_range, ny )
+        k0, k1 = _clip_range( z_range, nz )
+
+        box = numpy.empty( (k1-k0, j1-j0, i1-i0) )
+        with open( self.filename, "rb" ) as file:
+            for k in range( k0, k1 ):
+                rows = self._read_values( file, (k*ny + j0)*nx, (j1-j0)*nx ).reshape( (j1-j0, nx) )
+                box[k-k0] = rows[:, i0:i1]
+        return box
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Check a grid index against an axis of length n (no wrap-around of negative indices)
+
+def _check_index( index, n, axis ):
+
+    index = int( index )
+    if not ( 0 <= index < n ):
+        raise IndexError( f"{axis} index {index} out of range for axis of length {n}" )
+    return index
+
+## Clip a (start, stop) index pair to [0, n]
+
+def _clip_range( index_range, n ):
+
+    start, stop = index_range
+    start = max( 0, int(start) )
+    stop  = min( n, int(stop)  )
+    if ( stop <= start ):
+        raise ValueError( f"empty index range {index_range} for axis of length {n}" )
+    return start, stop
+
+#########################################################################################
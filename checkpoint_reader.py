@@ -0,0 +1,362 @@
+
+#################################################
+##
+## Reader for the grid-hierarchy checkpoint (*_cgh.CHK) written by
+## checkpoint::writecheck_cgh in the AMSS-NCKU ABE executable.
+##
+## File layout (native byte order, no padding):
+##   double time
+##   int    levels, movls, BH_num_in
+##   int    grids[levels]
+##   double Lt[levels]
+##   for every level:
+##       for every grid:  double bbox[6]  (xmin, ymin, zmin, xmax, ymax, zmax)
+##                        int    shape[3]
+##                        double handle[3]
+##       for every BH:    double Porgls[3]
+##   for every level, for every patch of cgh::construct_patchlist,
+##       for every checkpointed variable:  double data[nz][ny][nx]
+##
+## The patch list is not stored in the file; it is rebuilt here from the
+## grid boxes the same way cgh::construct_patchlist does (merging of
+## overlapping boxes, ghost zones on touching faces, buffer zones added by
+## the Patch constructor). The header is parsed on construction; the field
+## data of one (level, patch, variable) is only memory-mapped on request.
+##
+#################################################
+
+import os
+import numpy
+
+
+#########################################################################################
+
+## Parameters of cgh::construct_patchlist (macrodef.h, macrodef.fh, cgh.h)
+
+BUFFER_WIDTH  = 6                  ## buffer points at mesh refinement interfaces
+CS_WIDTH      = 2 * BUFFER_WIDTH   ## buffer points of level 0 at the shell-box interface
+GHOST_WIDTH   = 3                  ## ghost points (finite difference order 4)
+MERGE_RATIO   = 0.75               ## cgh::ratio
+
+## Symmetry setting of AMSS_NCKU_Input.py -> Symmetry integer of ABE
+
+CHECKPOINT_SYMMETRY = { "no-symmetry": 0, "equatorial-symmetry": 1, "octant-symmetry": 2 }
+
+## CheckList of bssn_class: StateList followed by OldStateList
+
+BSSN_CHECKPOINT_VARIABLES = [ name + suffix for suffix in ( "0", "o" ) for name in
+    ( "phi", "trK", "gxx", "gxy", "gxz", "gyy", "gyz", "gzz", "Axx", "Axy", "Axz", "Ayy", "Ayz", "Azz",
+      "Gmx", "Gmy", "Gmz", "Lap", "Sfx", "Sfy", "Sfz", "dtSfx", "dtSfy", "dtSfz" ) ]
+
+_VALUE_SIZE = numpy.dtype(numpy.float64).itemsize
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## CheckpointPatch
+## One patch of the rebuilt patch list.
+##
+## Attributes:
+##  - level, index: position in cgh::PatL
+##  - rmin, rmax:   coordinate bounds including the buffer zone
+##  - shape:        grid points (nx, ny, nz)
+##  - offset:       byte offset of the first variable of this patch
+
+class CheckpointPatch:
+
+    def __init__( self, level, index, rmin, rmax, shape ):
+
+        self.level  = level
+        self.index  = index
+        self.rmin   = tuple( float(x) for x in rmin )
+        self.rmax   = tuple( float(x) for x in rmax )
+        self.shape  = tuple( int(n) for n in shape )
+        self.offset = None
+
+    @property
+    def size( self ):
+        return self.shape[0] * self.shape[1] * self.shape[2]
+
+    def __repr__( self ):
+        return f"CheckpointPatch(level={self.level}, index={self.index}, shape={self.shape}, rmin={self.rmin}, rmax={self.rmax})"
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## CheckpointFile(filename, symmetry=0, centering="Cell", with_shell=False, variables=None, patch_shapes=None)
+## Parse the hierarchy header of a *_cgh.CHK file.
+##
+##  - symmetry:     0, 1, 2 or the Symmetry string of AMSS_NCKU_Input.py
+##  - centering:    "Cell" or "Vertex", the ABE build option
+##  - with_shell:   True for Shell-Patch runs (WithShell build)
+##  - variables:    names of the checkpointed variables in CheckList order;
+##                  by default the bssn_class list when the count matches,
+##                  otherwise "var00", "var01", ...
+##  - patch_shapes: per level, the (nx, ny, nz) of every patch, to override
+##                  the rebuilt patch list
+##
+## Attributes: time, levels, movls, bh_number, grids, Lt, bbox, shape, handle,
+## porgls (per level arrays as in cgh), patches (per level), variables.
+##
+## read(level, patch, variable) returns a numpy.memmap of one field in (nz, ny, nx) order.
+
+class CheckpointFile:
+
+    def __init__( self, filename, symmetry=0, centering="Cell", with_shell=False, variables=None, patch_shapes=None ):
+
+        if centering not in ( "Cell", "Vertex" ):
+            raise ValueError( f"unknown centering {centering!r}, choose 'Cell' or 'Vertex'" )
+        if isinstance( symmetry, str ):
+            symmetry = CHECKPOINT_SYMMETRY[symmetry]
+
+        self.filename   = filename
+        self.symmetry   = symmetry
+        self.centering  = centering
+        self.with_shell = with_shell
+
+        self._read_header()
+
+        if patch_shapes is None:
+            self.patches = [ self._construct_patchlist(lev) for lev in range(self.levels) ]
+        else:
+            if len(patch_shapes) != self.levels:
+                raise ValueError( f"patch_shapes has {len(patch_shapes)} levels, the checkpoint has {self.levels}" )
+            self.patches = [ [ CheckpointPatch( lev, i, (numpy.nan,)*3, (numpy.nan,)*3, shape )
+                               for i, shape in enumerate(shapes) ] for lev, shapes in enumerate(patch_shapes) ]
+
+        ## the payload must hold a whole number of variables on every patch
+        points  = sum( patch.size for patches in self.patches for patch in patches )
+        payload = os.path.getsize( filename ) - self.header_size
+        if ( points == 0 or payload % (points * _VALUE_SIZE) != 0 ):
+            raise ValueError( f"{filename}: {payload} bytes of field data do not fit the patch list "
+                              f"({points} points per variable); check symmetry/centering or pass patch_shapes" )
+        nvariable = payload // ( points * _VALUE_SIZE )
+
+        if variables is None:
+            if nvariable == len(BSSN_CHECKPOINT_VARIABLES):
+                variables = BSSN_CHECKPOINT_VARIABLES
+            else:
+                variables = [ f"var{i:02d}" for i in range(nvariable) ]
+        elif len(variables) != nvariable:
+            raise ValueError( f"{filename}: holds {nvariable} variables per patch, {len(variables)} names given" )
+        self.variables = list( variables )
+
+        offset = self.header_size
+        for patches in self.patches:
+            for patch in patches:
+                patch.offset = offset
+                offset      += patch.size * nvariable * _VALUE_SIZE
+
+    ## parse the hierarchy header
+    def _read_header( self ):
+
+        with open( self.filename, "rb" ) as file:
+            head = numpy.fromfile( file, dtype=numpy.dtype([ ("time", numpy.float64), ("counts", numpy.int32, (3,)) ]), count=1 )
+            if ( head.size != 1 ):
+                raise ValueError( f"{self.filename}: file is shorter than the checkpoint header" )
+            self.time = float( head["time"][0] )
+            self.levels, self.movls, self.bh_number = ( int(n) for n in head["counts"][0] )
+            if ( self.levels <= 0 or self.bh_number < 0 ):
+                raise ValueError( f"{self.filename}: invalid header (levels={self.levels}, BH_num_in={self.bh_number})" )
+
+            self.grids = [ int(n) for n in self._fromfile( file, numpy.int32, self.levels ) ]
+            self.Lt    = self._fromfile( file, numpy.float64, self.levels )
+
+            grid_dtype  = numpy.dtype( [ ("bbox", numpy.float64, (6,)), ("shape", numpy.int32, (3,)), ("handle", numpy.float64, (3,)) ] )
+            self.bbox   = []
+            self.shape  = []
+            self.handle = []
+            self.porgls = []
+            for lev in range(self.levels):
+                grids = self._fromfile( file, grid_dtype, self.grids[lev] )
+                self.bbox.append(   grids["bbox"]   )
+                self.shape.append(  grids["shape"]  )
+                self.handle.append( grids["handle"] )
+                self.porgls.append( self._fromfile( file, numpy.float64, 3 * self.bh_number ).reshape( (self.bh_number, 3) ) )
+
+            self.header_size = file.tell()
+
+    def _fromfile( self, file, dtype, count ):
+        values = numpy.fromfile( file, dtype=dtype, count=count )
+        if ( values.size != count ):
+            raise ValueError( f"{self.filename}: unexpected end of file in the checkpoint header" )
+        return values
+
+    ## spacing of a box (llb, uub, shape) along axis i
+    def _spacing( self, llb, uub, shape, i ):
+        if self.centering == "Vertex":
+            return ( uub[i] - llb[i] ) / ( shape[i] - 1 )
+        return ( uub[i] - llb[i] ) / shape[i]
+
+    ## grid points of a box of width length along one axis
+    def _points( self, length, DH ):
+        if self.centering == "Vertex":
+            return int( length / DH + 0.4 ) + 1
+        return int( length / DH + 0.4 )
+
+    ## rebuild cgh::construct_patchlist(lev, Symmetry)
+    def _construct_patchlist( self, lev ):
+
+        boxes = [ [ list(bbox[:3]), list(bbox[3:]), [ int(n) for n in shape ] ]
+                  for bbox, shape in zip( self.bbox[lev], self.shape[lev] ) ]
+
+        if ( self.grids[lev] < 3 ):
+            boxes = self._merge_boxes( boxes )
+            self._check_no_cut( boxes, lev )
+            self._add_ghost_touch( boxes )
+
+        buflog = self.with_shell or lev > 0
+        return [ self._patch( lev, i, box, buflog ) for i, box in enumerate(boxes) ]
+
+    ## Parallel::merge_gsl: merge pairs whose union is mostly covered by the two boxes
+    def _merge_boxes( self, boxes ):
+
+        while True:
+            merged = None
+            for d in range( len(boxes) ):
+                for b in range( d+1, len(boxes) ):
+                    merged = self._merge_pair( boxes[d], boxes[b] )
+                    if merged is not None:
+                        break
+                if merged is not None:
+                    break
+            if merged is None:
+                return boxes
+            boxes = [ box for i, box in enumerate(boxes) if i not in (d, b) ] + [ merged ]
+
+    def _merge_pair( self, D, B ):
+
+        llb = [ max(D[0][i], B[0][i]) for i in range(3) ]
+        uub = [ min(D[1][i], B[1][i]) for i in range(3) ]
+        if any( uub[i] - llb[i] < 0 for i in range(3) ):
+            return None
+
+        vd = vb = vt = vo = 1.0
+        for i in range(3):
+            vt *= max(D[1][i], B[1][i]) - min(D[0][i], B[0][i])
+            vo *= uub[i] - llb[i]
+            vd *= D[1][i] - D[0][i]
+            vb *= B[1][i] - B[0][i]
+        if ( (vd + vb - vo) / vt <= MERGE_RATIO ):
+            return None
+
+        lower = [ min(D[0][i], B[0][i]) for i in range(3) ]
+        upper = [ max(D[1][i], B[1][i]) for i in range(3) ]
+        shape = [ self._points( upper[i] - lower[i], self._spacing(D[0], D[1], D[2], i) ) for i in range(3) ]
+        return [ lower, upper, shape ]
+
+    ## Parallel::cut_gsl splits strongly overlapping boxes into up to five patches; not rebuilt here
+    def _check_no_cut( self, boxes, lev ):
+
+        for d in range( len(boxes) ):
+            for b in range( d+1, len(boxes) ):
+                D, B = boxes[d], boxes[b]
+                width = [ min(D[1][i], B[1][i]) - max(D[0][i], B[0][i]) for i in range(3) ]
+                DH    = [ self._spacing(D[0], D[1], D[2], i) for i in range(3) ]
+                if all( width[i] >= DH[i] * 2 * (BUFFER_WIDTH + 2*GHOST_WIDTH) for i in range(3) ):
+                    raise ValueError( f"{self.filename}: level {lev} boxes are cut into sub-patches by ABE, "
+                                      "pass patch_shapes to read this checkpoint" )
+
+    ## Parallel::add_ghost_touch: ghost zones on faces where two boxes touch
+    def _add_ghost_touch( self, boxes ):
+
+        if ( len(boxes) < 2 ):
+            return
+
+        first = boxes[0]
+        DH    = [ self._spacing(first[0], first[1], first[2], i) / 2 for i in range(3) ]
+        clone = [ [ list(box[0]), list(box[1]), list(box[2]) ] for box in boxes ]
+
+        def feq( a, b, tolerance ):
+            return abs( a - b ) < tolerance
+
+        def overlap_elsewhere( C1, C2, i ):
+            for j in range(3):
+                if ( j != i
+                     and (C1[0][j] - C2[0][j]) * (C1[1][j] - C2[0][j]) > 0
+                     and (C2[0][j] - C1[0][j]) * (C2[1][j] - C1[0][j]) > 0 ):
+                    return False
+            return True
+
+        for a in range( len(boxes) ):
+            for b in range( a+1, len(boxes) ):
+                A1, A2 = boxes[a], boxes[b]
+                C1, C2 = clone[a], clone[b]
+                for i in range(3):
+                    if feq( C1[0][i], C2[1][i], DH[i] ) and overlap_elsewhere( C1, C2, i ):
+                        if feq( A1[0][i], C1[0][i], DH[i] ):
+                            A1[0][i] -= GHOST_WIDTH * 2 * DH[i]
+                            A1[2][i] += GHOST_WIDTH
+                        if feq( A2[1][i], C2[1][i], DH[i] ):
+                            A2[1][i] += GHOST_WIDTH * 2 * DH[i]
+                            A2[2][i] += GHOST_WIDTH
+                    if feq( C1[1][i], C2[0][i], DH[i] ) and overlap_elsewhere( C1, C2, i ):
+                        if feq( A1[1][i], C1[1][i], DH[i] ):
+                            A1[1][i] += GHOST_WIDTH * 2 * DH[i]
+                            A1[2][i] += GHOST_WIDTH
+                        if feq( A2[0][i], C2[0][i], DH[i] ):
+                            A2[0][i] -= GHOST_WIDTH * 2 * DH[i]
+                            A2[2][i] += GHOST_WIDTH
+
+    ## Patch::Patch: buffer zones around a box
+    def _patch( self, lev, index, box, buflog ):
+
+        llb, uub, shape = [ list(box[0]), list(box[1]), list(box[2]) ]
+        hbuffer = CS_WIDTH if lev == 0 else BUFFER_WIDTH
+
+        if buflog:
+            ## upper side, every axis
+            for i in range(3):
+                DH        = self._spacing( llb, uub, shape, i )
+                uub[i]   += hbuffer * DH
+                shape[i] += hbuffer
+
+            ## lower side, clamped at the symmetry planes
+            clamped = { 0: (), 1: (2,), 2: (0, 1, 2) }[self.symmetry]
+            for i in range(3):
+                DH = self._spacing( llb, uub, shape, i )
+                if i in clamped:
+                    lower  = max( 0.0, llb[i] - hbuffer * DH )
+                    points = int( (llb[i] - lower) / DH + 0.4 )
+                else:
+                    points = hbuffer
+                llb[i]   -= points * DH
+                shape[i] += points
+
+        return CheckpointPatch( lev, index, llb, uub, shape )
+
+    ## read(level, patch, variable)
+    ## Memory-map one checkpointed field; variable is a name or an index into variables.
+    def read( self, level, patch, variable ):
+
+        if isinstance( variable, str ):
+            if variable not in self.variables:
+                raise KeyError( f"{self.filename}: no variable {variable!r}" )
+            variable = self.variables.index( variable )
+        if not 0 <= variable < len(self.variables):
+            raise IndexError( f"variable index {variable} out of range" )
+
+        block = self.patches[level][patch]
+        nx, ny, nz = block.shape
+        return numpy.memmap( self.filename, dtype=numpy.float64, mode="r",
+                             offset=block.offset + variable * block.size * _VALUE_SIZE, shape=(nz, ny, nx) )
+
+    ## one-line summary per level, e.g. for printing the state of a killed run
+    def summary( self ):
+
+        lines = [ f"checkpoint time = {self.time}, levels = {self.levels}, movable levels = {self.movls}, "
+                  f"BHs = {self.bh_number}, variables = {len(self.variables)}" ]
+        for lev in range(self.levels):
+            lines.append( f"  level {lev}: Lt = {self.Lt[lev]}, grids = {self.grids[lev]}, "
+                          f"patches = {[ patch.shape for patch in self.patches[lev] ]}" )
+            for ibh in range(self.bh_number):
+                lines.append( f"    puncture {ibh}: {tuple(self.porgls[lev][ibh])}" )
+        return "\n".join( lines )
+
+#########################################################################################
@@ -0,0 +1,382 @@
+
+#################################################
+##
+## Chunked, compressed container for large AMSS-NCKU output files
+## (checkpoints, binary dumps).
+##
+## A source file is described as a list of named blocks (byte ranges). Every
+## block is compressed on its own with zlib or lzma from the standard
+## library, so blocks can be compressed by several processes and read back
+## individually. Each block carries a CRC32 of its original bytes and the
+## whole source a SHA-256, so a restore is verified to be byte-identical.
+##
+## Container layout:
+##   char    magic[8]               "AMSSCC01"
+##   uint64  index_offset, index_size   (little endian)
+##   compressed blocks, in source order
+##   JSON index: codec, level, source_size, sha256, metadata,
+##               blocks: [ { name, offset, size, stored_offset, stored_size, crc32 } ]
+##
+#################################################
+
+import os
+import json
+import bisect
+import lzma
+import zlib
+import struct
+import hashlib
+import multiprocessing
+
+
+#########################################################################################
+
+CONTAINER_MAGIC       = b"AMSSCC01"
+CONTAINER_HEADER      = struct.Struct( "<8sQQ" )
+CONTAINER_CODECS      = ( "zlib", "lzma", "none" )
+DEFAULT_CHUNK_SIZE    = 64 * 1024 * 1024      ## largest block in bytes
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## compress_block(data, codec, level) / decompress_block(data, codec)
+## Compression of one block, also used by writers that compress blocks themselves
+## (e.g. binary_data_archive) before ContainerWriter.add_compressed
+
+def compress_block( data, codec, level ):
+    if codec == "zlib":
+        return zlib.compress( data, level )
+    elif codec == "lzma":
+        return lzma.compress( data, preset=level )
+    return bytes( data )
+
+def decompress_block( data, codec ):
+    if codec == "zlib":
+        return zlib.decompress( data )
+    elif codec == "lzma":
+        return lzma.decompress( data )
+    return data
+
+## Worker: read one byte range of the source and compress it
+
+def _pack_block( task ):
+    source, offset, size, codec, level = task
+    with open( source, "rb" ) as file:
+        file.seek( offset )
+        data = file.read( size )
+    return zlib.crc32( data ), compress_block( data, codec, level )
+
+## Worker: CRC32 of one byte range of a file
+
+def _checksum_block( task ):
+    source, offset, size = task
+    with open( source, "rb" ) as file:
+        file.seek( offset )
+        return zlib.crc32( file.read( size ) )
+
+## ordered_map(function, tasks, processes)
+## Map over the tasks in order, with a process pool when processes != 1
+## (None: all cores); function must be a picklable module-level function.
+
+def ordered_map( function, tasks, processes ):
+    if processes == 1 or len(tasks) < 2:
+        for task in tasks:
+            yield function( task )
+        return
+    with multiprocessing.Pool( processes ) as pool:
+        for result in pool.imap( function, tasks ):
+            yield result
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## split_blocks(regions, file_size, chunk_size=DEFAULT_CHUNK_SIZE)
+## Turn named byte ranges [(name, offset, size), ...] into container blocks:
+## ranges larger than chunk_size are split ("<name>#<k>") and bytes not
+## covered by any range become "unlisted" blocks, so the blocks tile the
+## whole file and a restore is byte-identical.
+
+def split_blocks( regions, file_size, chunk_size=DEFAULT_CHUNK_SIZE ):
+
+    blocks   = []
+    position = 0
+
+    def add( name, offset, size ):
+        if ( size <= chunk_size ):
+            blocks.append( (name, offset, size) )
+            return
+        for k, start in enumerate( range(offset, offset + size, chunk_size) ):
+            blocks.append( ( f"{name}#{k}", start, min(chunk_size, offset + size - start) ) )
+
+    for name, offset, size in sorted( regions, key=lambda region: region[1] ):
+        if ( offset < position or offset + size > file_size ):
+            raise ValueError( f"block {name!r} ({offset}, {size}) overlaps another block or the end of the file" )
+        if ( offset > position ):
+            add( f"unlisted@{position}", position, offset - position )
+        if ( size > 0 ):
+            add( name, offset, size )
+        position = offset + size
+
+    if ( position < file_size ):
+        add( f"unlisted@{position}", position, file_size - position )
+
+    return blocks
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## block_checksums(filename, blocks, processes=None)
+## CRC32 of every (name, offset, size) block of a file, computed in parallel.
+
+def block_checksums( filename, blocks, processes=None ):
+
+    tasks = [ (filename, offset, size) for _, offset, size in blocks ]
+    return list( ordered_map( _checksum_block, tasks, processes ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## write_container(source, destination, blocks, codec="zlib", level=6, processes=None, metadata=None, chunk_size=DEFAULT_CHUNK_SIZE)
+## Compress the blocks of source into a container file; blocks are split and
+## completed by split_blocks.
+## Blocks are compressed by a pool of processes (processes=None uses all
+## cores, 1 disables the pool) and written in source order.
+## Return the ContainerFile of the new container.
+
+def write_container( source, destination, blocks, codec="zlib", level=6, processes=None, metadata=None,
+                     chunk_size=DEFAULT_CHUNK_SIZE ):
+
+    source_size = os.path.getsize( source )
+    blocks      = split_blocks( blocks, source_size, chunk_size )
+    tasks       = [ (source, offset, size, codec, level) for _, offset, size in blocks ]
+
+    writer = ContainerWriter( destination, codec, level, metadata )
+    try:
+        for (name, offset, size), (crc, data) in zip( blocks, ordered_map( _pack_block, tasks, processes ) ):
+            writer.add_compressed( name, size, crc, data, offset=offset )
+    except BaseException:
+        writer.abort()
+        raise
+
+    ## whole-file digest, streamed in source order
+    digest = hashlib.sha256()
+    with open( source, "rb" ) as original:
+        for chunk in iter( lambda: original.read(DEFAULT_CHUNK_SIZE), b"" ):
+            digest.update( chunk )
+
+    return writer.close( source_size=source_size, sha256=digest.hexdigest() )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## ContainerWriter(destination, codec="zlib", level=6, metadata=None)
+## Append compressed blocks to a new container; the index is written by close().
+## The container is built under a temporary name and only appears at
+## destination once it is complete.
+##
+##  - add(name, data, info=None)                          compress and append raw bytes
+##  - add_compressed(name, size, crc, payload, info=None) append a block compressed elsewhere
+##  - close(source_size=None, sha256=None)                write the index, return the ContainerFile
+##
+## info is a JSON-serialisable dict stored with the block in the index.
+
+class ContainerWriter:
+
+    def __init__( self, destination, codec="zlib", level=6, metadata=None ):
+
+        if codec not in CONTAINER_CODECS:
+            raise ValueError( f"unknown codec {codec!r}, choose one of {CONTAINER_CODECS}" )
+
+        self.destination = destination
+        self.codec       = codec
+        self.level       = level
+        self.metadata    = metadata or {}
+        self.entries     = []
+        self._names      = set()
+        self._position   = 0
+        self._temporary  = destination + f".{os.getpid()}.tmp"
+        self._file       = open( self._temporary, "wb" )
+        self._file.write( CONTAINER_HEADER.pack( CONTAINER_MAGIC, 0, 0 ) )
+
+    def add( self, name, data, info=None, offset=None ):
+        return self.add_compressed( name, len(data), zlib.crc32(data), compress_block(data, self.codec, self.level), info, offset )
+
+    def add_compressed( self, name, size, crc, payload, info=None, offset=None ):
+
+        if name in self._names:
+            raise ValueError( f"duplicate block name {name!r}" )
+        self._names.add( name )
+
+        entry = { "name": name, "offset": self._position if offset is None else offset, "size": size,
+                  "stored_offset": self._file.tell(), "stored_size": len(payload), "crc32": crc }
+        if info is not None:
+            entry["info"] = info
+        self._file.write( payload )
+        self.entries.append( entry )
+        self._position = entry["offset"] + size
+        return entry
+
+    def close( self, source_size=None, sha256=None ):
+
+        if source_size is None:
+            source_size = self._position
+        index = json.dumps( { "codec": self.codec, "level": self.level, "source_size": source_size,
+                              "sha256": sha256, "metadata": self.metadata, "blocks": self.entries } ).encode()
+        index_offset = self._file.tell()
+        self._file.write( index )
+        self._file.seek( 0 )
+        self._file.write( CONTAINER_HEADER.pack( CONTAINER_MAGIC, index_offset, len(index) ) )
+        self._file.close()
+        os.replace( self._temporary, self.destination )
+
+        return ContainerFile( self.destination )
+
+    ## drop the partial container, e.g. after an error while packing
+    def abort( self ):
+        self._file.close()
+        if os.path.exists( self._temporary ):
+            os.remove( self._temporary )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## ContainerFile(filename)
+## Random access to a container written by write_container.
+##
+## Attributes: codec, source_size, sha256, metadata, blocks (index entries),
+## names (block names in source order).
+##
+##  - read_block(name)          original bytes of one block (CRC checked)
+##  - read_range(offset, size)  original bytes of any byte range of the source;
+##                              only the overlapping blocks are decompressed
+##  - verify(processes)         names of blocks whose CRC does not match
+##  - restore(destination)      rebuild the source file, checking its SHA-256
+##                              (when the container was made from one file)
+
+class ContainerFile:
+
+    def __init__( self, filename ):
+
+        self.filename = filename
+        with open( filename, "rb" ) as file:
+            head = file.read( CONTAINER_HEADER.size )
+            if ( len(head) != CONTAINER_HEADER.size ):
+                raise ValueError( f"{filename}: not a chunked container" )
+            magic, index_offset, index_size = CONTAINER_HEADER.unpack( head )
+            if ( magic != CONTAINER_MAGIC or index_offset == 0 ):
+                raise ValueError( f"{filename}: not a chunked container (or not completely written)" )
+            file.seek( index_offset )
+            index = json.loads( file.read( index_size ) )
+
+        self.codec       = index["codec"]
+        self.source_size = index["source_size"]
+        self.sha256      = index["sha256"]
+        self.metadata    = index["metadata"]
+        self.blocks      = index["blocks"]
+        self.names       = [ block["name"] for block in self.blocks ]
+        self._by_name    = { block["name"]: block for block in self.blocks }
+        self._starts     = [ block["offset"] for block in self.blocks ]
+        self._cached     = ( None, None )    ## last decompressed block
+
+    def _block( self, key ):
+        if isinstance( key, int ):
+            return self.blocks[key]
+        if key not in self._by_name:
+            raise KeyError( f"{self.filename}: no block {key!r}" )
+        return self._by_name[key]
+
+    ## original bytes of one block, by name or index
+    def read_block( self, key ):
+
+        block = self._block( key )
+        if self._cached[0] is block:
+            return self._cached[1]
+
+        with open( self.filename, "rb" ) as file:
+            file.seek( block["stored_offset"] )
+            data = decompress_block( file.read( block["stored_size"] ), self.codec )
+        if ( len(data) != block["size"] or zlib.crc32(data) != block["crc32"] ):
+            raise ValueError( f"{self.filename}: block {block['name']!r} is corrupted" )
+
+        self._cached = ( block, data )
+        return data
+
+    ## original bytes [offset, offset+size) of the source file
+    def read_range( self, offset, size ):
+
+        if ( offset < 0 or offset + size > self.source_size ):
+            raise ValueError( f"range ({offset}, {size}) outside the source of {self.source_size} bytes" )
+
+        pieces = []
+        index  = bisect.bisect_right( self._starts, offset ) - 1
+        while ( size > 0 ):
+            block = self.blocks[index]
+            data  = self.read_block( index )
+            start = offset - block["offset"]
+            piece = data[start:start + size]
+            pieces.append( piece )
+            offset += len(piece)
+            size   -= len(piece)
+            index  += 1
+        return b"".join( pieces )
+
+    ## check every block against its CRC32; return the names of the bad blocks
+    def verify( self, processes=None ):
+
+        tasks   = [ (self.filename, block["stored_offset"], block["stored_size"], self.codec, block["size"], block["crc32"])
+                    for block in self.blocks ]
+        results = ordered_map( _verify_block, tasks, processes )
+        return [ block["name"] for block, ok in zip( self.blocks, results ) if not ok ]
+
+    ## write the original file back and check its SHA-256
+    def restore( self, destination ):
+
+        digest    = hashlib.sha256()
+        temporary = destination + f".{os.getpid()}.tmp"
+        with open( temporary, "wb" ) as file:
+            for index in range( len(self.blocks) ):
+                data = self.read_block( index )
+                digest.update( data )
+                file.write( data )
+        if ( self.sha256 is not None and digest.hexdigest() != self.sha256 ):
+            os.remove( temporary )
+            raise ValueError( f"{self.filename}: restored data does not match the recorded SHA-256" )
+        os.replace( temporary, destination )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Worker: decompress one stored block and compare size and CRC32
+
+def _verify_block( task ):
+    filename, stored_offset, stored_size, codec, size, crc = task
+    with open( filename, "rb" ) as file:
+        file.seek( stored_offset )
+        try:
+            data = decompress_block( file.read( stored_size ), codec )
+        except ( zlib.error, lzma.LZMAError ):
+            return False
+    return len(data) == size and zlib.crc32(data) == crc
+
+#########################################################################################
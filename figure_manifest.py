@@ -0,0 +1,110 @@
+
+#################################################
+##
+## Build manifest of a figure directory
+##
+## figure_manifest.json records, for every rendered input file, a key made
+## from the file (header bytes, size, mtime) and the plot parameters, and the
+## figures it produced. On a re-run only inputs whose key changed or whose
+## figures are missing are rendered again. A dump inside an archive
+## ("<archive>::<member>") is keyed by its own index record instead, so
+## re-packing an archive leaves the figures of unchanged dumps current.
+##
+#################################################
+
+import os
+import json
+import hashlib
+
+import binary_data_reader
+import binary_data_archive
+
+
+#########################################################################################
+
+## Name of the manifest inside the figure directory
+
+MANIFEST_FILENAME = "figure_manifest.json"
+
+## Bytes of an input file hashed into its key (the Parallel::writefile header)
+
+MANIFEST_HEADER_BYTES = binary_data_reader.BINARY_HEADER_SIZE
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## source_key(filename, parameters)
+## Hex digest identifying an input file and the parameters it is plotted with.
+## For "<archive>::<member>" the member's index record (header fields and the
+## CRC32 of its payload) is hashed instead of the archive file.
+
+def source_key( filename, parameters ):
+
+    path, _, member = filename.partition( binary_data_archive.ARCHIVE_MEMBER_SEPARATOR )
+    digest = hashlib.sha256()
+    if member:
+        archive = binary_data_archive.open_archive( path )
+        record  = [ member, archive.info( member ), archive.checksum( member ) ]
+    else:
+        stat   = os.stat( path )
+        with open( path, "rb" ) as file:
+            digest.update( file.read( MANIFEST_HEADER_BYTES ) )
+        record = [ member, stat.st_size, stat.st_mtime_ns ]
+    digest.update( json.dumps( record + [ parameters ], sort_keys=True, default=str ).encode() )
+
+    return digest.hexdigest()
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## FigureManifest(figure_outdir)
+## Manifest of one figure directory; figure paths are stored relative to it.
+##
+##  - is_current(source, key)      the recorded key matches and all recorded figures exist
+##  - record(source, key, outputs) remember the figures rendered from source
+##  - save()                       write the manifest (atomically)
+
+class FigureManifest:
+
+    def __init__( self, figure_outdir ):
+
+        self.figure_outdir = figure_outdir
+        self.filename      = os.path.join( figure_outdir, MANIFEST_FILENAME )
+        self.entries       = {}
+
+        if os.path.exists( self.filename ):
+            try:
+                with open( self.filename, encoding="utf-8" ) as file:
+                    self.entries = json.load( file )["figures"]
+            except ( ValueError, KeyError, TypeError ):
+                print( " Ignoring unreadable figure manifest", self.filename )
+                self.entries = {}
+
+    def is_current( self, source, key ):
+
+        entry = self.entries.get( os.path.abspath(source) )
+        if entry is None or entry["key"] != key or not entry["outputs"]:
+            return False
+        return all( os.path.exists( os.path.join(self.figure_outdir, output) ) for output in entry["outputs"] )
+
+    def record( self, source, key, outputs ):
+
+        self.entries[ os.path.abspath(source) ] = {
+            "key":     key,
+            "outputs": [ os.path.relpath( output, self.figure_outdir ) for output in outputs ],
+        }
+
+    def save( self ):
+
+        temporary = self.filename + ".tmp"
+        with open( temporary, "w", encoding="utf-8" ) as file:
+            json.dump( { "figures": self.entries }, file, indent=1, sort_keys=True )
+        os.replace( temporary, self.filename )
+
+#########################################################################################
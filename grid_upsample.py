@@ -0,0 +1,89 @@
+
+#################################################
+##
+## Upsampling of regular Cartesian slices for plotting
+##
+## The dumps written by Parallel::writefile sit on a tensor-product grid, so a
+## 2D slice is refined by a cubic spline along x followed by one along y. A
+## cubic spline is linear in the data, which makes each 1D pass a matrix
+## product with a fixed (n_new, n) weight matrix. The matrices depend only on
+## the numbers of points and are cached, so consecutive dumps of the same
+## shape reuse them.
+##
+#################################################
+
+import functools
+import numpy
+import scipy.interpolate
+
+
+#########################################################################################
+
+## grid_coordinates(rmin, rmax, n, centering="Cell")
+## Coordinates of the n points along one axis of a dump with bounding box [rmin, rmax]:
+##   Cell:   rmin + (i + 1/2) * dx   with dx = (rmax - rmin) / n
+##   Vertex: rmin + i * dx           with dx = (rmax - rmin) / (n - 1)
+
+def grid_coordinates( rmin, rmax, n, centering="Cell" ):
+
+    if centering == "Vertex":
+        return numpy.linspace( rmin, rmax, n )
+    elif centering == "Cell":
+        dx = ( rmax - rmin ) / n
+        return rmin + ( numpy.arange(n) + 0.5 ) * dx
+    else:
+        raise ValueError( f"unknown centering {centering!r}, choose 'Cell' or 'Vertex'" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## spline_weights(n, n_new)
+## (n_new, n) matrix W such that W @ f is the not-a-knot cubic spline through
+## the n samples f, evaluated at n_new points evenly spread from the first to
+## the last sample. Cached and read-only.
+
+@functools.lru_cache( maxsize=32 )
+def spline_weights( n, n_new ):
+
+    if n == 1:
+        weights = numpy.ones( (n_new, 1) )
+    else:
+        index   = numpy.arange( n, dtype=float )
+        target  = numpy.linspace( 0.0, n - 1.0, n_new )
+        weights = scipy.interpolate.CubicSpline( index, numpy.eye(n) )( target )
+
+    weights.flags.writeable = False
+    return weights
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## upsample_plane(data, rmin, rmax, factor=2.5, centering="Cell")
+## Refine a slice data[ny, nx] with bounding box rmin = (xmin, ymin), rmax = (xmax, ymax)
+## by factor along both axes, with separable cubic splines.
+##
+## Return x_new, y_new, data_new with data_new[j, i] the value at (x_new[i], y_new[j]).
+## The new points span the sample points (cell centres for Cell, the box for Vertex),
+## so nothing is extrapolated.
+
+def upsample_plane( data, rmin, rmax, factor=2.5, centering="Cell" ):
+
+    ny, nx = data.shape
+    x      = grid_coordinates( rmin[0], rmax[0], nx, centering )
+    y      = grid_coordinates( rmin[1], rmax[1], ny, centering )
+    nx_new = max( int(factor * nx), 1 )
+    ny_new = max( int(factor * ny), 1 )
+
+    x_new    = numpy.linspace( x[0], x[-1], nx_new )
+    y_new    = numpy.linspace( y[0], y[-1], ny_new )
+    data_new = spline_weights( ny, ny_new ) @ numpy.asarray( data, dtype=float ) @ spline_weights( nx, nx_new ).T
+
+    return x_new, y_new, data_new
+
+#########################################################################################
@@ -0,0 +1,579 @@
+
+#################################################
+##
+## Fast loader for the monitor text files (*.dat) written by monitor::monitor
+## in the AMSS-NCKU ABE executable (bssn_psi4.dat, bssn_BH.dat,
+## bssn_ADMQs.dat, bssn_constraint.dat, ...).
+##
+## File layout:
+##   # File created on <date>
+##   #
+##          # time  <column names ...>
+##   <time> <value> <value> ...               (one row per monitor::writefile call)
+##
+## The numbers are parsed in one pass by numpy's C text parser and stored in
+## a binary sidecar (<file>.cache.npz) next to the text file. The sidecar
+## records the size and mtime of the text file and is rebuilt whenever
+## either of them changes.
+##
+## After a checkpoint restart monitor::monitor does not overwrite the file
+## but starts 1_<name>, 2_<name>, ...; load_monitor_series stitches these
+## segments back into one series, and MonitorFollower does the same
+## incrementally while the run is still writing.
+##
+#################################################
+
+import os
+import re
+import numpy
+
+
+#########################################################################################
+
+## Suffix of the binary sidecar written next to a monitor file
+
+MONITOR_CACHE_SUFFIX = ".cache.npz"
+
+## Stitched series already built in this process, keyed by segment state
+
+_SERIES_CACHE = {}
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## MonitorData(filename, columns, data)
+## Parsed contents of one monitor file.
+##
+## Attributes:
+##  - filename: path of the text file
+##  - columns:  column names from the header line; columns without a name in
+##              the header (e.g. the puncture positions in bssn_BH.dat) are
+##              called "column<index>"
+##  - data:     2D array, one row per line of the file
+##
+## data["R02m002"] (or data.column("R02m002")) returns one column as a view.
+
+class MonitorData:
+
+    def __init__( self, filename, columns, data ):
+
+        self.filename = filename
+        self.columns  = list( columns )
+        self.data     = data
+        self._index   = { name: i for i, name in enumerate(self.columns) }
+
+    def __len__( self ):
+        return self.data.shape[0]
+
+    def __getitem__( self, name ):
+        return self.column( name )
+
+    def column( self, name ):
+        if name not in self._index:
+            raise KeyError( f"{self.filename}: no column {name!r}, available columns are {self.columns}" )
+        return self.data[:, self._index[name]]
+
+    ## first column of every monitor file
+    @property
+    def time( self ):
+        return self.data[:, 0]
+
+    ## demultiplex(block_size)
+    ## Rows split by detector / grid level, see demultiplex() below.
+    def demultiplex( self, block_size ):
+        return demultiplex( self.data, block_size )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## demultiplex(data, block_size)
+## Split interleaved monitor rows into a zero-copy strided view.
+##
+## bssn_psi4.dat and bssn_ADMQs.dat write one row per detector at every output
+## time, bssn_constraint.dat one row per grid level, so row j*block_size + i
+## belongs to detector (level) i at sample j. The result has the shape
+## (block_size, sample, column) and result[i] is the series of detector i.
+## A truncated last block (a run killed while writing the rows of one output
+## time) is dropped.
+
+def demultiplex( data, block_size ):
+
+    if ( block_size < 1 ):
+        raise ValueError( f"block size must be positive, got {block_size}" )
+
+    nsample = data.shape[0] // block_size
+    ncolumn = data.shape[1]
+
+    return data[:nsample*block_size].reshape( (nsample, block_size, ncolumn) ).transpose( (1, 0, 2) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## constraint_levels(grid_level, basic_grid_set)
+## Rows per output time of bssn_constraint.dat and the block index of grid level 0.
+## With basic_grid_set = "Shell-Patch" the shell is written as an extra level
+## before level 0.
+
+def constraint_levels( grid_level, basic_grid_set ):
+
+    if basic_grid_set == "Shell-Patch":
+        return grid_level + 1, 1
+    return grid_level, 0
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## load_monitor_data(filename, use_cache=True)
+## Return the MonitorData of one monitor file, from the sidecar when it is
+## still valid, otherwise by parsing the text (and refreshing the sidecar).
+
+def load_monitor_data( filename, use_cache=True ):
+
+    stat       = os.stat( filename )
+    cache_file = filename + MONITOR_CACHE_SUFFIX
+
+    if use_cache:
+        cached = _read_cache( cache_file, stat )
+        if cached is not None:
+            return MonitorData( filename, *cached )
+
+    columns, data = parse_monitor_file( filename )
+
+    if use_cache:
+        _write_cache( cache_file, stat, columns, data )
+
+    return MonitorData( filename, columns, data )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## find_monitor_segments(directory, name)
+## Return the segment files of one monitor series: name, 1_name, 2_name, ...
+## in the order monitor::monitor created them.
+
+def find_monitor_segments( directory, name ):
+
+    pattern  = re.compile( r"^(?:(\d+)_)?" + re.escape(name) + "$" )
+    segments = []
+    for entry in os.listdir( directory ):
+        match = pattern.match( entry )
+        if match is not None:
+            segments.append( ( int(match.group(1) or 0), os.path.join(directory, entry) ) )
+
+    return [ filename for _, filename in sorted(segments) ]
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## load_monitor_series(directory, name, block_size=1, use_cache=True)
+## Stitch all segments of a monitor series into one continuous MonitorData.
+##
+## Every segment is parsed on its own (and keeps its own sidecar), so the
+## text files are never concatenated. Segments are ordered by their first
+## time; the rows of an earlier segment from the restart time onwards were
+## re-emitted by the restarted run and are dropped, so the later segment wins.
+## block_size is the number of rows per output time (detectors or levels);
+## segments are cut at whole blocks so the result can still be demultiplexed.
+## The stitched array is kept in memory until one of the segments changes.
+
+def load_monitor_series( directory, name, block_size=1, use_cache=True ):
+
+    filenames = find_monitor_segments( directory, name )
+    if not filenames:
+        raise FileNotFoundError( f"no monitor file {name} in {directory}" )
+
+    state  = tuple( (filename, os.stat(filename).st_size, os.stat(filename).st_mtime_ns) for filename in filenames )
+    key    = ( os.path.abspath(directory), name, block_size )
+    cached = _SERIES_CACHE.get( key )
+    if use_cache and cached is not None and cached[0] == state:
+        return cached[1]
+
+    loaded   = [ load_monitor_data( filename, use_cache ) for filename in filenames ]
+    columns  = loaded[0].columns
+    segments = []
+    for segment in loaded:
+        nblock = len( segment ) // block_size
+        if nblock > 0:
+            segments.append( segment.data[:nblock*block_size] )
+    segments.sort( key=lambda data: data[0, 0] )
+
+    pieces = []
+    for current, following in zip( segments, segments[1:] + [None] ):
+        if following is not None:
+            ## keep the blocks of this segment that start before the restart
+            nblock  = numpy.searchsorted( current[::block_size, 0], following[0, 0], side="left" )
+            current = current[:nblock*block_size]
+        pieces.append( current )
+
+    if not pieces:
+        data = numpy.zeros( (0, len(columns)) )
+    elif len(pieces) == 1:
+        data = pieces[0]
+    else:
+        data = numpy.concatenate( pieces )
+    series = MonitorData( os.path.join(directory, name), columns, data )
+
+    if use_cache:
+        _SERIES_CACHE[key] = ( state, series )
+    return series
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## RunData(directory)
+## Monitor data of one run, loaded once and shared by the analysis and plot
+## functions (which take a RunData wherever they take the data directory).
+##
+##  - series(name):             stitched MonitorData of a monitor file, loaded on first use
+##  - blocks(name, block_size): series demultiplexed into (block, sample, column), e.g.
+##                              blocks("bssn_psi4.dat", Detector_Number)
+##  - cache:                    dict for results derived from the data (spectra, waveforms, ...)
+##  - refresh():                forget everything, e.g. after the run wrote more output
+##
+## Unlike load_monitor_series, the files are not checked for changes after the
+## first load, so repeated lookups cost a dictionary access.
+##
+## Typical use:
+##   run = RunData( binary_results_directory )
+##   for i in range(input_data.Detector_Number):
+##       plot_xiaoqu.generate_gravitational_wave_psi4_plot( run, figure_directory, i )
+
+class RunData:
+
+    def __init__( self, directory, use_cache=True ):
+
+        self.directory = directory
+        self.use_cache = use_cache
+        self.cache     = {}
+        self._series   = {}
+        self._blocks   = {}
+
+    def path( self, name ):
+        return os.path.join( self.directory, name )
+
+    def series( self, name, block_size=1 ):
+        key = ( name, block_size )
+        if key not in self._series:
+            self._series[key] = load_monitor_series( self.directory, name, block_size, self.use_cache )
+        return self._series[key]
+
+    def blocks( self, name, block_size ):
+        key = ( name, block_size )
+        if key not in self._blocks:
+            self._blocks[key] = self.series( name, block_size ).demultiplex( block_size )
+        return self._blocks[key]
+
+    def refresh( self ):
+        self.cache.clear()
+        self._series.clear()
+        self._blocks.clear()
+
+## open_run(source)
+## RunData for a data directory; a RunData is returned unchanged.
+
+def open_run( source ):
+
+    if isinstance( source, RunData ):
+        return source
+    return RunData( source )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## MonitorFollower(directory, name, block_size=1, max_samples=None)
+## Follow a monitor series while ABE is still writing it.
+##
+## poll() reads only the complete lines appended since the last call (a byte
+## offset is kept for the current segment) and appends them to a growable
+## row buffer. Rows are committed in whole blocks of block_size rows (one per
+## detector or level), so demultiplex() always returns a consistent
+## (block, sample, column) view. With max_samples the oldest samples are
+## discarded and the buffer rolls.
+##
+## When a restart starts a new segment (N_name), the rest of the current
+## segment is read first, then the follower switches over and drops the
+## buffered samples from the restart time onwards. A segment that shrinks
+## (replaced by another run) is re-read from the beginning.
+##
+## Typical use:
+##   follower = MonitorFollower( outdir, "bssn_psi4.dat", input_data.Detector_Number )
+##   while run_is_active:
+##       if follower.poll():
+##           update_plot( follower.demultiplex() )
+##       time.sleep( 30 )
+
+class MonitorFollower:
+
+    def __init__( self, directory, name, block_size=1, max_samples=None ):
+
+        if ( block_size < 1 ):
+            raise ValueError( f"block size must be positive, got {block_size}" )
+
+        self.directory   = directory
+        self.name        = name
+        self.block_size  = block_size
+        self.max_samples = max_samples
+        self.columns     = []
+
+        self._segment     = None     ## path of the segment being followed
+        self._offset      = 0        ## bytes of that segment already consumed
+        self._header      = True     ## still inside the leading comment lines
+        self._header_line = ""       ## last comment line seen, gives the column names
+        self._restart     = False    ## first rows of a new segment not seen yet
+        self._pending     = None     ## rows of an incomplete block
+        self._buffer      = None
+        self._start       = 0
+        self._stop        = 0
+        self._appended    = 0
+
+    ## number of complete samples per block held in the buffer
+    def __len__( self ):
+        return ( self._stop - self._start ) // self.block_size
+
+    ## committed rows, shape (rows, column)
+    @property
+    def data( self ):
+        if self._buffer is None:
+            return numpy.zeros( (0, len(self.columns)) )
+        return self._buffer[self._start:self._stop]
+
+    ## zero-copy view shaped (block, sample, column); valid until the next poll()
+    def demultiplex( self ):
+        return demultiplex( self.data, self.block_size )
+
+    ## poll()
+    ## Consume newly appended lines of the series; return the number of new samples per block.
+    def poll( self ):
+
+        self._appended = 0
+        segments = find_monitor_segments( self.directory, self.name ) if os.path.isdir( self.directory ) else []
+
+        if self._segment is None:
+            if not segments:
+                return 0
+            self._open_segment( segments[0] )
+
+        while True:
+            self._read_segment()
+            later = segments[ segments.index(self._segment) + 1: ] if self._segment in segments else []
+            if not later:
+                break
+            ## a restart began a new segment: the incomplete block of the old one is lost
+            self._pending = None
+            self._open_segment( later[0] )
+            self._restart = True
+
+        return self._appended // self.block_size
+
+    def _open_segment( self, filename ):
+        self._segment = filename
+        self._offset  = 0
+        self._header  = True
+
+    ## read the complete lines appended to the current segment
+    def _read_segment( self ):
+
+        try:
+            size = os.path.getsize( self._segment )
+        except OSError:
+            return
+        if ( size < self._offset ):
+            ## the file was replaced: read it again and let it overwrite the buffered samples
+            self._open_segment( self._segment )
+            self._pending = None
+            self._restart = True
+        if ( size == self._offset ):
+            return
+
+        with open( self._segment, "rb" ) as file:
+            file.seek( self._offset )
+            text = file.read( size - self._offset )
+        end = text.rfind( b"\n" ) + 1
+        if ( end == 0 ):
+            return
+        self._offset += end
+        text          = text[:end]
+
+        if self._header:
+            header, text = _split_header( text )
+            if header:
+                self._header_line = header
+            if not text.strip():
+                return
+            self._header = False
+
+        ncolumn = len(self.columns) if self.columns else None
+        rows    = _parse_rows( text, self._segment, ncolumn )
+        if ( rows.size == 0 ):
+            return
+        if not self.columns:
+            self.columns = _column_names( self._header_line, rows.shape[1] )
+
+        if self._restart:
+            self._drop_from( rows[0, 0] )
+            self._restart = False
+
+        if self._pending is not None:
+            rows = numpy.concatenate( (self._pending, rows) )
+        complete      = ( rows.shape[0] // self.block_size ) * self.block_size
+        self._pending = rows[complete:] if complete < rows.shape[0] else None
+        if complete > 0:
+            self._append( rows[:complete] )
+
+    ## drop buffered blocks at or after time (re-emitted by a restarted run)
+    def _drop_from( self, time ):
+        block_times = self.data[::self.block_size, 0]
+        nblock      = numpy.searchsorted( block_times, time, side="left" )
+        self._stop  = self._start + nblock * self.block_size
+
+    ## append whole blocks, growing the buffer geometrically and rolling it when max_samples is set
+    def _append( self, rows ):
+
+        if self._buffer is None:
+            self._buffer = numpy.empty( (max(1024, rows.shape[0]), rows.shape[1]) )
+
+        if ( self._stop + rows.shape[0] > self._buffer.shape[0] ):
+            live = self._buffer[self._start:self._stop]
+            size = self._buffer.shape[0]
+            while ( live.shape[0] + rows.shape[0] > size // 2 ):
+                size *= 2
+            if self.max_samples is not None:
+                size = max( 2 * self.max_samples * self.block_size, live.shape[0] + rows.shape[0] )
+            buffer = numpy.empty( (size, self._buffer.shape[1]) )
+            buffer[:live.shape[0]] = live
+            self._buffer = buffer
+            self._start  = 0
+            self._stop   = live.shape[0]
+
+        self._buffer[self._stop:self._stop + rows.shape[0]] = rows
+        self._stop     += rows.shape[0]
+        self._appended += rows.shape[0]
+
+        if self.max_samples is not None:
+            self._start = max( self._start, self._stop - self.max_samples * self.block_size )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## parse_monitor_file(filename)
+## Parse a monitor file into (column names, 2D array).
+## Comment lines are skipped; the last comment line is taken as the header.
+## A trailing line without newline (the run is still writing it) is dropped.
+
+def parse_monitor_file( filename ):
+
+    with open( filename, "rb" ) as file:
+        text = file.read()
+
+    ## drop a partially written last line
+    end  = text.rfind( b"\n" ) + 1
+    text = text[:end]
+
+    header, body = _split_header( text )
+    data         = _parse_rows( body, filename )
+
+    return _column_names( header, data.shape[1] ), data
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Split complete lines into the last leading comment line (the header) and the rest
+
+def _split_header( text ):
+
+    header = ""
+    start  = 0
+    while start < len(text):
+        stop = text.find( b"\n", start ) + 1
+        line = text[start:stop].strip()
+        if line and not line.startswith( b"#" ):
+            break
+        if line.startswith( b"#" ) and len(line) > 1:
+            header = line.decode()
+        start = stop
+
+    return header, text[start:]
+
+## Parse complete data lines into a 2D array; ncolumn defaults to the width of the first line
+
+def _parse_rows( body, filename, ncolumn=None ):
+
+    ## comment lines further down (monitor::print_message) are removed line by line
+    if b"#" in body:
+        body = b"\n".join( line for line in body.split(b"\n") if not line.lstrip().startswith(b"#") )
+
+    if ncolumn is None:
+        ncolumn = len( body.lstrip().split( b"\n", 1 )[0].split() )
+    if ncolumn == 0:
+        return numpy.zeros( (0, 0) )
+
+    values = numpy.fromstring( body.decode(), sep=" " )
+    if ( values.size % ncolumn != 0 ):
+        raise ValueError( f"{filename}: {values.size} values do not fill rows of {ncolumn} columns" )
+
+    return values.reshape( (-1, ncolumn) )
+
+## Column names from the header line "# time R02m-02 I02m-02 ..."
+
+def _column_names( header, ncolumn ):
+
+    names = header.lstrip( "#" ).split()[:ncolumn]
+    return names + [ f"column{i}" for i in range( len(names), ncolumn ) ]
+
+## Load the sidecar if it belongs to the current state of the text file
+
+def _read_cache( cache_file, stat ):
+
+    try:
+        with numpy.load( cache_file ) as cache:
+            if ( int(cache["source_size"]) != stat.st_size or int(cache["source_mtime"]) != stat.st_mtime_ns ):
+                return None
+            return [ str(name) for name in cache["columns"] ], cache["data"]
+    except ( OSError, KeyError, ValueError ):
+        return None
+
+## Write the sidecar atomically; a read-only run directory just means no cache
+
+def _write_cache( cache_file, stat, columns, data ):
+
+    temporary = cache_file + f".{os.getpid()}.tmp"
+    try:
+        with open( temporary, "wb" ) as file:
+            numpy.savez( file, data=data, columns=numpy.array(columns, dtype=str),
+                         source_size=stat.st_size, source_mtime=stat.st_mtime_ns )
+        os.replace( temporary, cache_file )
+    except OSError:
+        if os.path.exists( temporary ):
+            os.remove( temporary )
+
+#########################################################################################
@@ -0,0 +1,224 @@
+
+#################################################
+##
+## Orbital dynamics of the punctures from bssn_BH.dat
+##
+## bssn_BH.dat holds one row per output time: time followed by x, y, z of
+## every puncture. All quantities below are computed on whole arrays:
+##
+##  - pairwise separations of N punctures
+##  - orbital phase and frequency of the relative trajectory of a pair
+##  - merger time (separation drops below a threshold)
+##  - eccentricity from a leading-order post-Newtonian fit of the orbital
+##    frequency, omega_fit(t) = A (t_c - t)^(-3/8), which is a straight line
+##    in omega^(-8/3); e(t) = (omega - omega_fit) / (2 omega_fit) oscillates
+##    with amplitude e
+##
+## analyze_orbit() collects these into a small dictionary that is stored in
+## the run summary (run_summary.py).
+##
+#################################################
+
+import numpy
+
+import monitor_data
+import run_summary
+
+
+#########################################################################################
+
+## Separation below which a pair counts as merged [M] (coordinate separation of
+## the punctures; a common apparent horizon exists well before this)
+
+MERGER_SEPARATION = 1.0
+
+## Part of the inspiral used for the eccentricity fit: the first part carries the
+## junk radiation of the initial data, the last part is beyond the reach of the PN fit
+
+ECCENTRICITY_WINDOW = ( 0.15, 0.75 )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## puncture_positions(data, puncture_number)
+## Positions as an array view shaped (puncture, time, xyz).
+
+def puncture_positions( data, puncture_number ):
+
+    positions = data[:, 1:1+3*puncture_number]
+    return positions.reshape( len(data), puncture_number, 3 ).transpose( 1, 0, 2 )
+
+## pairwise_separations(positions)
+## Separations of all pairs i < j: returns (pairs, separations) with pairs a list
+## of (i, j) and separations shaped (pair, time).
+
+def pairwise_separations( positions ):
+
+    first, second = numpy.triu_indices( len(positions), k=1 )
+    separations   = numpy.linalg.norm( positions[second] - positions[first], axis=-1 )
+    return list( zip( first.tolist(), second.tolist() ) ), separations
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## orbital_phase(relative)
+## Unwrapped phase of a relative trajectory relative[time, xyz], measured in
+## the plane orthogonal to its mean orbital angular momentum r x dr.
+
+def orbital_phase( relative ):
+
+    normal = numpy.cross( relative[:-1], numpy.diff( relative, axis=0 ) ).sum( axis=0 )
+    norm   = numpy.linalg.norm( normal )
+    normal = normal / norm if norm > 0.0 else numpy.array( [0.0, 0.0, 1.0] )
+
+    ## in-plane basis: e1 along the projection of the first separation vector
+    e1 = relative[0] - numpy.dot( relative[0], normal ) * normal
+    if numpy.linalg.norm( e1 ) == 0.0:
+        e1 = numpy.cross( normal, [1.0, 0.0, 0.0] if abs(normal[0]) < 0.9 else [0.0, 1.0, 0.0] )
+    e1 = e1 / numpy.linalg.norm( e1 )
+    e2 = numpy.cross( normal, e1 )
+
+    return numpy.unwrap( numpy.arctan2( relative @ e2, relative @ e1 ) )
+
+## orbital_frequency(time, phase)
+## Orbital angular frequency d(phase)/dt (second-order finite differences).
+
+def orbital_frequency( time, phase ):
+
+    return numpy.gradient( phase, time )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## merger_time(time, separation, threshold=MERGER_SEPARATION)
+## First time the separation drops below threshold (linear interpolation between
+## samples), or None if it never does.
+
+def merger_time( time, separation, threshold=MERGER_SEPARATION ):
+
+    below = numpy.flatnonzero( separation < threshold )
+    if len(below) == 0:
+        return None
+
+    k = below[0]
+    if k == 0:
+        return float( time[0] )
+    fraction = ( separation[k-1] - threshold ) / ( separation[k-1] - separation[k] )
+    return float( time[k-1] + fraction * ( time[k] - time[k-1] ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## eccentricity_estimate(time, omega, t_end=None, window=ECCENTRICITY_WINDOW)
+## Eccentricity from the leading-order PN fit of the orbital frequency omega(t),
+## over the fraction window of [time[0], t_end] (t_end: merger time, default the
+## last time). Returns a dictionary with the eccentricity, the fitted coalescence
+## time t_c and amplitude A, or None if the window holds too few samples.
+
+def eccentricity_estimate( time, omega, t_end=None, window=ECCENTRICITY_WINDOW ):
+
+    if t_end is None:
+        t_end = time[-1]
+    duration = t_end - time[0]
+    selected = ( time >= time[0] + window[0]*duration ) & ( time <= time[0] + window[1]*duration ) & ( omega > 0.0 )
+    if numpy.count_nonzero( selected ) < 8:
+        return None
+
+    t = time[selected]
+    w = omega[selected]
+
+    ## omega^(-8/3) = A^(-8/3) (t_c - t) is linear in t
+    slope, intercept = numpy.polyfit( t, w**(-8.0/3.0), 1 )
+    if slope >= 0.0:
+        return None
+    t_c       = -intercept / slope
+    amplitude = ( -slope )**( -3.0/8.0 )
+    w_fit     = amplitude * ( t_c - t )**( -3.0/8.0 )
+
+    residual  = ( w - w_fit ) / ( 2.0 * w_fit )
+    return { "eccentricity": float( 0.5 * ( residual.max() - residual.min() ) ),
+             "t_c": float( t_c ), "amplitude": float( amplitude ),
+             "window": [ float( t[0] ), float( t[-1] ) ] }
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## analyze_orbit(data, puncture_number, threshold=MERGER_SEPARATION)
+## Orbit summary of a bssn_BH.dat array: per pair of punctures the initial and
+## minimal separation, merger time, number of orbits and frequency up to the
+## merger, and the eccentricity estimate.
+
+def analyze_orbit( data, puncture_number, threshold=MERGER_SEPARATION ):
+
+    time      = data[:, 0]
+    positions = puncture_positions( data, puncture_number )
+    pairs, separations = pairwise_separations( positions )
+
+    summary = { "puncture_number": int( puncture_number ),
+                "time": [ float( time[0] ), float( time[-1] ) ] if len(time) else [],
+                "merger_separation": float( threshold ),
+                "pairs": [] }
+
+    for ( i, j ), separation in zip( pairs, separations ):
+
+        entry = { "pair": [ i, j ] }
+        if len(time) < 2:
+            summary["pairs"].append( entry )
+            continue
+
+        t_merge = merger_time( time, separation, threshold )
+        inspiral = time <= ( t_merge if t_merge is not None else time[-1] )
+        phase   = orbital_phase( positions[j] - positions[i] )
+        omega   = orbital_frequency( time, phase )
+
+        entry["initial_separation"] = float( separation[0] )
+        entry["minimum_separation"] = float( separation.min() )
+        entry["merger_time"]        = t_merge
+        entry["orbits"]             = float( abs( phase[inspiral][-1] - phase[0] ) / ( 2.0*numpy.pi ) )
+        entry["initial_frequency"]  = float( abs( omega[0] ) )
+        entry["final_frequency"]    = float( abs( omega[inspiral][-1] ) )
+        entry["eccentricity_fit"]   = eccentricity_estimate( time[inspiral], numpy.abs( omega[inspiral] ), t_merge )
+        summary["pairs"].append( entry )
+
+    return summary
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## write_orbit_summary(source, summary_directory, puncture_number, threshold=MERGER_SEPARATION)
+## Analyse bssn_BH.dat of a run (a data directory or a monitor_data.RunData) and
+## store the result as the "orbit" section of the run summary in summary_directory.
+## Return the summary dictionary.
+
+def write_orbit_summary( source, summary_directory, puncture_number, threshold=MERGER_SEPARATION ):
+
+    run     = monitor_data.open_run( source )
+    summary = analyze_orbit( run.series( "bssn_BH.dat" ).data, puncture_number, threshold )
+    filename = run_summary.update_run_summary( summary_directory, "orbit", summary )
+
+    for entry in summary["pairs"]:
+        print( " Orbit of BH" + str(entry["pair"][0]+1) + "-BH" + str(entry["pair"][1]+1) + ":",
+               "orbits =", round( entry.get("orbits", 0.0), 2 ), " merger time =", entry.get("merger_time") )
+    print( " Orbit summary written to", filename )
+
+    return summary
+
+#########################################################################################
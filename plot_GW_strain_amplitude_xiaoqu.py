@@ -13,7 +13,14 @@ import scipy                               ## scipy for interpolation and signal
 import math
 import matplotlib.pyplot    as     plt     ## matplotlib for plotting
 import os                                  ## os for system/file operations
-
+import io
+
+import monitor_data
+import series_decimation
+import waveform_store
+import waveform_extrapolation
+import radiated_fluxes
+import waveform_frequency
 import AMSS_NCKU_Input as input_data
 
 # plt.rcParams['text.usetex'] = True  ## enable LaTeX fonts in plots
@@ -215,6 +222,16 @@ def inverse_fourier_transform(omega, F_omega, sampling_factor=2, original_zero_p
 
 # Instantaneous frequency estimation using analytic signal (Hilbert transform)
 
+def signal_frequency(signal, sampling_rate):
+    """
+    Instantaneous frequency of a signal; keep the result to query it repeatedly.
+    :param signal: input time-domain sampled signal
+    :param sampling_rate: sampling rate
+    :return: waveform_frequency.InstantaneousFrequency of the real signal
+    """
+    time = numpy.arange(len(signal)) / sampling_rate
+    return waveform_frequency.InstantaneousFrequency(time, signal, component="real")
+
 def instantaneous_frequency(signal, sampling_rate):
     """
     Compute instantaneous frequency of a signal.
@@ -222,23 +239,22 @@ def instantaneous_frequency(signal, sampling_rate):
     :param sampling_rate: sampling rate
     :return: time array and instantaneous frequency array
     """
-    analytic_signal = scipy.signal.hilbert(signal)
-    phase = numpy.unwrap(numpy.angle(analytic_signal))
-    time = numpy.arange(len(signal)) / sampling_rate
-    frequency = numpy.gradient(phase, time) / (2 * numpy.pi)
-    return time, frequency
+    frequency = signal_frequency(signal, sampling_rate)
+    return frequency.time, frequency.frequency
 
 def get_frequency_at_t1(signal, sampling_rate, t1):
     """
-    Get instantaneous frequency at time t1
-    :param signal: input time-domain sampled signal
+    Get instantaneous frequency at time t1 (interpolated between samples)
+    For repeated queries pass the InstantaneousFrequency from signal_frequency as signal
+    (it is queried directly); for psi4 of a run, query waveform_frequency.frequency_store.
+    :param signal: input time-domain sampled signal, or its InstantaneousFrequency
     :param sampling_rate: sampling rate
-    :param t1: target time
+    :param t1: target time (or array of times)
     :return: instantaneous frequency at t1
     """
-    time, freq = instantaneous_frequency(signal, sampling_rate)
-    index = numpy.argmin(numpy.abs(time - t1))
-    return freq[index]
+    if not isinstance(signal, waveform_frequency.InstantaneousFrequency):
+        signal = signal_frequency(signal, sampling_rate)
+    return signal.frequency_at(t1)
     
     
 ####################################################################################
@@ -247,124 +263,14 @@ def get_frequency_at_t1(signal, sampling_rate, t1):
 
 ####################################################################################
 
-## Function to plot gravitational-wave waveform h
+## Puncture masses and total mass of the system (from the input parameters)
 
-## Inputs:
-## outdir             path to data directory
-## figure_outdir      path to figure output directory
-## detector_number_i  detector index
-## total_mass         total system mass
-
-def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_number_i ):
-
-
-    # build file path
-    file0 = os.path.join(outdir, "bssn_psi4.dat")
-
-    if ( detector_number_i == 0 ):
-        print()
-        print("Plotting the gravitational-wave strain amplitude h")
-        print()
-        print("The corresponding data file is", file0)
-        print()
-
-    print()
-    print( "Plotting gravitational-wave data for detector no.", detector_number_i )
-
-    
-    # read entire data file, assume whitespace-delimited floats
-    data = numpy.loadtxt(file0)
-    
-    # extract columns from psi4 file
-    time                 = data[:,0]
-    psi4_l2m2m_real      = data[:,1]
-    psi4_l2m2m_imaginary = data[:,2]
-    psi4_l2m1m_real      = data[:,3]
-    psi4_l2m1m_imaginary = data[:,4]
-    psi4_l2m0_real       = data[:,5]
-    psi4_l2m0_imaginary  = data[:,6]
-    psi4_l2m1_real       = data[:,7]
-    psi4_l2m1_imaginary  = data[:,8]
-    psi4_l2m2_real       = data[:,9]
-    psi4_l2m2_imaginary  = data[:,10]
-    
-    # Note: file0 is just a filename; no file.open() was used, so nothing to close
-    # file0.close()
-    
-    # Use integer division to compute length per detector
-    length = len(time) // input_data.Detector_Number 
-    
-    time2                 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2m_real2      = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2m_imaginary2 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1m_real2      = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1m_imaginary2 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m0_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m0_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    
-    # Split data into per-detector-radius series
-    for i in range(input_data.Detector_Number):
-        for j in range(length):
-            time2[i,j]                 = time[                 j*input_data.Detector_Number + i ]
-            psi4_l2m2m_real2[i,j]      = psi4_l2m2m_real[      j*input_data.Detector_Number + i ]
-            psi4_l2m2m_imaginary2[i,j] = psi4_l2m2m_imaginary[ j*input_data.Detector_Number + i ]
-            psi4_l2m1m_real2[i,j]      = psi4_l2m1m_real[      j*input_data.Detector_Number + i ]
-            psi4_l2m1m_imaginary2[i,j] = psi4_l2m1m_imaginary[ j*input_data.Detector_Number + i ]
-            psi4_l2m0_real2[i,j]       = psi4_l2m0_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m0_imaginary2[i,j]  = psi4_l2m0_imaginary[  j*input_data.Detector_Number + i ]
-            psi4_l2m1_real2[i,j]       = psi4_l2m1_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m1_imaginary2[i,j]  = psi4_l2m1_imaginary[  j*input_data.Detector_Number + i ]
-            psi4_l2m2_real2[i,j]       = psi4_l2m2_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m2_imaginary2[i,j]  = psi4_l2m2_imaginary[  j*input_data.Detector_Number + i ]
-
-    
-    ## Compute discrete Fourier transforms of Psi4 data
-    ## l=2 m=-2 spectrum
-    psi4_l2m2m_real_frequency, psi4_l2m2m_real_omega, psi4_l2m2m_real_omega_spectrem                                                             \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m2m_real2[detector_number_i],      apply_window=True, zero_pad_factor=4 )
-    psi4_l2m2m_imaginary_frequency, psi4_l2m2m_imaginary_omega, psi4_l2m2m_imaginary_omega_spectrem                                              \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m2m_imaginary2[detector_number_i], apply_window=True, zero_pad_factor=4 )
-    ## l=2 m=-1 spectrum
-    psi4_l2m1m_real_frequency, psi4_l2m1m_real_omega, psi4_l2m1m_real_omega_spectrem                                                             \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m1m_real2[detector_number_i],      apply_window=True, zero_pad_factor=4 )
-    psi4_l2m1m_imaginary_frequency, psi4_l2m1m_imaginary_omega, psi4_l2m1m_imaginary_omega_spectrem                                              \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m1m_imaginary2[detector_number_i], apply_window=True, zero_pad_factor=4 )
-    ## l=2 m=0 spectrum
-    psi4_l2m0_real_frequency, psi4_l2m0_real_omega, psi4_l2m0_real_omega_spectrem                                                                \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m0_real2[detector_number_i],       apply_window=True, zero_pad_factor=4 )
-    psi4_l2m0_imaginary_frequency, psi4_l2m0_imaginary_omega, psi4_l2m0_imaginary_omega_spectrem                                                 \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m0_imaginary2[detector_number_i],  apply_window=True, zero_pad_factor=4 )
-    ## l=2 m=1 spectrum
-    psi4_l2m1_real_frequency, psi4_l2m1_real_omega, psi4_l2m1_real_omega_spectrem                                                                \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m1_real2[detector_number_i],       apply_window=True, zero_pad_factor=4 )
-    psi4_l2m1_imaginary_frequency, psi4_l2m1_imaginary_omega, psi4_l2m1_imaginary_omega_spectrem                                                 \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m1_imaginary2[detector_number_i],  apply_window=True, zero_pad_factor=4 )
-    ## l=2 m=2 spectrum
-    psi4_l2m2_real_frequency, psi4_l2m2_real_omega, psi4_l2m2_real_omega_spectrem                                                                \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m2_real2[detector_number_i],       apply_window=True, zero_pad_factor=4 )
-    psi4_l2m2_imaginary_frequency, psi4_l2m2_imaginary_omega, psi4_l2m2_imaginary_omega_spectrem                                                 \
-        = compute_frequency_spectrum( time2[detector_number_i], psi4_l2m2_imaginary2[detector_number_i],  apply_window=True, zero_pad_factor=4 )
-
-
-    # Compute detector distance from input parameters
-    Detector_Interval   = ( input_data.Detector_Rmax - input_data.Detector_Rmin ) / ( input_data.Detector_Number - 1 )
-    Detector_Distance_R = input_data.Detector_Rmax - Detector_Interval * detector_number_i
-    
-    #################################################
-
-    ## Set minimum cutoff frequency for frequency-domain integration
+## Returns:
+## puncture_mass : mass of each puncture
+## total_mass    : sum of the puncture masses
 
-    ## Create output file to record frequency-domain cutoff values
+def puncture_masses():
 
-    file_cut_path = os.path.join( figure_outdir, "frequency_cut.txt" )
-    file_cut      = open( file_cut_path, "w" )
-    
-    ## Compute total mass of the system and output
-    
     total_mass    = 0.0
     puncture_mass = numpy.zeros( input_data.puncture_number )
     
@@ -387,6 +293,57 @@ def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_
         for k in range( input_data.puncture_number ):
             puncture_mass[k] = input_data.parameter_BH[k,0]
             total_mass += puncture_mass[k]
+
+    return puncture_mass, total_mass
+
+####################################################################################
+
+
+
+####################################################################################
+
+## Instantaneous frequency of psi4 of all detectors and modes at t - R* = 0
+
+## Inputs:
+## run         monitor_data.RunData of the run
+## total_mass  total mass for the tortoise radius R* (None: t - R, as for more than two punctures)
+
+## Returns:
+## frequency : (detector, mode) frequencies of the real part of psi4, from one batched
+##             query of the cached waveform_frequency.frequency_store
+## modes     : (l, m) of the mode axis
+
+def retarded_zero_frequency( run, total_mass ):
+
+    frequency = waveform_frequency.frequency_store( run, input_data.Detector_Number, getattr(input_data, "GW_L_max", None), component="real" )
+    radii     = waveform_store.detector_radii( input_data.Detector_Number, input_data.Detector_Rmin, input_data.Detector_Rmax )
+    t1        = waveform_extrapolation.retarded_time_shift( radii, total_mass )
+
+    return frequency.frequency_at( t1[:, None, None] )[..., 0], frequency.modes
+
+####################################################################################
+
+
+
+####################################################################################
+
+## Minimum cutoff frequency for the frequency-domain integration of psi4,
+## estimated from the Newtonian orbital frequencies of the initial punctures
+
+## Inputs:
+## file_cut : open file receiving the masses, separations and frequency estimates
+##            (None: the estimate is computed without logging)
+
+## Returns:
+## omega_cut : cutoff angular frequency
+
+def frequency_cutoff( file_cut=None ):
+
+    if ( file_cut is None ):
+        file_cut = io.StringIO()
+
+    ## Compute total mass of the system and output
+    puncture_mass, total_mass = puncture_masses()
             
     ## Output total mass
     print( file=file_cut )
@@ -456,6 +413,57 @@ def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_
     print( " Omega Cut estimate:     omega_cut     =", omega_cut,     file=file_cut )
     print(                                                            file=file_cut )
 
+    return omega_cut
+
+####################################################################################
+
+
+
+####################################################################################
+
+## Function to plot gravitational-wave waveform h
+
+## Inputs:
+## outdir             path to data directory, or a monitor_data.RunData of the run
+## figure_outdir      path to figure output directory
+## detector_number_i  detector index
+## total_mass         total system mass
+
+def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_number_i ):
+
+
+    # build file path
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_psi4.dat" )
+
+    if ( detector_number_i == 0 ):
+        print()
+        print("Plotting the gravitational-wave strain amplitude h")
+        print()
+        print("The corresponding data file is", file0)
+        print()
+
+    print()
+    print( "Plotting gravitational-wave data for detector no.", detector_number_i )
+
+    
+    # Compute detector distance from input parameters
+    Detector_Interval   = ( input_data.Detector_Rmax - input_data.Detector_Rmin ) / ( input_data.Detector_Number - 1 )
+    Detector_Distance_R = input_data.Detector_Rmax - Detector_Interval * detector_number_i
+    
+    #################################################
+
+    ## Set minimum cutoff frequency for frequency-domain integration
+
+    ## Create output file to record frequency-domain cutoff values
+
+    file_cut_path = os.path.join( figure_outdir, "frequency_cut.txt" )
+    file_cut      = open( file_cut_path, "w" )
+    
+    ## Estimate the cutoff from the puncture masses and separations (logged to file_cut)
+    omega_cut                 = frequency_cutoff( file_cut )
+    puncture_mass, total_mass = puncture_masses()
+
     ## Manual cutoff setting (deprecated)
     ## omega_cut = 2.0 * math.pi / 100.0
 
@@ -468,6 +476,18 @@ def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_
     if ( input_data.puncture_number > 2 ):
         tortoise_R = Detector_Distance_R
 
+    ## Instantaneous psi4 frequencies at t - r* = 0 of all detectors (one cached, batched query),
+    ## logged for reference; the cutoff above stays the mass-based estimate
+    if ( input_data.puncture_number > 2 ):
+        psi4_frequency, psi4_modes = retarded_zero_frequency( run, None )
+    else:
+        psi4_frequency, psi4_modes = retarded_zero_frequency( run, total_mass )
+
+    for l, m in psi4_modes:
+        if ( l == 2 ):
+            print( f" Instantaneous frequency at t - r* = 0, l=2 m={m:<2d} psi4_real = {psi4_frequency[detector_number_i, psi4_modes.index((l, m))]} 1/M", file=file_cut )
+    print( file=file_cut )
+
     ## Set cutoff based on instantaneous frequency of the Psi4 signal
     ## Abandoned due to large errors
     '''
@@ -511,86 +531,36 @@ def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_
         omega_cut_l2m2m = omega_cut_l2m2
     '''
     
-    ## Obtain integrand for inverse Fourier transform
-    psi4_l2m2m_real_omega_integration      = frequency_filter_integration( psi4_l2m2m_real_omega,      psi4_l2m2m_real_omega_spectrem,      omega_cut )
-    psi4_l2m2m_imaginary_omega_integration = frequency_filter_integration( psi4_l2m2m_imaginary_omega, psi4_l2m2m_imaginary_omega_spectrem, omega_cut )
-    psi4_l2m1m_real_omega_integration      = frequency_filter_integration( psi4_l2m1m_real_omega,      psi4_l2m1m_real_omega_spectrem,      omega_cut )
-    psi4_l2m1m_imaginary_omega_integration = frequency_filter_integration( psi4_l2m1m_imaginary_omega, psi4_l2m1m_imaginary_omega_spectrem, omega_cut )
-    psi4_l2m0_real_omega_integration       = frequency_filter_integration( psi4_l2m0_real_omega,       psi4_l2m0_real_omega_spectrem,       omega_cut )
-    psi4_l2m0_imaginary_omega_integration  = frequency_filter_integration( psi4_l2m0_imaginary_omega,  psi4_l2m0_imaginary_omega_spectrem,  omega_cut )
-    psi4_l2m1_real_omega_integration       = frequency_filter_integration( psi4_l2m1_real_omega,       psi4_l2m1_real_omega_spectrem,       omega_cut )
-    psi4_l2m1_imaginary_omega_integration  = frequency_filter_integration( psi4_l2m1_imaginary_omega,  psi4_l2m1_imaginary_omega_spectrem,  omega_cut )
-    psi4_l2m2_real_omega_integration       = frequency_filter_integration( psi4_l2m2_real_omega,       psi4_l2m2_real_omega_spectrem,       omega_cut )
-    psi4_l2m2_imaginary_omega_integration  = frequency_filter_integration( psi4_l2m2_imaginary_omega,  psi4_l2m2_imaginary_omega_spectrem,  omega_cut )
-
-    ## Perform inverse Fourier transform in frequency domain to obtain gravitational-wave strain amplitudes
-    ## l=2 m=-2 amplitude
-    time_grid_h_plus_l2m2m, GW_h_plus_l2m2m \
-        = inverse_fourier_transform( psi4_l2m2m_real_omega, psi4_l2m2m_real_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
-    time_grid_h_cross_l2m2m, GW_h_cross_l2m2m \
-        = inverse_fourier_transform( psi4_l2m2m_imaginary_omega, psi4_l2m2m_imaginary_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )
-    ## l=2 m=-1 amplitude
-    time_grid_h_plus_l2m1m, GW_h_plus_l2m1m \
-        = inverse_fourier_transform( psi4_l2m1m_real_omega, psi4_l2m1m_real_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
-    time_grid_h_cross_l2m1m, GW_h_cross_l2m1m \
-        = inverse_fourier_transform( psi4_l2m1m_imaginary_omega, psi4_l2m1m_imaginary_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )
-    ## l=2 m=0 amplitude
-    time_grid_h_plus_l2m0, GW_h_plus_l2m0 \
-        = inverse_fourier_transform( psi4_l2m0_real_omega, psi4_l2m0_real_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
-    time_grid_h_cross_l2m0, GW_h_cross_l2m0 \
-        = inverse_fourier_transform( psi4_l2m0_imaginary_omega, psi4_l2m0_imaginary_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )
-    ## l=2 m=1 amplitude
-    time_grid_h_plus_l2m1, GW_h_plus_l2m1 \
-        = inverse_fourier_transform( psi4_l2m1_real_omega, psi4_l2m1_real_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
-    time_grid_h_cross_l2m1, GW_h_cross_l2m1 \
-        = inverse_fourier_transform( psi4_l2m1_imaginary_omega, psi4_l2m1_imaginary_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )
-    ## l=2 m=2 amplitude
-    time_grid_h_plus_l2m2, GW_h_plus_l2m2 \
-        = inverse_fourier_transform( psi4_l2m2_real_omega, psi4_l2m2_real_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
-    time_grid_h_cross_l2m2, GW_h_cross_l2m2 \
-        = inverse_fourier_transform( psi4_l2m2_imaginary_omega, psi4_l2m2_imaginary_omega_integration, sampling_factor=2, original_zero_pad_factor=4 )  
+    ## Frequency-domain integration of psi4 for all detectors and modes at once: one batched FFT,
+    ## computed on the first call and shared by the plots of the other detectors through the RunData
+    GW_h = waveform_store.strain_store( run, input_data.Detector_Number, omega_cut, getattr(input_data, "GW_L_max", None) )
 
-    
-    # Construct time grids for computing gravitational-wave strain h
-    # time_max = max( time2[detector_number_i] )
-    # time_grid = numpy.linspace( tortoise_R, time_max, 2000 )
-    # time_grid_new = numpy.linspace( 0, time_max-tortoise_R, len(time_grid) )  ## subtract tortoise coordinate from times
-    # l=2 m=-2
-    time_grid_h_plus_l2m2m_new  = time_grid_h_plus_l2m2m - tortoise_R
-    time_grid_h_cross_l2m2m_new = time_grid_h_cross_l2m2m - tortoise_R
-    # l=2 m=-1
-    time_grid_h_plus_l2m1m_new  = time_grid_h_plus_l2m1m - tortoise_R
-    time_grid_h_cross_l2m1m_new = time_grid_h_cross_l2m1m - tortoise_R
-    # l=2 m=0
-    time_grid_h_plus_l2m0_new  = time_grid_h_plus_l2m0 - tortoise_R
-    time_grid_h_cross_l2m0_new = time_grid_h_cross_l2m0 - tortoise_R
-    # l=2 m=1
-    time_grid_h_plus_l2m1_new  = time_grid_h_plus_l2m1 - tortoise_R
-    time_grid_h_cross_l2m1_new = time_grid_h_cross_l2m1 - tortoise_R
-    # l=2 m=2
-    time_grid_h_plus_l2m2_new  = time_grid_h_plus_l2m2 - tortoise_R
-    time_grid_h_cross_l2m2_new = time_grid_h_cross_l2m2 - tortoise_R
+    ## Retarded time and strain of this detector: h+ = Re h, hx = Im h
+    time_grid_h_new = GW_h.time[detector_number_i] - tortoise_R
+    GW_h_plus_l2m0,  GW_h_cross_l2m0 = GW_h[detector_number_i, 2, 0].real, GW_h[detector_number_i, 2, 0].imag
+    GW_h_plus_l2m1,  GW_h_cross_l2m1 = GW_h[detector_number_i, 2, 1].real, GW_h[detector_number_i, 2, 1].imag
+    GW_h_plus_l2m2,  GW_h_cross_l2m2 = GW_h[detector_number_i, 2, 2].real, GW_h[detector_number_i, 2, 2].imag
 
     plt.figure( figsize=(8,8) )                                   ## figsize controls figure size
     plt.title( f" Gravitational Wave h   Detector Distance = { Detector_Distance_R } ", fontsize=18 )   ## fontsize controls text size
-    plt.plot( time_grid_h_plus_l2m0_new, GW_h_plus_l2m0,  \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_plus_l2m0 ),  \
               color='red',    label="l=2 m=0 h+",                  linewidth=2 )
-    plt.plot( time_grid_h_cross_l2m0_new, GW_h_cross_l2m0, \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_cross_l2m0 ), \
               color='orange', label="l=2 m=0 hx",  linestyle='--', linewidth=2 )
-    plt.plot( time_grid_h_plus_l2m1_new, GW_h_plus_l2m1,  \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_plus_l2m1 ),  \
               color='green',  label="l=2 m=1 h+",                  linewidth=2 )
-    plt.plot( time_grid_h_cross_l2m1_new, GW_h_cross_l2m1, \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_cross_l2m1 ), \
               color='cyan',   label="l=2 m=1 hx",  linestyle='--', linewidth=2 )
-    plt.plot( time_grid_h_plus_l2m2_new, GW_h_plus_l2m2,  \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_plus_l2m2 ),  \
               color='black',  label="l=2 m=2 h+",                  linewidth=2 )
-    plt.plot( time_grid_h_cross_l2m2_new, GW_h_cross_l2m2, \
+    plt.plot( *series_decimation.decimate( time_grid_h_new, GW_h_cross_l2m2 ), \
               color='gray',   label="l=2 m=2 hx",  linestyle='--', linewidth=2 )
     if ( input_data.puncture_number > 2 ):
         plt.xlabel( "T - R [M]",  fontsize=16     )
     else:
         plt.xlabel( "T - R* [M]", fontsize=16     )
     plt.ylabel( r"R*h",           fontsize=16     )
-    plt.xlim( 0.0, max(time_grid_h_plus_l2m0_new) )
+    plt.xlim( 0.0, max(time_grid_h_new) )
     plt.legend( loc='upper right'                 )
     plt.grid(   color='gray', linestyle='--', linewidth=0.5 )  # show grid lines
     plt.savefig( os.path.join(figure_outdir, "Gravitational_Wave_h_Detector_" + str(detector_number_i) + ".pdf") )
@@ -741,6 +711,139 @@ def generate_gravitational_wave_amplitude_plot( outdir, figure_outdir, detector_
 
 
 
+####################################################################################
+
+## Function to extrapolate psi4 of all detectors to null infinity and plot it
+
+## Inputs:
+## outdir         path to data directory, or a monitor_data.RunData of the run
+## figure_outdir  path to figure output directory
+## order          polynomial order in 1/r (default: Extrapolation_Order of the input, or 2)
+
+## Writes Gravitational_Wave_Psi4_Extrapolated.dat (all modes with error estimates)
+## and Gravitational_Wave_Psi4_Extrapolated.pdf (l=2 m=2) to figure_outdir and
+## returns the waveform_extrapolation.ExtrapolatedWaveform (None with too few detectors).
+
+def generate_extrapolated_waveform_plot( outdir, figure_outdir, order=None ):
+
+    run   = monitor_data.open_run( outdir )
+    if ( order is None ):
+        order = getattr( input_data, "Extrapolation_Order", waveform_extrapolation.EXTRAPOLATION_ORDER )
+
+    print()
+    print( "Extrapolating psi4 of all detectors to null infinity, order", order, "in 1/R" )
+    print()
+
+    if ( input_data.Detector_Number < order + 1 ):
+        print( f" Extrapolation of order {order} needs at least {order + 1} detectors, the run has {input_data.Detector_Number}; skipped" )
+        print()
+        return None
+
+    ## Align the detectors in t - R* (t - R for more than two punctures, as in the strain plot)
+    puncture_mass, total_mass = puncture_masses()
+    if ( input_data.puncture_number > 2 ):
+        total_mass = None
+
+    psi4   = waveform_store.psi4_store( run, input_data.Detector_Number, getattr(input_data, "GW_L_max", None) )
+    radii  = waveform_store.detector_radii( input_data.Detector_Number, input_data.Detector_Rmin, input_data.Detector_Rmax )
+    result = waveform_extrapolation.extrapolate_waveform( psi4, radii, total_mass, order )
+
+    waveform_extrapolation.write_extrapolated_waveform( os.path.join(figure_outdir, "Gravitational_Wave_Psi4_Extrapolated.dat"), result )
+
+    ## l=2 m=2 at infinity with its amplitude error, against the outermost detector
+    index  = result.mode_index( 2, 2 )
+    shift  = waveform_extrapolation.retarded_time_shift( radii[0], total_mass )
+    error  = result.amplitude_error[index]
+    print( " Largest amplitude error estimate of l=2 m=2 psi4:", numpy.max( error ) )
+
+    plt.figure( figsize=(8,8) )
+    plt.title( f" Gravitational Wave $\\Psi_{4}$ Extrapolated to Infinity   Order = {order} ", fontsize=18 )
+    plt.plot( *series_decimation.decimate( psi4.time[0] - shift, psi4.series( 0, 2, 2 ).real ),                   \
+              color='gray',   label=f"l=2 m=2 real, R = {radii[0]}",    linestyle='--', linewidth=2 )
+    plt.plot( *series_decimation.decimate( result.time, result.series( 2, 2 ).real ),                            \
+              color='black',  label="l=2 m=2 real, extrapolated",                       linewidth=2 )
+    plt.plot( *series_decimation.decimate( result.time, result.amplitude[index] ),                               \
+              color='red',    label="l=2 m=2 amplitude, extrapolated",                  linewidth=2 )
+    plt.fill_between( *series_decimation.decimate_band( result.time, result.amplitude[index] - error, result.amplitude[index] + error ), \
+                      color='red', alpha=0.3, label="amplitude error estimate" )
+    if ( input_data.puncture_number > 2 ):
+        plt.xlabel( "T - R [M]",  fontsize=16 )
+    else:
+        plt.xlabel( "T - R* [M]", fontsize=16 )
+    plt.ylabel( r"$R*\Psi$",      fontsize=16 )
+    plt.legend( loc='upper right'             )
+    plt.grid(   color='gray', linestyle='--', linewidth=0.5 )
+    plt.savefig( os.path.join(figure_outdir, "Gravitational_Wave_Psi4_Extrapolated.pdf") )
+    plt.close()
+
+    print( "Extrapolated gravitational-wave plot finished." )
+    print()
+
+    return result
+
+####################################################################################
+
+
+
+####################################################################################
+
+## Function to compute the radiated energy, linear and angular momentum and the kick, and plot them
+
+## Inputs:
+## outdir             path to data directory, or a monitor_data.RunData of the run
+## figure_outdir      path to figure output directory
+## summary_directory  run directory receiving the "fluxes" section of the run summary
+
+## Writes Radiated_Fluxes.dat (running fluxes and totals of all detectors) and
+## Radiated_Fluxes.pdf (outermost detector) to figure_outdir and returns the fluxes.
+
+def generate_radiated_flux_plot( outdir, figure_outdir, summary_directory ):
+
+    run = monitor_data.open_run( outdir )
+
+    print()
+    print( "Computing the energy, linear and angular momentum radiated through all detectors" )
+    print()
+
+    ## Same cutoff and masses as the strain plot (frequency_cut.txt is left to the strain plot)
+    omega_cut = frequency_cutoff()
+    puncture_mass, total_mass = puncture_masses()
+
+    radii  = waveform_store.detector_radii( input_data.Detector_Number, input_data.Detector_Rmin, input_data.Detector_Rmax )
+    fluxes = radiated_fluxes.write_flux_summary( run, summary_directory, input_data.Detector_Number, omega_cut, radii, total_mass,
+                                                 getattr(input_data, "GW_L_max", None),
+                                                 table_filename=os.path.join( figure_outdir, "Radiated_Fluxes.dat" ) )
+
+    ## Running totals of the outermost detector against T - R
+    time = fluxes["time"][0] - radii[0]
+
+    fig, axes = plt.subplots( 3, 1, figsize=(8,12), sharex=True )
+    axes[0].set_title( f" Radiated Energy and Momentum   Detector Distance = { radii[0] } ", fontsize=18 )
+    axes[0].plot( *series_decimation.decimate( time, fluxes["energy"][0] ), color='black', label="E", linewidth=2 )
+    axes[0].set_ylabel( "E [M]", fontsize=16 )
+    for axis, ( component, color ) in enumerate( zip( "xyz", ( 'red', 'green', 'blue' ) ) ):
+        axes[1].plot( *series_decimation.decimate( time, fluxes["momentum"][0, axis] ),         \
+                      color=color, label="P" + component, linewidth=2 )
+        axes[2].plot( *series_decimation.decimate( time, fluxes["angular_momentum"][0, axis] ), \
+                      color=color, label="J" + component, linewidth=2 )
+    axes[1].set_ylabel( "P [M]",   fontsize=16 )
+    axes[2].set_ylabel( "J [M^2]", fontsize=16 )
+    axes[2].set_xlabel( "T - R [M]", fontsize=16 )
+    for ax in axes:
+        ax.legend( loc='upper left' )
+        ax.grid(   color='gray', linestyle='--', linewidth=0.5 )
+    plt.savefig( os.path.join(figure_outdir, "Radiated_Fluxes.pdf") )
+    plt.close()
+
+    print( "Radiated flux plot finished." )
+    print()
+
+    return fluxes
+
+####################################################################################
+
+
+
 ####################################################################################
 
 ## Standalone usage example
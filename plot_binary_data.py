@@ -9,21 +9,45 @@
 #################################################
 
 import numpy
-import scipy
 import matplotlib.pyplot    as     plt
 from   matplotlib.colors    import LogNorm
 from   mpl_toolkits.mplot3d import Axes3D
 ## import torch
 import AMSS_NCKU_Input      as input_data
+import binary_data_archive
+import grid_upsample
 
 import os
 
 
 #########################################################################################
 
-def plot_binary_data( filename, binary_outdir, figure_outdir ):
+## Settings that change the figures of a dump (recorded in the figure manifest, see figure_manifest.py)
+
+def plot_parameters( fast=None ):
+
+    if fast is None:
+        fast = ( getattr(input_data, "Plot_Fast_Mode", "no") == "yes" )
+
+    parameters = { "fast": fast, "symmetry": input_data.Symmetry, "centering": input_data.grid_center_set, "upsample": 2.5 }
+    if fast:
+        parameters["dpi"]     = getattr( input_data, "Plot_DPI", 150 )
+        parameters["surface"] = ( getattr(input_data, "Plot_Surface", "no") == "yes" )
+
+    return parameters
+
+#########################################################################################
+
+## fast: reuse the figures and write PNG (see get_data_xy_fast); None takes Plot_Fast_Mode of the input file
+## Return the paths of the saved figures.
+
+def plot_binary_data( filename, binary_outdir, figure_outdir, fast=None ):
+
+    if fast is None:
+        fast = ( getattr(input_data, "Plot_Fast_Mode", "no") == "yes" )
 
     figure_title0 = filename.replace(binary_outdir + "/", "")  # remove directory prefix
+    figure_title0 = figure_title0.split(binary_data_archive.ARCHIVE_MEMBER_SEPARATOR)[-1]  # remove archive prefix
     figure_title  = figure_title0.replace(".bin", "")          # remove .bin suffix
 
     print()
@@ -32,31 +56,23 @@ def plot_binary_data( filename, binary_outdir, figure_outdir ):
 ###################################
 
     # Open file
-    # Read binary array in the AMSS-NCKU output order
-    with open(filename, 'rb') as file:
-
-        physical_time = numpy.fromfile( file, dtype=numpy.float64, count=1 )
-        nx, ny, nz    = numpy.fromfile( file, dtype=numpy.int32,   count=3 )
-        xmin, xmax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        ymin, ymax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        zmin, zmax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        data          = numpy.fromfile( file, dtype=numpy.float64          )
-        
-        # Now `data` array contains the binary data read from file
+    # Parse the header once; the payload stays on disk as a memmap in
+    # (nz, ny, nx) order, so only the slice used for plotting is read
+    # (filename may also name a dump inside an archive, "<archive>::<dump>")
+    dump = binary_data_archive.open_binary_data( filename )
+
+    physical_time    = dump.time
+    nx, ny, nz       = dump.shape
+    xmin, ymin, zmin = dump.rmin
+    xmax, ymax, zmax = dump.rmax
+    data_reshape     = dump.data
  
-    print( "obtained data shape  =", data.shape ) 
-    print( "obtained data size   =", data.size  ) 
+    print( "obtained data shape  =", data_reshape.shape ) 
+    print( "obtained data size   =", data_reshape.size  ) 
     print( "obtained data points =", nx, "*", ny, "*", nz, "=", nx*ny*nz )
     
 ###################################
 
-    # Reshape flat array into a multi-dimensional grid
-    data_reshape = data.reshape( (nz, ny, nx) ) ## tests show this ordering yields correct plots (z first)
-    # print(data_reshape)
-
-    # data1 = data_reshape[0,:,:]
-    # print(data1)
-
     Rmin = [xmin, ymin, zmin] 
     Rmax = [xmax, ymax, zmax]
     N    = [nx, ny, nz]
@@ -70,21 +86,25 @@ def plot_binary_data( filename, binary_outdir, figure_outdir ):
 
     # Call plotting helper to produce contour/density/surface plots
     figure_title0    = filename.replace(binary_outdir + "/", "") # remove directory prefix
+    figure_title0    = figure_title0.split(binary_data_archive.ARCHIVE_MEMBER_SEPARATOR)[-1]
     figure_title     = figure_title.replace(".bin", "")          # remove .bin suffix
     figure_title_new = figure_title[:-6]                            # strip trailing 6 characters (iteration label)
     
-    get_data_xy( Rmin, Rmax, N, data_reshape, physical_time[0], figure_title_new, figure_outdir )
-    # Note: numpy.fromfile returns an array for `physical_time` (even though
-    # it contains a single element), so use `physical_time[0]` as the scalar time.
+    parameters = plot_parameters( fast )
+    if fast:
+        outputs = get_data_xy_fast( Rmin, Rmax, N, data_reshape, physical_time, figure_title_new, figure_outdir,
+                                    parameters["dpi"], parameters["surface"] )
+    else:
+        outputs = get_data_xy( Rmin, Rmax, N, data_reshape, physical_time, figure_title_new, figure_outdir )
 
-    # Explicitly delete large arrays to free memory
-    del data
+    # Release the memory map of the dump
     del data_reshape
+    dump.close()
     
     print( "binary data file =", figure_title0, "plot has finished" )
     print(                                                             )
 
-    return
+    return outputs
     
     
 #########################################################################################
@@ -101,11 +121,12 @@ def get_data_xy( Rmin, Rmax, n, data0, time, figure_title, figure_outdir ):
     figure_contourplot_outdir = os.path.join(figure_outdir, "contour plot")
     figure_densityplot_outdir = os.path.join(figure_outdir, "density plot")
     figure_surfaceplot_outdir = os.path.join(figure_outdir, "surface plot")
+    outputs = []                                                           # paths of the saved figures
 
-    # Reconstruct coordinates from grid metadata
-    x = numpy.linspace(Rmin[0], Rmax[0], n[0])
-    y = numpy.linspace(Rmin[1], Rmax[1], n[1])
-    z = numpy.linspace(Rmin[2], Rmax[2], n[2])
+    # Reconstruct coordinates from grid metadata (cell centres or vertices, see grid_center_set)
+    x = grid_upsample.grid_coordinates(Rmin[0], Rmax[0], n[0], input_data.grid_center_set)
+    y = grid_upsample.grid_coordinates(Rmin[1], Rmax[1], n[1], input_data.grid_center_set)
+    z = grid_upsample.grid_coordinates(Rmin[2], Rmax[2], n[2], input_data.grid_center_set)
     # print(x)
     # print(y)
     # print(z)
@@ -136,14 +157,10 @@ def get_data_xy( Rmin, Rmax, n, data0, time, figure_title, figure_outdir ):
     # print( data_xy_0.shape )
     # print( data_xy.shape )
     
-    # Define finer coordinate grids for interpolation
-    x_new = numpy.linspace(Rmin[0], Rmax[0], int(2.5*n[0]))
-    y_new = numpy.linspace(Rmin[1], Rmax[1], int(2.5*n[1]))
-    z_new = numpy.linspace(Rmin[2], Rmax[2], int(2.5*n[2]))
+    # Interpolate data onto a 2.5 times finer grid with separable cubic splines along x and y
+    # (the slice is a regular grid; the spline weights are cached, so dumps of the same shape reuse them)
+    x_new, y_new, data_xy_fit = grid_upsample.upsample_plane( data_xy, Rmin[:2], Rmax[:2], 2.5, input_data.grid_center_set )
     X_new, Y_new = numpy.meshgrid(x_new, y_new)
-    
-    # Interpolate data onto the finer grid
-    data_xy_fit = scipy.interpolate.griddata( (X.flatten(), Y.flatten()), data_xy.flatten(), (X_new, Y_new), method="cubic" )
 
     # Plot 2D contour map
     fig, ax = plt.subplots()
@@ -158,7 +175,8 @@ def get_data_xy( Rmin, Rmax, n, data0, time, figure_title, figure_outdir ):
     ax.set_xlabel( "X [M]" )
     ax.set_ylabel( "Y [M]" )
     # plt.show()                                                                                                          # display figure
-    plt.savefig( os.path.join(figure_contourplot_outdir, figure_title + " time = " + str(time) + " contour_plot.pdf") )   # save figure
+    outputs.append( os.path.join(figure_contourplot_outdir, figure_title + " time = " + str(time) + " contour_plot.pdf") )
+    plt.savefig( outputs[-1] )   # save figure
     plt.close()
     
     # Plot 2D density (heat) map
@@ -173,7 +191,8 @@ def get_data_xy( Rmin, Rmax, n, data0, time, figure_title, figure_outdir ):
     ax.set_xlabel( "X [M]" )
     ax.set_ylabel( "Y [M]" )
     # plt.show() 
-    plt.savefig( os.path.join(figure_densityplot_outdir, figure_title + " time = " + str(time) + " density_plot.pdf") )
+    outputs.append( os.path.join(figure_densityplot_outdir, figure_title + " time = " + str(time) + " density_plot.pdf") )
+    plt.savefig( outputs[-1] )
     plt.close()
 
     # Plot 3D surface
@@ -185,10 +204,121 @@ def get_data_xy( Rmin, Rmax, n, data0, time, figure_title, figure_outdir ):
     ax.set_xlabel( "X [M]" )
     ax.set_ylabel( "Y [M]" )
     # plt.show()                                                              # display figure
-    plt.savefig( os.path.join(figure_surfaceplot_outdir, figure_title + " time = " + str(time) + " surface_plot.pdf") )   # save figure
+    outputs.append( os.path.join(figure_surfaceplot_outdir, figure_title + " time = " + str(time) + " surface_plot.pdf") )
+    plt.savefig( outputs[-1] )   # save figure
     plt.close()
 
-    return
+    return outputs
+
+####################################################################################
+
+
+
+####################################################################################
+
+# Fast render mode: the figures and axes are created once per process and only
+# the data is swapped between dumps (set_data / set_extent / set_clim for the
+# density map; the filled contours are redrawn on the persistent axes, since a
+# contour set cannot be updated in place). Figures are written as PNG, and the
+# 3D surface plot (the slowest one) is only drawn on request.
+
+class FastSliceFigures:
+
+    def __init__( self ):
+
+        self.contour_fig, self.contour_ax = plt.subplots()
+        self.contour_cax = None
+        self.contours    = []
+
+        self.density_fig, self.density_ax = plt.subplots()
+        self.image        = None
+        self.density_cbar = None
+
+        self.surface_fig = None
+        self.surface_ax  = None
+
+    def render( self, X_new, Y_new, data_xy_fit, data_xy, extent, time, figure_title, figure_outdir, dpi, surface ):
+
+        title = figure_title + "  physical time = " + str(time)
+        stem  = figure_title + " time = " + str(time)
+        outputs = []
+
+        # contour map: drop the previous contour sets and draw the new ones on the same axes
+        for contour_set in self.contours:
+            contour_set.remove()
+        contourf      = self.contour_ax.contourf( X_new, Y_new, data_xy_fit, cmap=plt.get_cmap('RdYlGn_r') )
+        contour       = self.contour_ax.contour(  X_new, Y_new, data_xy_fit, 8, colors='k', linewidths=0.5 )
+        self.contours = [ contourf, contour ]
+        if self.contour_cax is None:
+            self.contour_cax = self.contour_fig.colorbar( contourf ).ax
+            self.contour_ax.set_xlabel( "X [M]" )
+            self.contour_ax.set_ylabel( "Y [M]" )
+        else:
+            self.contour_cax.clear()
+            self.contour_fig.colorbar( contourf, cax=self.contour_cax )
+        self.contour_ax.set_title( title )
+        outputs.append( os.path.join(figure_outdir, "contour plot", stem + " contour_plot.png") )
+        self.contour_fig.savefig( outputs[-1], dpi=dpi, pil_kwargs=_FAST_PNG_OPTIONS )
+
+        # density map: swap the image data, extent and colour limits
+        if self.image is None:
+            self.image        = self.density_ax.imshow( data_xy, interpolation='bicubic', extent=extent )
+            self.density_cbar = self.density_fig.colorbar( self.image )
+            self.density_ax.invert_yaxis()
+            self.density_ax.set_xlabel( "X [M]" )
+            self.density_ax.set_ylabel( "Y [M]" )
+        else:
+            self.image.set_data( data_xy )
+            self.image.set_extent( extent )
+            self.density_ax.set_ylim( extent[3], extent[2] )
+        self.image.set_clim( numpy.nanmin(data_xy), numpy.nanmax(data_xy) )
+        self.density_cbar.update_normal( self.image )
+        self.density_ax.set_title( title )
+        outputs.append( os.path.join(figure_outdir, "density plot", stem + " density_plot.png") )
+        self.density_fig.savefig( outputs[-1], dpi=dpi, pil_kwargs=_FAST_PNG_OPTIONS )
+
+        # 3D surface, only when requested
+        if surface:
+            if self.surface_fig is None:
+                self.surface_fig = plt.figure()
+                self.surface_ax  = self.surface_fig.add_subplot( 111, projection='3d' )
+            self.surface_ax.clear()
+            self.surface_ax.plot_surface( X_new, Y_new, data_xy_fit, cmap='viridis' )
+            self.surface_ax.set_title( title )
+            self.surface_ax.set_xlabel( "X [M]" )
+            self.surface_ax.set_ylabel( "Y [M]" )
+            outputs.append( os.path.join(figure_outdir, "surface plot", stem + " surface_plot.png") )
+            self.surface_fig.savefig( outputs[-1], dpi=dpi, pil_kwargs=_FAST_PNG_OPTIONS )
+
+        return outputs
+
+# PNG writer options: light zlib compression, the PNG encoder is otherwise a large share of a frame
+_FAST_PNG_OPTIONS = { "compress_level": 1 }
+
+# figures of this process, created by the first fast-mode call
+_fast_figures = None
+
+# Plot a single binary dataset in fast mode (PNG output, persistent figures)
+
+def get_data_xy_fast( Rmin, Rmax, n, data0, time, figure_title, figure_outdir, dpi=150, surface=False ):
+
+    global _fast_figures
+    if _fast_figures is None:
+        _fast_figures = FastSliceFigures()
+
+    # Extract data on the central xy plane
+    if input_data.Symmetry == "no-symmetry":
+        data_xy = numpy.asarray( data0[n[2]//2,:,:] )
+    else:
+        data_xy = numpy.asarray( data0[0,:,:] )
+
+    x = grid_upsample.grid_coordinates(Rmin[0], Rmax[0], n[0], input_data.grid_center_set)
+    y = grid_upsample.grid_coordinates(Rmin[1], Rmax[1], n[1], input_data.grid_center_set)
+    x_new, y_new, data_xy_fit = grid_upsample.upsample_plane( data_xy, Rmin[:2], Rmax[:2], 2.5, input_data.grid_center_set )
+    X_new, Y_new = numpy.meshgrid(x_new, y_new)
+
+    extent = [x.min(), x.max(), y.max(), y.min()]
+    return _fast_figures.render( X_new, Y_new, data_xy_fit, data_xy, extent, time, figure_title, figure_outdir, dpi, surface )
 
 ####################################################################################
 
@@ -14,6 +14,7 @@ from   matplotlib.colors    import LogNorm
 from   mpl_toolkits.mplot3d import Axes3D
 ## import torch
 import AMSS_NCKU_Input      as input_data
+import binary_data_archive
 
 import os
 
@@ -23,6 +24,7 @@ import os
 def plot_binary_data( filename, binary_outdir, figure_outdir ):
 
     figure_title0 = filename.replace(binary_outdir + "/", "")  # remove directory prefix
+    figure_title0 = figure_title0.split(binary_data_archive.ARCHIVE_MEMBER_SEPARATOR)[-1]  # remove archive prefix
     figure_title  = figure_title0.replace(".bin", "")          # remove .bin suffix
     
     print()
@@ -31,31 +33,23 @@ def plot_binary_data( filename, binary_outdir, figure_outdir ):
 ###################################
 
     # Open file
-    # Read binary array in the AMSS-NCKU output order
-    with open(filename, 'rb') as file:
-
-        physical_time = numpy.fromfile( file, dtype=numpy.float64, count=1 )
-        nx, ny, nz    = numpy.fromfile( file, dtype=numpy.int32,   count=3 )
-        xmin, xmax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        ymin, ymax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        zmin, zmax    = numpy.fromfile( file, dtype=numpy.float64, count=2 )
-        data          = numpy.fromfile( file, dtype=numpy.float64          )
-        
-        # Now `data` array contains the binary data read from file
+    # Parse the header once; the payload stays on disk as a memmap in
+    # (nz, ny, nx) order, so only the slice used for plotting is read
+    # (filename may also name a dump inside an archive, "<archive>::<dump>")
+    dump = binary_data_archive.open_binary_data( filename )
+
+    physical_time    = dump.time
+    nx, ny, nz       = dump.shape
+    xmin, ymin, zmin = dump.rmin
+    xmax, ymax, zmax = dump.rmax
+    data_reshape     = dump.data
  
-    print( "obtained data shape  =", data.shape ) 
-    print( "obtained data size   =", data.size  ) 
+    print( "obtained data shape  =", data_reshape.shape ) 
+    print( "obtained data size   =", data_reshape.size  ) 
     print( "obtained data points =", nx, "*", ny, "*", nz, "=", nx*ny*nz )
     
 ###################################
 
-    # Reshape flat array into a multi-dimensional grid
-    data_reshape = data.reshape( (nz, ny, nx) ) ## this ordering produces correct plots
-    # print(data_reshape)
-
-    # data1 = data_reshape[0,:,:]
-    # print(data1)
-
     Rmin = [xmin, ymin, zmin] 
     Rmax = [xmax, ymax, zmax]
     N    = [nx, ny, nz]
@@ -69,16 +63,15 @@ def plot_binary_data( filename, binary_outdir, figure_outdir ):
 
     # Call plotting helper to produce plots
     figure_title0    = filename.replace(binary_outdir + "/", "") # remove directory prefix
+    figure_title0    = figure_title0.split(binary_data_archive.ARCHIVE_MEMBER_SEPARATOR)[-1]
     figure_title     = figure_title.replace(".bin", "")          # remove .bin suffix
     figure_title_new = figure_title[:-6]                            # strip trailing 6 characters (iteration label)
     
-    get_data_xy( Rmin, Rmax, N, data_reshape, physical_time[0], figure_title_new, figure_outdir )
-    # Note: numpy.fromfile returns an array for `physical_time` (even though
-    # it contains a single element), so use `physical_time[0]` as the scalar time.
+    get_data_xy( Rmin, Rmax, N, data_reshape, physical_time, figure_title_new, figure_outdir )
     
-    # Explicitly delete large arrays to free memory
-    del data
+    # Release the memory map of the dump
     del data_reshape
+    dump.close()
     
     print( "binary data file =", figure_title0, "plot has finished" )
     print(                                                             )
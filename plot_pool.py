@@ -0,0 +1,89 @@
+
+#################################################
+##
+## Process pool for rendering many figures in parallel
+##
+## Each worker switches matplotlib to the non-interactive Agg backend and
+## may cap its own address space (RLIMIT_AS), so that a single oversized
+## dump fails with a MemoryError in that worker instead of driving the
+## whole node into swap. Results come back in the order of the tasks.
+##
+#################################################
+
+import os
+import traceback
+import multiprocessing
+
+try:
+    import resource                    ## POSIX only; without it the memory cap is ignored
+except ImportError:
+    resource = None
+
+
+#########################################################################################
+
+## Number of tasks a worker renders before it is replaced by a fresh process
+## (matplotlib keeps caches alive across figures, so long-lived workers grow)
+
+RENDER_TASKS_PER_CHILD = 16
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Worker initialisation: Agg backend and optional memory cap (in MB)
+
+def _init_render_worker( memory_limit_mb ):
+
+    import matplotlib
+    matplotlib.use( "Agg", force=True )
+
+    if memory_limit_mb and resource is not None:
+        limit = int( memory_limit_mb ) << 20
+        soft, hard = resource.getrlimit( resource.RLIMIT_AS )
+        if hard != resource.RLIM_INFINITY:
+            limit = min( limit, hard )
+        resource.setrlimit( resource.RLIMIT_AS, ( limit, hard ) )
+
+    return
+
+## Worker: run one task, returning (value, None) or (None, error text)
+
+def _render_task( task ):
+
+    function, args = task
+    try:
+        return function( *args ), None
+    except Exception:
+        return None, traceback.format_exc()
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## render_in_pool(function, arguments, workers=None, memory_limit_mb=None)
+## Call function(*args) for every args tuple in arguments on a pool of workers.
+##
+##  - workers:         number of processes (None: all cores)
+##  - memory_limit_mb: address-space cap of each worker in MB (None or 0: no cap)
+##
+## Return a list with one (value, error) pair per task, in task order; error is
+## None on success and the formatted traceback of the failure otherwise. One
+## failing task does not stop the others.
+
+def render_in_pool( function, arguments, workers=None, memory_limit_mb=None ):
+
+    tasks = [ ( function, tuple(args) ) for args in arguments ]
+    if not tasks:
+        return []
+
+    workers = min( workers or os.cpu_count() or 1, len(tasks) )
+    with multiprocessing.Pool( workers, _init_render_worker, ( memory_limit_mb, ),
+                               maxtasksperchild=RENDER_TASKS_PER_CHILD ) as pool:
+        return list( pool.imap( _render_task, tasks ) )
+
+#########################################################################################
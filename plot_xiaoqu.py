@@ -14,28 +14,59 @@ import glob
 import os                                  ## operating system utilities
 
 import plot_binary_data
+import plot_pool
+import figure_manifest
+import binary_data_archive
+import monitor_data
+import series_decimation
+import orbit_analysis
+import waveform_store
 import AMSS_NCKU_Input as input_data
 
 # plt.rcParams['text.usetex'] = True  ## enable LaTeX fonts in plots
 
 
 
+####################################################################################
+
+## Line color of puncture i (the first four as before, then the tab10 cycle)
+
+PUNCTURE_COLORS = [ 'red', 'green', 'blue', 'gray' ]
+
+def puncture_color( i ):
+
+    if i < len(PUNCTURE_COLORS):
+        return PUNCTURE_COLORS[i]
+    return plt.cm.tab10( (i - len(PUNCTURE_COLORS)) % 10 )
+
+####################################################################################
+
+
+
 ####################################################################################
 
 ## Generate all 2D plots from AMSS-NCKU binary output
+## workers > 1 renders the files on a process pool (None: Plot_Workers of the input file),
+## each worker capped to memory_limit_mb MB of address space (None: Plot_Worker_Memory)
+## Files whose figures are listed as current in the figure manifest are skipped (force=True renders all)
 
-def generate_binary_data_plot( binary_outdir, figure_outdir ):
+def generate_binary_data_plot( binary_outdir, figure_outdir, workers=None, memory_limit_mb=None, force=False ):
 
-    # create directories to store generated figures
+    if workers is None:
+        workers = getattr( input_data, "Plot_Workers", 1 )
+    if memory_limit_mb is None:
+        memory_limit_mb = getattr( input_data, "Plot_Worker_Memory", 0 )
+
+    # create directories to store generated figures (kept from an earlier run)
 
     surface_plot_outdir = os.path.join( figure_outdir, "surface plot" )
-    os.mkdir( surface_plot_outdir )
+    os.makedirs( surface_plot_outdir, exist_ok=True )
 
     density_plot_outdir = os.path.join( figure_outdir, "density plot" )
-    os.mkdir( density_plot_outdir )
+    os.makedirs( density_plot_outdir, exist_ok=True )
 
     contour_plot_outdir = os.path.join( figure_outdir, "contour plot" )
-    os.mkdir( contour_plot_outdir )
+    os.makedirs( contour_plot_outdir, exist_ok=True )
 
     print(                                  )
     print( " Reading AMSS-NCKU Binary Data From Output " )
@@ -43,17 +74,40 @@ def generate_binary_data_plot( binary_outdir, figure_outdir ):
 
     print( " List of binary data " )
     
-    ## Set which files to plot (here: all .bin files)
-    globby = glob.glob( os.path.join(binary_outdir, '*.bin') ) 
-    file_list = []
-    for x in sorted(globby):
-        file_list.append(x)
+    ## Set which files to plot (here: all .bin files, and the dumps of archives as "<archive>::<dump>")
+    ## The catalog in the output directory only re-reads headers of new or changed dumps
+    file_list = sorted( entry.filename for entry in binary_data_archive.list_binary_data( binary_outdir ) )
+    for x in file_list:
         print(x)
 
-    ## Plot each file in the list
-    for filename in file_list:
-        print(filename)
-        plot_binary_data.plot_binary_data(filename, binary_outdir, figure_outdir)
+    ## Skip files whose figures are up to date (same dump header, size, mtime and plot parameters)
+    manifest   = figure_manifest.FigureManifest( figure_outdir )
+    parameters = plot_binary_data.plot_parameters()
+    keys       = { filename: figure_manifest.source_key( filename, parameters ) for filename in file_list }
+    stale      = [ filename for filename in file_list if force or not manifest.is_current( filename, keys[filename] ) ]
+    print( " Figures up to date for", len(file_list) - len(stale), "of", len(file_list), "binary data files" )
+
+    ## Plot each remaining file; the manifest is saved even if the rendering stops early
+    try:
+        if workers == 1:
+            for filename in stale:
+                print(filename)
+                outputs = plot_binary_data.plot_binary_data(filename, binary_outdir, figure_outdir)
+                manifest.record( filename, keys[filename], outputs )
+        else:
+            ## Farm the files out to the worker pool; results come back in file order
+            arguments = [ (filename, binary_outdir, figure_outdir) for filename in stale ]
+            results   = plot_pool.render_in_pool( plot_binary_data.plot_binary_data, arguments, workers, memory_limit_mb )
+            failed    = [ (filename, error) for filename, (outputs, error) in zip(stale, results) if error is not None ]
+            for filename, (outputs, error) in zip(stale, results):
+                if error is None:
+                    manifest.record( filename, keys[filename], outputs )
+            for filename, error in failed:
+                print( " Plot failed for", filename )
+                print( error )
+            print( " Rendered", len(stale) - len(failed), "of", len(stale), "binary data files" )
+    finally:
+        manifest.save()
 
     print(                        )
     print( " Binary Data Plot Has been Finished " )
@@ -76,12 +130,13 @@ def generate_puncture_orbit_plot( outdir, figure_outdir ):
     print(                                                   )
     
     # path to data file
-    file0 = os.path.join(outdir, "bssn_BH.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_BH.dat" )
     
     print( " Corresponding data file = ", file0 )
 
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
+    # load the data, stitching the segments of restarted runs (loaded once per RunData and shared by all plots of the run)
+    data = run.series( "bssn_BH.dat" ).data
 
     # print(data[:,0])
     # print(data[:,2])
@@ -109,14 +164,7 @@ def generate_puncture_orbit_plot( outdir, figure_outdir ):
         BH_Xmax[i] = max( BH_x )
         BH_Ymin[i] = min( BH_y )
         BH_Ymax[i] = max( BH_y )
-        if i==0:
-            plt.plot( BH_x, BH_y, color='red',   label="BH"+str(i+1), linewidth=2 )
-        elif i==1:
-            plt.plot( BH_x, BH_y, color='green', label="BH"+str(i+1), linewidth=2 )
-        elif i==2:
-            plt.plot( BH_x, BH_y, color='blue',  label="BH"+str(i+1), linewidth=2 )
-        elif i==3:
-            plt.plot( BH_x, BH_y, color='gray',  label="BH"+str(i+1), linewidth=2 )
+        plt.plot( BH_x, BH_y, color=puncture_color(i), label="BH"+str(i+1), linewidth=2 )
             
     plt.xlabel( "X [M]",          fontsize=16 )
     plt.ylabel( "Y [M]",          fontsize=16 )
@@ -155,14 +203,7 @@ def generate_puncture_orbit_plot( outdir, figure_outdir ):
         BH_Xmax[i] = max( BH_x )
         BH_Zmin[i] = min( BH_z )
         BH_Zmax[i] = max( BH_z )
-        if i==0:
-            plt.plot( BH_x, BH_z, color='red',   label="BH"+str(i+1), linewidth=2 )
-        elif i==1:
-            plt.plot( BH_x, BH_z, color='green', label="BH"+str(i+1), linewidth=2 )
-        elif i==2:
-            plt.plot( BH_x, BH_z, color='blue',  label="BH"+str(i+1), linewidth=2 )
-        elif i==3:
-            plt.plot( BH_x, BH_z, color='gray',  label="BH"+str(i+1), linewidth=2 )
+        plt.plot( BH_x, BH_z, color=puncture_color(i), label="BH"+str(i+1), linewidth=2 )
             
     plt.xlabel( "X [M]",          fontsize=16 )
     plt.ylabel( "Z [M]",          fontsize=16 )
@@ -201,14 +242,7 @@ def generate_puncture_orbit_plot( outdir, figure_outdir ):
         BH_Ymax[i] = max( BH_y )
         BH_Zmin[i] = min( BH_z )
         BH_Zmax[i] = max( BH_z )
-        if i==0:
-            plt.plot( BH_y, BH_z, color='red',   label="BH"+str(i+1), linewidth=2 )
-        elif i==1:
-            plt.plot( BH_y, BH_z, color='green', label="BH"+str(i+1), linewidth=2 )
-        elif i==2:
-            plt.plot( BH_y, BH_z, color='blue',  label="BH"+str(i+1), linewidth=2 )
-        elif i==3:
-            plt.plot( BH_y, BH_z, color='gray',  label="BH"+str(i+1), linewidth=2 )
+        plt.plot( BH_y, BH_z, color=puncture_color(i), label="BH"+str(i+1), linewidth=2 )
             
     plt.xlabel( "Y [M]",          fontsize=16 )
     plt.ylabel( "Z [M]",          fontsize=16 )
@@ -351,12 +385,13 @@ def generate_puncture_distence_plot( outdir, figure_outdir ):
     print(                                               )
     
     # path to data file
-    file0 = os.path.join(outdir, "bssn_BH.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_BH.dat" )
     
     print( " Corresponding data file = ", file0 )
 
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
+    # load the data, stitching the segments of restarted runs (loaded once per RunData and shared by all plots of the run)
+    data = run.series( "bssn_BH.dat" ).data
     
     # --------------------------
     
@@ -364,32 +399,16 @@ def generate_puncture_distence_plot( outdir, figure_outdir ):
 
     # Plot each black hole's distance R from the origin as a function of time
 
-    # initialize min/max arrays for BH distances
-    BH_Rmin = numpy.zeros(input_data.puncture_number)
-    BH_Rmax = numpy.zeros(input_data.puncture_number)
-
     # create a new figure
     fig = plt.figure( figsize=(8,8) )
     plt.title( " Black Hole Position R ", fontsize=18 )   # title
 
-    BH_time = data[:, 0]
+    BH_time      = data[:, 0]
+    BH_positions = orbit_analysis.puncture_positions( data, input_data.puncture_number )   # (puncture, time, xyz) view
+    BH_R_all     = numpy.linalg.norm( BH_positions, axis=-1 )                                # distance R of every puncture from the origin
     
     for i in range(input_data.puncture_number):
-        BH_x = data[:, 3*i+1]
-        BH_y = data[:, 3*i+2]
-        BH_z = data[:, 3*i+3]
-        BH_R = (BH_x*BH_x + BH_y*BH_y + BH_z*BH_z)**0.5
-        # compute distance R using numpy
-        BH_Rmin[i] = min( BH_R )
-        BH_Rmax[i] = max( BH_R )
-        if i==0:
-            plt.plot( BH_time, BH_R, color='red',   label="BH"+str(i+1), linewidth=2 )
-        elif i==1:
-            plt.plot( BH_time, BH_R, color='green', label="BH"+str(i+1), linewidth=2 )
-        elif i==2:
-            plt.plot( BH_time, BH_R, color='blue',  label="BH"+str(i+1), linewidth=2 )
-        elif i==3:
-            plt.plot( BH_time, BH_R, color='gray',  label="BH"+str(i+1), linewidth=2 )
+        plt.plot( *series_decimation.decimate( BH_time, BH_R_all[i] ), color=puncture_color(i), label="BH"+str(i+1), linewidth=2 )
 
     # set axis labels
     plt.xlabel( " $T$ [M] ",      fontsize=16 )
@@ -397,8 +416,8 @@ def generate_puncture_distence_plot( outdir, figure_outdir ):
     plt.legend( loc='upper right'             )
 
     # set axis ranges
-    R_min0 = min( BH_Rmin ) 
-    R_max0 = max( BH_Rmax )
+    R_min0 = BH_R_all.min() 
+    R_max0 = BH_R_all.max()
     R_min  = max( R_min0-2.0,  0.0 )
     R_max  = max( R_max0+2.0, +5.0 )
     plt.ylim( R_min, R_max )             # y axis range from R_min to R_max
@@ -411,31 +430,28 @@ def generate_puncture_distence_plot( outdir, figure_outdir ):
     
     # --------------------------
     
-    # extract coordinates for BH1 and BH2
-    BH_x1  = data[:, 1]
-    BH_y1  = data[:, 2]
-    BH_z1  = data[:, 3]
-    BH_x2  = data[:, 4]
-    BH_y2  = data[:, 5]
-    BH_z2  = data[:, 6]
-    
-    # compute relative distance R12 between BH1 and BH2
-    BH_R12 = ( (BH_x2-BH_x1)**2 + (BH_y2-BH_y1)**2 + (BH_z2-BH_z1)**2 )**0.5
+    # compute relative distances of all pairs of black holes (BH1-BH2 first)
+    BH_pairs, BH_R12_all = orbit_analysis.pairwise_separations( BH_positions )
     
     # --------------------------
     
-    # plot relative distance R12 between BH1 and BH2 as a function of time
+    # plot relative distances between the black holes as a function of time
 
     plt.figure( figsize=(8,8)                              )                          
     plt.title(  " Black Hole Distance ",       fontsize=18 )   
-    plt.plot(   BH_time, BH_R12, color='blue', linewidth=2 )
+    for k, (i, j) in enumerate(BH_pairs):
+        plt.plot( *series_decimation.decimate( BH_time, BH_R12_all[k] ), color=plt.cm.tab10( k % 10 ),  \
+                  label="BH"+str(j+1)+"-BH"+str(i+1), linewidth=2 )
     plt.xlabel( " $T$ [M] ",                   fontsize=16 )
-    plt.ylabel( " $R_{12}$ [M] ",              fontsize=16 )
+    if ( len(BH_pairs) == 1 ):
+        plt.ylabel( " $R_{12}$ [M] ",          fontsize=16 )
+    else:
+        plt.ylabel( " Separation [M] ",        fontsize=16 )
     plt.legend( loc='upper right'                          )
 
     # set axis ranges
-    R12_min0 = min( BH_R12 )
-    R12_max0 = max( BH_R12 ) 
+    R12_min0 = BH_R12_all.min()
+    R12_max0 = BH_R12_all.max() 
     R12_min  = max( R12_min0-2.0,  0.0 )
     R12_max  = max( R12_max0+2.0, +5.0 )
     plt.ylim( R12_min, R12_max )             # y axis range from R12_min to R12_max
@@ -468,12 +484,13 @@ def generate_puncture_orbit_plot3D( outdir, figure_outdir ):
     print(                               )
     
     # path to data file
-    file0 = os.path.join(outdir, "bssn_BH.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_BH.dat" )
     
     print( " Corresponding data file = ", file0 )
 
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
+    # load the data, stitching the segments of restarted runs (loaded once per RunData and shared by all plots of the run)
+    data = run.series( "bssn_BH.dat" ).data
 
     # initialize min/max arrays for black-hole coordinates
     BH_Xmin = numpy.zeros(input_data.puncture_number)
@@ -501,14 +518,7 @@ def generate_puncture_orbit_plot3D( outdir, figure_outdir ):
         BH_Ymax[i] = max( BH_y )
         BH_Zmin[i] = min( BH_z )
         BH_Zmax[i] = max( BH_z )
-        if i==0:
-            ax.plot( BH_x, BH_y, BH_z, color='red',   label="BH"+str(i+1), linewidth=2 )
-        elif i==1:
-            ax.plot( BH_x, BH_y, BH_z, color='green', label="BH"+str(i+1), linewidth=2 )
-        elif i==2:
-            ax.plot( BH_x, BH_y, BH_z, color='blue',  label="BH"+str(i+1), linewidth=2 )
-        elif i==3:
-            ax.plot( BH_x, BH_y, BH_z, color='gray',  label="BH"+str(i+1), linewidth=2 )
+        ax.plot( BH_x, BH_y, BH_z, color=puncture_color(i), label="BH"+str(i+1), linewidth=2 )
 
     # set axis labels
     ax.set_xlabel( "X [M]",          fontsize=16 )
@@ -555,7 +565,8 @@ def generate_gravitational_wave_psi4_plot( outdir, figure_outdir, detector_numbe
     
 
     # path to data file
-    file0 = os.path.join(outdir, "bssn_psi4.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_psi4.dat" )
 
     if ( detector_number_i == 0 ):
         print(                                                )
@@ -566,53 +577,18 @@ def generate_gravitational_wave_psi4_plot( outdir, figure_outdir, detector_numbe
 
     print( " Begin the Weyl conformal Psi4 plot for detector number = ", detector_number_i )
     
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
-    
-    # extract columns from the Phi4 file
-    time                 = data[:,0]
-    psi4_l2m2m_real      = data[:,1]
-    psi4_l2m2m_imaginary = data[:,2]
-    psi4_l2m1m_real      = data[:,3]
-    psi4_l2m1m_imaginary = data[:,4]
-    psi4_l2m0_real       = data[:,5]
-    psi4_l2m0_imaginary  = data[:,6]
-    psi4_l2m1_real       = data[:,7]
-    psi4_l2m1_imaginary  = data[:,8]
-    psi4_l2m2_real       = data[:,9]
-    psi4_l2m2_imaginary  = data[:,10]
-    
-    # NOTE: file0 is only a filename string here; no file object to close
-
-    # In Python division returns float; use integer division here
-    length = len(time) // input_data.Detector_Number 
-    
-    time2                 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2m_real2      = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2m_imaginary2 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1m_real2      = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1m_imaginary2 = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m0_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m0_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m1_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2_real2       = numpy.zeros( (input_data.Detector_Number, length) )
-    psi4_l2m2_imaginary2  = numpy.zeros( (input_data.Detector_Number, length) )
-    
-    # split data into arrays corresponding to each detector radius
-    for i in range(input_data.Detector_Number):
-        for j in range(length):
-            time2[i,j]                 = time[                 j*input_data.Detector_Number + i ]
-            psi4_l2m2m_real2[i,j]      = psi4_l2m2m_real[      j*input_data.Detector_Number + i ]
-            psi4_l2m2m_imaginary2[i,j] = psi4_l2m2m_imaginary[ j*input_data.Detector_Number + i ]
-            psi4_l2m1m_real2[i,j]      = psi4_l2m1m_real[      j*input_data.Detector_Number + i ]
-            psi4_l2m1m_imaginary2[i,j] = psi4_l2m1m_imaginary[ j*input_data.Detector_Number + i ]
-            psi4_l2m0_real2[i,j]       = psi4_l2m0_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m0_imaginary2[i,j]  = psi4_l2m0_imaginary[  j*input_data.Detector_Number + i ]
-            psi4_l2m1_real2[i,j]       = psi4_l2m1_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m1_imaginary2[i,j]  = psi4_l2m1_imaginary[  j*input_data.Detector_Number + i ]
-            psi4_l2m2_real2[i,j]       = psi4_l2m2_real[       j*input_data.Detector_Number + i ]
-            psi4_l2m2_imaginary2[i,j]  = psi4_l2m2_imaginary[  j*input_data.Detector_Number + i ]
+    # load the data, stitching the segments of restarted runs, as a store of all detectors and (l, m) modes
+    # (loaded once per RunData and shared by all plots and analyses of the run)
+    psi4 = waveform_store.psi4_store( run, input_data.Detector_Number, getattr(input_data, "GW_L_max", None) )
+    
+    # extract the l=2 modes from the store
+    time2                 = psi4.time
+    psi4_l2m0_real2       = psi4.mode( 2, 0 ).real
+    psi4_l2m0_imaginary2  = psi4.mode( 2, 0 ).imag
+    psi4_l2m1_real2       = psi4.mode( 2, 1 ).real
+    psi4_l2m1_imaginary2  = psi4.mode( 2, 1 ).imag
+    psi4_l2m2_real2       = psi4.mode( 2, 2 ).real
+    psi4_l2m2_imaginary2  = psi4.mode( 2, 2 ).imag
             
     # compute detector distance from input parameters
     Detector_Interval   = ( input_data.Detector_Rmax - input_data.Detector_Rmin ) / ( input_data.Detector_Number - 1 )
@@ -620,17 +596,17 @@ def generate_gravitational_wave_psi4_plot( outdir, figure_outdir, detector_numbe
     
     plt.figure( figsize=(8,8) )                                   ## figsize sets the figure size
     plt.title( f" Gravitational Wave $\Psi_{4}$   Detector Distance =  { Detector_Distance_R } ", fontsize=18 )   ## fontsize sets the title size
-    plt.plot( time2[detector_number_i], psi4_l2m0_real2[detector_number_i],      \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m0_real2[detector_number_i] ),      \
               color='red',    label="l=2 m=0 real",                       linewidth=2 )
-    plt.plot( time2[detector_number_i], psi4_l2m0_imaginary2[detector_number_i], \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m0_imaginary2[detector_number_i] ), \
               color='orange', label="l=2 m=0 imaginary",  linestyle='--', linewidth=2 )
-    plt.plot( time2[detector_number_i], psi4_l2m1_real2[detector_number_i],      \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m1_real2[detector_number_i] ),      \
               color='green',  label="l=2 m=1 real",                       linewidth=2 )
-    plt.plot( time2[detector_number_i], psi4_l2m1_imaginary2[detector_number_i], \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m1_imaginary2[detector_number_i] ), \
               color='cyan',   label="l=2 m=1 imaginary",  linestyle='--', linewidth=2 )
-    plt.plot( time2[detector_number_i], psi4_l2m2_real2[detector_number_i],      \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m2_real2[detector_number_i] ),      \
               color='black',  label="l=2 m=2 real",                       linewidth=2 )
-    plt.plot( time2[detector_number_i], psi4_l2m2_imaginary2[detector_number_i], \
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], psi4_l2m2_imaginary2[detector_number_i] ), \
               color='gray',   label="l=2 m=2 imaginary",  linestyle='--', linewidth=2 )
     plt.xlabel( "T [M]",          fontsize=16 )
     plt.ylabel( r"$R*\Psi$",      fontsize=16 )
@@ -662,7 +638,8 @@ def generate_ADMmass_plot( outdir, figure_outdir, detector_number_i ):
 
     
     # path to data file
-    file0 = os.path.join(outdir, "bssn_ADMQs.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_ADMQs.dat" )
 
     if ( detector_number_i == 0 ):
         print(                                                )
@@ -674,56 +651,19 @@ def generate_ADMmass_plot( outdir, figure_outdir, detector_number_i ):
     print( " Begin the ADM momentum plot for detector number =  ", detector_number_i )
 
 
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
+    # load the data, stitching the segments of restarted runs (loaded once per RunData and shared by all plots of the run)
+    # and split the interleaved rows by detector: zero-copy view shaped (detector, sample, column)
+    data2 = run.blocks( "bssn_ADMQs.dat", input_data.Detector_Number )
     
     # extract columns from the ADM momentum file
-    time     = data[:,0]
-    ADM_mass = data[:,1]
-    ADM_Px   = data[:,2]
-    ADM_Py   = data[:,3]
-    ADM_Pz   = data[:,4]
-    ADM_Jx   = data[:,5]
-    ADM_Jy   = data[:,6]
-    ADM_Jz   = data[:,7]
-    
-    # NOTE: file0 is only a filename string here; no file object to close
-
-    # In Python division returns a float; use integer division here
-    length = len(time) // input_data.Detector_Number
-    
-    '''
-    # split data into arrays corresponding to each detector radius (disabled)
-    # time2     = time.reshape( (input_data.Detector_Number, length) )
-    # ADM_mass2 = ADM_mass.reshape( (input_data.Detector_Number, length) )
-    # ADM_Px2   = ADM_Px.reshape( (input_data.Detector_Number, length) )
-    # ADM_Py2   = ADM_Py.reshape( (input_data.Detector_Number, length) )
-    # ADM_Pz2   = ADM_Pz.reshape( (input_data.Detector_Number, length) )
-    # ADM_Jx2   = ADM_Jx.reshape( (input_data.Detector_Number, length) )
-    # ADM_Jy2   = ADM_Jy.reshape( (input_data.Detector_Number, length) )
-    # ADM_Jz2   = ADM_Jz.reshape( (input_data.Detector_Number, length) )
-    '''
-    # Rows/cols in reshape were unclear; use straightforward indexing instead
-    time2     = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_mass2 = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Px2   = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Py2   = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Pz2   = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Jx2   = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Jy2   = numpy.zeros( (input_data.Detector_Number, length) )
-    ADM_Jz2   = numpy.zeros( (input_data.Detector_Number, length) )
-    
-    # split data into arrays corresponding to each detector radius
-    for i in range(input_data.Detector_Number):
-        for j in range(length):
-            time2[i,j]     = time[     j*input_data.Detector_Number + i ]
-            ADM_mass2[i,j] = ADM_mass[ j*input_data.Detector_Number + i ]
-            ADM_Px2[i,j]   = ADM_Px[   j*input_data.Detector_Number + i ]
-            ADM_Py2[i,j]   = ADM_Py[   j*input_data.Detector_Number + i ]
-            ADM_Pz2[i,j]   = ADM_Pz[   j*input_data.Detector_Number + i ]
-            ADM_Jx2[i,j]   = ADM_Jx[   j*input_data.Detector_Number + i ]
-            ADM_Jy2[i,j]   = ADM_Jy[   j*input_data.Detector_Number + i ]
-            ADM_Jz2[i,j]   = ADM_Jz[   j*input_data.Detector_Number + i ]
+    time2     = data2[:,:,0]
+    ADM_mass2 = data2[:,:,1]
+    ADM_Px2   = data2[:,:,2]
+    ADM_Py2   = data2[:,:,3]
+    ADM_Pz2   = data2[:,:,4]
+    ADM_Jx2   = data2[:,:,5]
+    ADM_Jy2   = data2[:,:,6]
+    ADM_Jz2   = data2[:,:,7]
             
     # compute detector distance from input parameters
     Detector_Interval   = ( input_data.Detector_Rmax - input_data.Detector_Rmin ) / ( input_data.Detector_Number - 1 )
@@ -732,10 +672,10 @@ def generate_ADMmass_plot( outdir, figure_outdir, detector_number_i ):
     # Plot ADM momentum for the current detector radius
     plt.figure( figsize=(8,8) )                  
     plt.title(f" ADM Momentum    Detector Distence = {Detector_Distance_R}", fontsize=18 )   
-    plt.plot( time2[detector_number_i], ADM_mass2[detector_number_i], color='red',   label="ADM Mass", linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Px2[detector_number_i],   color='green', label="ADM Px",   linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Py2[detector_number_i],   color='cyan',  label="ADM Py",   linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Pz2[detector_number_i],   color='blue',  label="ADM Pz",   linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_mass2[detector_number_i] ), color='red',   label="ADM Mass", linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Px2[detector_number_i] ),   color='green', label="ADM Px",   linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Py2[detector_number_i] ),   color='cyan',  label="ADM Py",   linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Pz2[detector_number_i] ),   color='blue',  label="ADM Pz",   linewidth=2 )
     plt.xlabel( "T [M]",            fontsize=16 )
     plt.ylabel( "ADM Momentum [M]", fontsize=16 )
     plt.legend( loc='upper right'               )
@@ -745,10 +685,10 @@ def generate_ADMmass_plot( outdir, figure_outdir, detector_number_i ):
     # Plot ADM angular momentum for the current detector radius
     plt.figure( figsize=(8,8) )                  
     plt.title(f" ADM Angular Momentum    Detector Distence = {Detector_Distance_R}", fontsize=18 )   
-    # plt.plot( time2[detector_number_i], ADM_mass2[detector_number_i], color='red',   label="ADM Mass", linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Jx2[detector_number_i],   color='green', label="ADM Jx",   linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Jy2[detector_number_i],   color='cyan',  label="ADM Jy",   linewidth=2 )
-    plt.plot( time2[detector_number_i], ADM_Jz2[detector_number_i],   color='blue',  label="ADM Jz",   linewidth=2 )
+    # plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_mass2[detector_number_i] ), color='red',   label="ADM Mass", linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Jx2[detector_number_i] ),   color='green', label="ADM Jx",   linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Jy2[detector_number_i] ),   color='cyan',  label="ADM Jy",   linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[detector_number_i], ADM_Jz2[detector_number_i] ),   color='blue',  label="ADM Jz",   linewidth=2 )
     plt.xlabel( "T [M]",                        fontsize=16 )
     plt.ylabel( "ADM Angular Momentum [$M^2$]", fontsize=16 )
     plt.legend( loc='upper right'                           )
@@ -776,7 +716,8 @@ def generate_ADMmass_plot( outdir, figure_outdir, detector_number_i ):
 def generate_constraint_check_plot( outdir, figure_outdir, input_level_number ):
 
     # path to data file
-    file0 = os.path.join(outdir, "bssn_constraint.dat")
+    run   = monitor_data.open_run( outdir )    # outdir is the data directory or a monitor_data.RunData
+    file0 = run.path( "bssn_constraint.dat" )
 
     if ( input_level_number == 0 ):
         print(                                                   )
@@ -787,60 +728,30 @@ def generate_constraint_check_plot( outdir, figure_outdir, input_level_number ):
 
     print( " Begin the constraint violation plot for grid level number =  ", input_level_number )
     
-    # load the full data file (assumed whitespace-separated floats)
-    data = numpy.loadtxt(file0)
+    # load the data, stitching the segments of restarted runs (loaded once per RunData and shared by all plots of the run)
+    # and split the interleaved rows by grid level: zero-copy view shaped (level, sample, column)
+    # If grid type is Shell-Patch, the shell is written as an extra level before level 0
+    length0, level_offset = monitor_data.constraint_levels( input_data.grid_level, input_data.basic_grid_set )
+    level_number          = input_level_number + level_offset
+    data2 = run.blocks( "bssn_constraint.dat", length0 )
     
     # extract columns from the constraint data file
-    time          = data[:,0]
-    Constraint_H  = data[:,1]
-    Constraint_Px = data[:,2]
-    Constraint_Py = data[:,3]
-    Constraint_Pz = data[:,4]
-    Constraint_Gx = data[:,5]
-    Constraint_Gy = data[:,6]
-    Constraint_Gz = data[:,7]
-    
-    # NOTE: file0 is only a filename string here; no file object to close
-
-    # initialize arrays for different quantities
-    
-    if (input_data.basic_grid_set == "Patch"):
-        level_number = input_level_number   
-        length0      = input_data.grid_level
-        # In Python division returns a float; use integer division here
-        length1      = len(time) // length0   
-    elif (input_data.basic_grid_set == "Shell-Patch"):
-        # If grid type is Shell-Patch, increment the grid-level count
-        level_number = input_level_number + 1
-        length0      = input_data.grid_level + 1 
-        # In Python division returns a float; use integer division here
-        length1      = len(time) // length0   
-    
-    time2          = numpy.zeros( (length0, length1) )
-    Constraint_H2  = numpy.zeros( (length0, length1) )
-    Constraint_Px2 = numpy.zeros( (length0, length1) )
-    Constraint_Py2 = numpy.zeros( (length0, length1) )
-    Constraint_Pz2 = numpy.zeros( (length0, length1) )
-    Constraint_Gx2 = numpy.zeros( (length0, length1) )
-    Constraint_Gy2 = numpy.zeros( (length0, length1) )
-    Constraint_Gz2 = numpy.zeros( (length0, length1) )
-    
-    # split data into arrays corresponding to each grid level
-    for i in range(length0):
-        for j in range(length1):
-            time2[i,j]          = time[          j*length0 + i ]
-            Constraint_H2[i,j]  = Constraint_H[  j*length0 + i ]
-            Constraint_Px2[i,j] = Constraint_Px[ j*length0 + i ]
-            Constraint_Py2[i,j] = Constraint_Py[ j*length0 + i ]
-            Constraint_Pz2[i,j] = Constraint_Pz[ j*length0 + i ]
+    time2          = data2[:,:,0]
+    Constraint_H2  = data2[:,:,1]
+    Constraint_Px2 = data2[:,:,2]
+    Constraint_Py2 = data2[:,:,3]
+    Constraint_Pz2 = data2[:,:,4]
+    Constraint_Gx2 = data2[:,:,5]
+    Constraint_Gy2 = data2[:,:,6]
+    Constraint_Gz2 = data2[:,:,7]
     
     # Plot constraint violation for the outermost grid level
     plt.figure( figsize=(8,8) )                    
     plt.title( f" ADM Constraint  Grid Level = {input_level_number}", fontsize=18 )   
-    plt.plot( time2[level_number], Constraint_H2[level_number],  color='red',   label="ADM Constraint H",  linewidth=2 )
-    plt.plot( time2[level_number], Constraint_Px2[level_number], color='green', label="ADM Constraint Px", linewidth=2 )
-    plt.plot( time2[level_number], Constraint_Py2[level_number], color='cyan',  label="ADM Constraint Py", linewidth=2 )
-    plt.plot( time2[level_number], Constraint_Pz2[level_number], color='blue',  label="ADM Constraint Pz", linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[level_number], Constraint_H2[level_number] ),  color='red',   label="ADM Constraint H",  linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[level_number], Constraint_Px2[level_number] ), color='green', label="ADM Constraint Px", linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[level_number], Constraint_Py2[level_number] ), color='cyan',  label="ADM Constraint Py", linewidth=2 )
+    plt.plot( *series_decimation.decimate( time2[level_number], Constraint_Pz2[level_number] ), color='blue',  label="ADM Constraint Pz", linewidth=2 )
     plt.xlabel( "T [M]",          fontsize=16 )
     plt.ylabel( "ADM Constraint", fontsize=16 )
     plt.legend( loc='upper right'             )
@@ -0,0 +1,276 @@
+
+#################################################
+##
+## Energy, linear momentum and angular momentum radiated in gravitational
+## waves, from the multi-mode psi4 store of all detectors
+##
+## With psi4 = d^2/dt^2 ( h+ - i hx ) decomposed in spin-weight -2 harmonics,
+## the news N_lm = int psi4_lm dt and the strain H_lm = int N_lm dt, the
+## fluxes are (Ruiz, Alcubierre, Nunez, Takahashi 2008, Gen. Rel. Grav. 40, 1705;
+## the store already holds r psi4, so the r^2 factors are absorbed)
+##
+##   dE/dt          = 1/(16 pi) sum |N_lm|^2
+##   dPx/dt + i dPy/dt = 1/(8 pi) sum N_lm ( a_lm conj N_l,m+1 + b_l,-m conj N_l-1,m+1 - b_l+1,m+1 conj N_l+1,m+1 )
+##   dPz/dt         = 1/(16 pi) sum N_lm ( c_lm conj N_lm + d_lm conj N_l-1,m + d_l+1,m conj N_l+1,m )
+##   dJx/dt         = 1/(32 pi) Im sum H_lm ( f_lm conj N_l,m+1 + f_l,-m conj N_l,m-1 )
+##   dJy/dt         = -1/(32 pi) Re sum H_lm ( f_lm conj N_l,m+1 - f_l,-m conj N_l,m-1 )
+##   dJz/dt         = 1/(16 pi) Im sum m H_lm conj N_lm
+##
+## The news and the strain of all detectors and modes come from one batched
+## fixed-frequency integration (or cumulative trapezoid sums), the fluxes are
+## sums over mode pairs of whole (detector, time) arrays and the running
+## totals cumulative trapezoid sums, so the cost is O(N log N) in the number
+## of samples (O(N) with trapezoid integration).
+##
+## Typical use:
+##   store  = waveform_store.psi4_store( run, input_data.Detector_Number, input_data.GW_L_max )
+##   fluxes = radiated_fluxes.compute_fluxes( store, omega_cut )
+##   fluxes["energy"][detector, -1]      ## energy radiated through one detector sphere
+##
+#################################################
+
+import numpy
+import scipy.integrate
+
+import monitor_data
+import run_summary
+import waveform_integration
+import waveform_store
+
+
+#########################################################################################
+
+## Speed of light [km/s], for kick velocities in physical units
+
+SPEED_OF_LIGHT_KM_S = 299792.458
+
+## Integration methods of psi4: fixed-frequency integration or cumulative trapezoid sums
+
+FLUX_INTEGRATION_METHODS = ( "ffi", "trapezoid" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Coupling coefficients of the flux formulae (arrays in, arrays out; Ruiz et al. 2008, eqs. 3.15-3.24)
+
+def coefficient_a( l, m ):
+    return numpy.sqrt( ( l - m ) * ( l + m + 1.0 ) ) / ( l * ( l + 1.0 ) )
+
+def coefficient_b( l, m ):
+    return numpy.sqrt( numpy.maximum( ( l - 2.0 ) * ( l + 2.0 ) * ( l + m ) * ( l + m - 1.0 ), 0.0 )
+                       / ( ( 2.0*l - 1.0 ) * ( 2.0*l + 1.0 ) ) ) / ( 2.0 * l )
+
+def coefficient_c( l, m ):
+    return 2.0 * m / ( l * ( l + 1.0 ) )
+
+def coefficient_d( l, m ):
+    return numpy.sqrt( numpy.maximum( ( l - 2.0 ) * ( l + 2.0 ) * ( l - m ) * ( l + m ), 0.0 )
+                       / ( ( 2.0*l - 1.0 ) * ( 2.0*l + 1.0 ) ) ) / l
+
+def coefficient_f( l, m ):
+    return numpy.sqrt( numpy.maximum( l * ( l + 1.0 ) - m * ( m + 1.0 ), 0.0 ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## mode_pairs(modes, dl, dm)
+## Indices (k, k2) of all mode pairs (l, m), (l + dl, m + dm) present in modes,
+## with the l and m of the first mode.
+
+def mode_pairs( modes, dl, dm ):
+
+    index = { ( l, m ): k for k, ( l, m ) in enumerate( modes ) }
+    pairs = [ ( k, index[ ( l + dl, m + dm ) ], l, m ) for k, ( l, m ) in enumerate( modes ) if ( l + dl, m + dm ) in index ]
+    if not pairs:
+        empty = numpy.zeros( 0, dtype=numpy.int64 )
+        return empty, empty, empty.astype( numpy.float64 ), empty.astype( numpy.float64 )
+
+    k, k2, l, m = ( numpy.array( column ) for column in zip( *pairs ) )
+    return k, k2, l.astype( numpy.float64 ), m.astype( numpy.float64 )
+
+## pair_sum(first, second, modes, dl, dm, coefficient)
+## sum over the pairs (l, m), (l + dl, m + dm) of coefficient(l, m) first_lm conj second_l+dl,m+dm,
+## for arrays (detector, mode, time); returns (detector, time).
+
+def pair_sum( first, second, modes, dl, dm, coefficient ):
+
+    k, k2, l, m = mode_pairs( modes, dl, dm )
+    if len(k) == 0:
+        return numpy.zeros( first.shape[:1] + first.shape[2:], dtype=numpy.complex128 )
+    return numpy.einsum( "k,dkt,dkt->dt", coefficient( l, m ), first[:, k], numpy.conj( second[:, k2] ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## integrate_psi4(store, omega_cut=None, method="ffi", workers=None)
+## News N and strain H of every (detector, mode) of a WaveformStore of psi4,
+## both shaped (detector, mode, time).
+##
+##  - "ffi":       fixed-frequency integration (needs omega_cut), one batched transform per
+##                 integral, without the window gain correction of the strain plot
+##  - "trapezoid": cumulative trapezoid sums from zero at the first sample (suits
+##                 data that start without radiation; drifts with junk radiation)
+
+def integrate_psi4( store, omega_cut=None, method="ffi", workers=None ):
+
+    if method == "ffi":
+        if omega_cut is None:
+            raise ValueError( "fixed-frequency integration needs omega_cut" )
+        engine = waveform_integration.FixedFrequencyIntegration( store.data.shape[-1], store.time[0, 1] - store.time[0, 0],
+                                                                 omega_cut, workers=workers, window_gain=False )
+        return engine.news( store.data ), engine.strain( store.data )
+
+    if method == "trapezoid":
+        dt     = store.time[0, 1] - store.time[0, 0]
+        news   = scipy.integrate.cumulative_trapezoid( store.data, dx=dt, axis=-1, initial=0.0 )
+        strain = scipy.integrate.cumulative_trapezoid( news,       dx=dt, axis=-1, initial=0.0 )
+        return news, strain
+
+    raise ValueError( f"unknown integration method {method!r}, expected one of {FLUX_INTEGRATION_METHODS}" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## Fluxes of arrays (detector, mode, time) of the news N and the strain H with the
+## given modes: energy_flux is (detector, time), momentum_flux and
+## angular_momentum_flux are (detector, 3, time).
+
+def energy_flux( news ):
+    return numpy.sum( news.real**2 + news.imag**2, axis=1 ) / ( 16.0 * numpy.pi )
+
+def momentum_flux( news, modes ):
+
+    plus = (   pair_sum( news, news, modes,  0, 1, coefficient_a )
+             + pair_sum( news, news, modes, -1, 1, lambda l, m: coefficient_b( l, -m ) )
+             - pair_sum( news, news, modes,  1, 1, lambda l, m: coefficient_b( l + 1, m + 1 ) ) ) / ( 8.0 * numpy.pi )
+    z    = (   pair_sum( news, news, modes,  0, 0, coefficient_c )
+             + pair_sum( news, news, modes, -1, 0, coefficient_d )
+             + pair_sum( news, news, modes,  1, 0, lambda l, m: coefficient_d( l + 1, m ) ) ) / ( 16.0 * numpy.pi )
+
+    return numpy.stack( [ plus.real, plus.imag, z.real ], axis=1 )
+
+def angular_momentum_flux( news, strain, modes ):
+
+    raising  = pair_sum( strain, news, modes, 0,  1, coefficient_f )
+    lowering = pair_sum( strain, news, modes, 0, -1, lambda l, m: coefficient_f( l, -m ) )
+    z        = pair_sum( strain, news, modes, 0,  0, lambda l, m: m )
+
+    return numpy.stack( [   ( raising + lowering ).imag / ( 32.0 * numpy.pi ),
+                          - ( raising - lowering ).real / ( 32.0 * numpy.pi ),
+                            z.imag / ( 16.0 * numpy.pi ) ], axis=1 )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## compute_fluxes(store, omega_cut=None, method="ffi", workers=None)
+## Fluxes and running totals of all detectors of a WaveformStore of (r) psi4,
+## sampled uniformly in time.
+## Returns a dict of arrays:
+##
+##  - time:                  (detector, time)
+##  - energy_flux, energy:   (detector, time)          dE/dt and E radiated up to t
+##  - momentum_flux, momentum:                 (detector, 3, time)
+##  - angular_momentum_flux, angular_momentum: (detector, 3, time)
+
+def compute_fluxes( store, omega_cut=None, method="ffi", workers=None ):
+
+    news, strain = integrate_psi4( store, omega_cut, method, workers )
+
+    fluxes = { "time":                  store.time,
+               "energy_flux":           energy_flux( news ),
+               "momentum_flux":         momentum_flux( news, store.modes ),
+               "angular_momentum_flux": angular_momentum_flux( news, strain, store.modes ) }
+
+    dt = store.time[0, 1] - store.time[0, 0]
+    for name in ( "energy", "momentum", "angular_momentum" ):
+        fluxes[name] = scipy.integrate.cumulative_trapezoid( fluxes[name + "_flux"], dx=dt, axis=-1, initial=0.0 )
+
+    return fluxes
+
+## kick_velocity(momentum, mass)
+## Recoil velocity of the remnant (units of c) from the radiated momentum: the
+## remnant moves opposite to the radiation, v = - P / mass.
+
+def kick_velocity( momentum, mass ):
+    return - numpy.asarray( momentum ) / mass
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## write_flux_table(filename, fluxes)
+## Running fluxes and totals as a monitor-style text file, one row per
+## detector per time (read back with monitor_data.load_monitor_series and block_size = detectors).
+
+def write_flux_table( filename, fluxes ):
+
+    names   = [ "time", "dE/dt", "E" ]
+    columns = [ fluxes["time"], fluxes["energy_flux"], fluxes["energy"] ]
+    for name, symbol in ( ( "momentum", "P" ), ( "angular_momentum", "J" ) ):
+        for axis, component in enumerate( "xyz" ):
+            names   += [ f"d{symbol}{component}/dt", f"{symbol}{component}" ]
+            columns += [ fluxes[name + "_flux"][:, axis], fluxes[name][:, axis] ]
+
+    ## (detector, time) columns -> rows ordered by time, then detector
+    table = numpy.stack( columns, axis=-1 ).transpose( 1, 0, 2 ).reshape( -1, len(columns) )
+    numpy.savetxt( filename, table, fmt="%.15e", header="Radiated energy, linear and angular momentum\n\n" + " ".join( names ) )
+
+    return
+
+## write_flux_summary(source, summary_directory, detector_number, omega_cut, radii, total_mass, l_max=None,
+##                    method="ffi", table_filename=None, workers=None)
+## Radiated energy, momentum, angular momentum and kick of every detector of a
+## run, written to the "fluxes" section of the run summary (and, with
+## table_filename, the running totals to a text table). Returns the fluxes.
+
+def write_flux_summary( source, summary_directory, detector_number, omega_cut, radii, total_mass, l_max=None,
+                        method="ffi", table_filename=None, workers=None ):
+
+    run    = monitor_data.open_run( source )
+    store  = waveform_store.psi4_store( run, detector_number, l_max )
+    fluxes = compute_fluxes( store, omega_cut, method, workers )
+
+    detectors = []
+    for d in range( detector_number ):
+        energy   = float( fluxes["energy"][d, -1] )
+        momentum = fluxes["momentum"][d, :, -1]
+        kick     = kick_velocity( momentum, total_mass - energy )
+        detectors.append( { "radius":           float( radii[d] ),
+                            "energy":           energy,
+                            "momentum":         momentum.tolist(),
+                            "angular_momentum": fluxes["angular_momentum"][d, :, -1].tolist(),
+                            "kick_velocity":    kick.tolist(),
+                            "kick_km_s":        float( numpy.linalg.norm( kick ) * SPEED_OF_LIGHT_KM_S ) } )
+
+    summary  = { "method": method, "omega_cut": float( omega_cut ) if omega_cut is not None else None,
+                 "modes": len( store.modes ), "time": float( store.time[0, -1] ), "detectors": detectors }
+    filename = run_summary.update_run_summary( summary_directory, "fluxes", summary )
+    if table_filename is not None:
+        write_flux_table( table_filename, fluxes )
+
+    for entry in detectors:
+        print( " Detector R =", entry["radius"], " radiated energy =", entry["energy"],
+               " kick =", round( entry["kick_km_s"], 3 ), "km/s" )
+    print( " Flux summary written to", filename )
+
+    return fluxes
+
+#########################################################################################
+
@@ -0,0 +1,55 @@
+
+#################################################
+##
+## Run summary: a small JSON file in the run directory with the results of
+## the analyses (orbit, radiated fluxes, kick, ...), one section per analysis,
+## so that catalogs and dashboards can query a run without re-reading its
+## monitor files.
+##
+#################################################
+
+import os
+import json
+
+
+#########################################################################################
+
+## Name of the summary file in the run directory
+
+RUN_SUMMARY_FILENAME = "run_summary.json"
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## read_run_summary(directory)
+## Contents of the summary of a run directory ({} if there is none yet).
+
+def read_run_summary( directory ):
+
+    filename = os.path.join( directory, RUN_SUMMARY_FILENAME )
+    if not os.path.exists( filename ):
+        return {}
+    with open( filename, encoding="utf-8" ) as file:
+        return json.load( file )
+
+## update_run_summary(directory, section, values)
+## Replace one section of the summary, keeping the others; the file is replaced atomically.
+## Return the path of the summary file.
+
+def update_run_summary( directory, section, values ):
+
+    summary          = read_run_summary( directory )
+    summary[section] = values
+
+    filename  = os.path.join( directory, RUN_SUMMARY_FILENAME )
+    temporary = filename + ".tmp"
+    with open( temporary, "w", encoding="utf-8" ) as file:
+        json.dump( summary, file, indent=1, sort_keys=True )
+    os.replace( temporary, filename )
+
+    return filename
+
+#########################################################################################
@@ -0,0 +1,115 @@
+
+#################################################
+##
+## Decimation of long time series for plotting
+##
+## A figure a few thousand pixels wide cannot show more than a minimum and a
+## maximum per pixel column, so the samples of a series are split into
+## target/2 consecutive bins and only the smallest and the largest value of
+## every bin (plus the end points) are kept. Peaks and the envelope of
+## oscillations are drawn exactly as with all samples, while matplotlib
+## and the PDF/PNG writers handle a bounded number of points.
+##
+## The bins hold equal numbers of samples; the monitor files are written at
+## a fixed time interval, so they are also (close to) equally wide in time.
+##
+#################################################
+
+import numpy
+
+
+#########################################################################################
+
+## Points kept per series (about two per pixel column of a wide figure)
+
+DECIMATION_TARGET = 4000
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## minmax_indices(y, target=DECIMATION_TARGET)
+## Sorted indices of the samples kept from y: first and last sample and, for
+## each of target/2 bins, the sample with the smallest and the largest value.
+
+def minmax_indices( y, target=DECIMATION_TARGET ):
+
+    y = numpy.asarray( y )
+    n = len( y )
+    if target <= 0 or n <= target:
+        return numpy.arange( n )
+
+    width = -( -n // max( target // 2, 1 ) )          ## samples per bin, rounded up
+    nbin  = -( -n // width )
+
+    padded       = numpy.empty( nbin * width, dtype=y.dtype )
+    padded[:n]   = y
+    padded[n:]   = y[-1]                              ## repeat the last value to fill the last bin
+    blocks       = padded.reshape( nbin, width )
+    offsets      = numpy.arange( nbin ) * width
+
+    indices = numpy.concatenate( ( offsets + numpy.argmin( blocks, axis=1 ),
+                                   offsets + numpy.argmax( blocks, axis=1 ),
+                                   [ 0, n - 1 ] ) )
+    return numpy.unique( numpy.minimum( indices, n - 1 ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## decimate(x, y, target=DECIMATION_TARGET)
+## Return (x, y) reduced to at most about target points with minmax_indices;
+## series that are already short enough are returned unchanged.
+##
+## Usage in the plotters:
+##   plt.plot( *series_decimation.decimate( time, psi4 ), color='red', ... )
+
+def decimate( x, y, target=DECIMATION_TARGET ):
+
+    if len( y ) <= target or target <= 0:
+        return x, y
+
+    indices = minmax_indices( y, target )
+    return numpy.asarray( x )[indices], numpy.asarray( y )[indices]
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## decimate_band(x, lower, upper, target=DECIMATION_TARGET)
+## Return (x, lower, upper) of a shaded band reduced to about target points:
+## each of target/2 bins keeps its first and last x with the smallest lower
+## and the largest upper edge of the bin, so the reduced band covers the
+## original one everywhere.
+##
+## Usage in the plotters:
+##   plt.fill_between( *series_decimation.decimate_band( time, y - error, y + error ), ... )
+
+def decimate_band( x, lower, upper, target=DECIMATION_TARGET ):
+
+    n = len( lower )
+    if target <= 0 or n <= target:
+        return x, lower, upper
+
+    x     = numpy.asarray( x )
+    lower = numpy.asarray( lower )
+    upper = numpy.asarray( upper )
+
+    width  = -( -n // max( target // 2, 1 ) )         ## samples per bin, rounded up
+    starts = numpy.arange( 0, n, width )
+    ends   = numpy.minimum( starts + width, n ) - 1
+
+    low  = numpy.minimum.reduceat( lower, starts )
+    high = numpy.maximum.reduceat( upper, starts )
+
+    return ( numpy.stack( ( x[starts], x[ends] ), axis=1 ).ravel(),
+             numpy.repeat( low,  2 ),
+             numpy.repeat( high, 2 ) )
+
+#########################################################################################
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# tests/helpers.py holds the file writers shared by the test modules; keep it
+# importable whatever import mode pytest runs with
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,70 @@
+"""Writers of the binary and text files the readers are tested on, shared by the test modules."""
+
+import numpy as np
+
+import waveform_store
+
+
+def write_dump(path, time, data, bbox):
+    nz, ny, nx = data.shape
+    with open(path, "wb") as f:
+        np.array([time], dtype=np.float64).tofile(f)
+        np.array([nx, ny, nz], dtype=np.int32).tofile(f)
+        np.array(bbox, dtype=np.float64).tofile(f)
+        np.ascontiguousarray(data, dtype=np.float64).tofile(f)
+
+
+def mode_names(l_max):
+    names = ["time"]
+    for l, m in waveform_store.mode_list(l_max):
+        names += [f"R{l:02d}m{m:03d}", f"I{l:02d}m{m:03d}"]
+    return names
+
+
+def write_psi4(path, time, psi4, named=True):
+    """bssn_psi4.dat as written by ABE: one row per (time, detector), psi4[detector, mode, time]."""
+    detectors, nmode, _ = psi4.shape
+    l_max = waveform_store.l_max_from_columns(1 + 2 * nmode)
+    header = "".join(f"{name:>16}" for name in mode_names(l_max)) if named else "time"
+    with open(path, "w") as file:
+        file.write("# File created on Mon Jan  6 10:00:00 2025\n#\n         # " + header.strip() + "\n")
+        for k, t in enumerate(time):
+            for d in range(detectors):
+                columns = np.column_stack([psi4[d, :, k].real, psi4[d, :, k].imag]).ravel()
+                file.write(" ".join(f"{v:.17g}" for v in [t, *columns]) + "\n")
+
+
+def write_checkpoint(path, time, grids, porgls, patch_shapes, nvariable, movls=1):
+    """Write a *_cgh.CHK file in the checkpoint::writecheck_cgh layout.
+
+    grids[lev] is a list of (bbox, shape, handle); returns the field data per level/patch.
+    """
+    levels = len(grids)
+    fields = []
+    with open(path, "wb") as f:
+        np.array([time], dtype=np.float64).tofile(f)
+        np.array([levels, movls, len(porgls)], dtype=np.int32).tofile(f)
+        np.array([len(g) for g in grids], dtype=np.int32).tofile(f)
+        np.arange(levels, dtype=np.float64).tofile(f)
+        for lev in range(levels):
+            for bbox, shape, handle in grids[lev]:
+                np.array(bbox, dtype=np.float64).tofile(f)
+                np.array(shape, dtype=np.int32).tofile(f)
+                np.array(handle, dtype=np.float64).tofile(f)
+            np.array(porgls, dtype=np.float64).tofile(f)
+        value = 0.0
+        for lev, shapes in enumerate(patch_shapes):
+            for patch, (nx, ny, nz) in enumerate(shapes):
+                for var in range(nvariable):
+                    data = value + np.arange(nx * ny * nz, dtype=np.float64).reshape((nz, ny, nx))
+                    data.tofile(f)
+                    fields.append((lev, patch, var, data))
+                    value += 1000.0
+    return fields
+
+
+# level 0: one 8^3 box of spacing 1; level 1: one box of spacing 0.5
+GRIDS = [
+    [([-4, -4, 0, 4, 4, 4], [8, 8, 4], [0, 0, 0])],
+    [([-2, -2, 0, 2, 2, 2], [8, 8, 4], [0, 0, 0])],
+]
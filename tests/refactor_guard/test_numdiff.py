@@ -101,3 +101,20 @@ def test_compare_named_values_with_tolerance():
         atol=0.0,
     )
     assert result.ok
+
+
+@pytest.mark.parametrize(
+    "expected,actual,ok",
+    [
+        ([float("inf")], [1.0], False),
+        ([1.0], [float("-inf")], False),
+        ([float("inf")], [float("-inf")], False),
+        ([float("inf")], [float("inf")], True),
+        ([float("nan")], [float("nan")], False),
+        ([float("nan")], [1.0], False),
+    ],
+)
+def test_compare_float_sequences_non_finite(expected, actual, ok):
+    result = compare_float_sequences(expected, actual, rtol=1.0e-9, atol=0.0)
+    assert result.ok is ok
+    assert result.ok is compare_named_values({"a": expected[0]}, {"a": actual[0]}, keys=["a"], rtol=1.0e-9, atol=0.0).ok
@@ -1,6 +1,7 @@
 import pytest
 
-from tools.regression.two_puncture_diff import compare_outputs
+from tools.regression.numdiff import extract_float_sequence
+from tools.regression.two_puncture_diff import ansorg_float_sequence, compare_outputs
 
 
 def _sample_file(mass2=0.5):
@@ -67,3 +68,9 @@ def test_compare_outputs_raises_on_stdout_metric_mismatch():
             stdout_atol=1.0e-12,
             ignore_patterns=[r"^#File created on "],
         )
+
+
+def test_ansorg_float_sequence_matches_regex_extraction():
+    text = _sample_file() + "-4.5e-03\n1.25E+02\n"
+    assert ansorg_float_sequence(text).tolist() == extract_float_sequence(text)
+    assert ansorg_float_sequence("a = 1\nno data block 2\n").tolist() == [1.0, 2.0]
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import ansorg_reader
+
+SOURCE_PSID = Path(__file__).resolve().parents[1] / "AMSS_NCKU_source" / "Ansorg.psid"
+
+HEADER = (
+    "#File created on Wed Feb 18 00:00:00 2026\n"
+    "#Newton_tol = 1e-10\n"
+    "bhmass1      = 0.5\n"
+    "bhy1         = 3\n"
+    "bhy2         = -3\n"
+    "data 3 2 2\n"
+)
+
+
+@pytest.fixture
+def psid(tmp_path):
+    values = np.linspace(-1.0, 1.0, 12) ** 3
+    path = tmp_path / "Ansorg.psid"
+    path.write_text(HEADER + "".join(f"{v:.16e}\n" for v in values))
+    return str(path), values
+
+
+def test_parse_text(psid):
+    path, values = psid
+    ansorg = ansorg_reader.parse_ansorg_text(Path(path).read_text())
+    assert ansorg.header == HEADER
+    assert ansorg.shape == (3, 2, 2) and ansorg.size == 12
+    assert np.array_equal(ansorg.data, values)
+    assert ansorg.parameters == {"bhmass1": 0.5, "bhy1": 3.0, "bhy2": -3.0}
+
+
+def test_parse_errors():
+    with pytest.raises(ValueError, match="no 'data"):
+        ansorg_reader.parse_ansorg_text("bhmass1 = 0.5\n1.0\n")
+    with pytest.raises(ValueError, match="3 values"):
+        ansorg_reader.parse_ansorg_text("data 2 1 1\n1.0\n2.0\n3.0\n")
+
+
+def test_sidecar_round_trip(psid, tmp_path):
+    path, values = psid
+    ansorg = ansorg_reader.parse_ansorg_text(Path(path).read_text())
+    sidecar = str(tmp_path / "copy.bin")
+    ansorg_reader.write_ansorg_sidecar(ansorg, sidecar)
+    assert os.path.getsize(sidecar) == ansorg_reader.ANSORG_SIDECAR_DTYPE.itemsize + len(HEADER) + 12 * 8
+
+    loaded = ansorg_reader.read_ansorg_sidecar(sidecar)
+    assert loaded.header == ansorg.header and loaded.shape == ansorg.shape
+    assert np.array_equal(loaded.data, values)
+
+    with open(sidecar, "ab") as file:
+        file.write(b"\0" * 8)
+    with pytest.raises(ValueError, match="expected 12 values"):
+        ansorg_reader.read_ansorg_sidecar(sidecar)
+
+
+def test_text_is_parsed_once(psid, monkeypatch):
+    path, values = psid
+    first = ansorg_reader.load_ansorg(path)
+    assert ansorg_reader.sidecar_is_current(path)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("text parsed again")
+
+    monkeypatch.setattr(ansorg_reader, "parse_ansorg_text", fail)
+    second = ansorg_reader.load_ansorg(path)
+    assert np.array_equal(second.data, first.data)
+    assert second.parameters == first.parameters
+
+
+def test_stale_or_invalid_sidecar_falls_back_to_text(psid):
+    path, values = psid
+    ansorg_reader.load_ansorg(path)
+    sidecar = ansorg_reader.sidecar_filename(path)
+
+    Path(path).write_text(HEADER + "".join(f"{2 * v:.16e}\n" for v in values))
+    stamp = os.stat(sidecar).st_mtime_ns + 10**9
+    os.utime(path, ns=(stamp, stamp))
+    assert not ansorg_reader.sidecar_is_current(path)
+    assert np.array_equal(ansorg_reader.load_ansorg(path).data, 2 * values)
+    assert np.array_equal(ansorg_reader.read_ansorg_sidecar(sidecar).data, 2 * values)
+
+    Path(sidecar).write_bytes(b"garbage")
+    assert np.array_equal(ansorg_reader.load_ansorg(path, write_sidecar=False).data, 2 * values)
+
+
+@pytest.mark.skipif(not SOURCE_PSID.exists(), reason="no Ansorg.psid in AMSS_NCKU_source")
+def test_shipped_initial_data(tmp_path):
+    ansorg = ansorg_reader.parse_ansorg_text(SOURCE_PSID.read_text())
+    assert ansorg.shape == (50, 50, 26)
+    assert ansorg.parameters["bhy1"] == 5.5
+    sidecar = str(tmp_path / "Ansorg.psid.bin")
+    ansorg_reader.write_ansorg_sidecar(ansorg, sidecar)
+    assert np.array_equal(ansorg_reader.read_ansorg_sidecar(sidecar).data, ansorg.data)
@@ -0,0 +1,111 @@
+import os
+
+import numpy as np
+import pytest
+
+import binary_data_archive
+import binary_data_reader
+import chunked_container
+from helpers import write_dump
+
+BBOX = [-1.0, 1.0, -2.0, 2.0, 0.0, 3.0]
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    rng = np.random.default_rng(3)
+    fields = {}
+    for ncount, time in [(0, 0.0), (1, 250.0), (2, 500.0)]:
+        for variable in ["chi", "phi"]:
+            name = f"Lev01-00_{variable}_{ncount:05d}.bin"
+            data = rng.standard_normal((4, 3, 5))
+            write_dump(tmp_path / name, time, data, BBOX)
+            fields[name] = data
+    return tmp_path, fields
+
+
+def test_float64_archive_round_trips_exactly(run_dir, tmp_path):
+    directory, fields = run_dir
+    archive = binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "run.cc"), processes=1)
+    assert sorted(archive.names) == sorted(fields)
+    for name, data in fields.items():
+        with archive.open(name) as dump:
+            assert dump.shape == (5, 3, 4)
+            assert dump.rmin == (-1.0, -2.0, 0.0)
+            assert dump.rmax == (1.0, 2.0, 3.0)
+            assert np.array_equal(dump.data, data)
+
+
+def test_float32_archive_is_smaller(run_dir, tmp_path):
+    directory, fields = run_dir
+    wide = binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "wide.cc"), codec="none", processes=1)
+    narrow = binary_data_archive.pack_binary_data(
+        str(directory), str(tmp_path / "narrow.cc"), dtype="float32", codec="none", processes=1
+    )
+    assert os.path.getsize(narrow.filename) < os.path.getsize(wide.filename)
+    name = "Lev01-00_chi_00001.bin"
+    assert np.allclose(narrow.open(name).data, fields[name], rtol=1e-6)
+
+
+def test_query_selects_by_file_name_fields(run_dir, tmp_path):
+    directory, _ = run_dir
+    archive = binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "run.cc"), processes=1)
+    assert archive.query(variable="chi") == [f"Lev01-00_chi_{n:05d}.bin" for n in range(3)]
+    assert archive.query(variable="phi", tmin=100.0, tmax=300.0) == ["Lev01-00_phi_00001.bin"]
+    assert archive.info("Lev01-00_phi_00002.bin")["time"] == 500.0
+
+
+def test_pack_applies_catalog_filters(run_dir, tmp_path):
+    directory, _ = run_dir
+    archive = binary_data_archive.pack_binary_data(
+        str(directory), str(tmp_path / "chi.cc"), processes=1, variable="chi"
+    )
+    assert archive.query(variable="phi") == []
+    with pytest.raises(FileNotFoundError):
+        binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "none.cc"), processes=1, variable="psi")
+
+
+def test_archived_dump_matches_file_interface(run_dir, tmp_path):
+    directory, _ = run_dir
+    binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "run.cc"), processes=1)
+    name = "Lev01-00_chi_00002.bin"
+    plain = binary_data_archive.open_binary_data(str(directory / name))
+    archived = binary_data_archive.open_binary_data(str(tmp_path / "run.cc") + "::" + name)
+    assert isinstance(plain, binary_data_reader.BinaryDataFile)
+    assert archived.time == plain.time == 500.0
+    assert archived.array_shape == plain.array_shape
+    for axis in "xyz":
+        assert np.array_equal(archived.read_plane(1, axis), plain.read_plane(1, axis))
+    assert np.array_equal(archived.read_line(2, 3), plain.read_line(2, 3))
+    assert np.array_equal(archived.read_box((1, 4), (0, 9), (-2, 2)), plain.read_box((1, 4), (0, 9), (-2, 2)))
+
+
+def test_extract_writes_a_readable_dump(run_dir, tmp_path):
+    directory, fields = run_dir
+    archive = binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "run.cc"), processes=1)
+    out = tmp_path / "out"
+    out.mkdir()
+    name = "Lev01-00_phi_00000.bin"
+    path = archive.extract(name, str(out))
+    assert open(path, "rb").read() == open(directory / name, "rb").read()
+
+
+def test_list_binary_data_covers_files_and_archives(run_dir):
+    directory, fields = run_dir
+    binary_data_archive.pack_binary_data(str(directory), str(directory / "run.cc"), processes=1)
+    for ncount in (1, 2):
+        os.remove(directory / f"Lev01-00_chi_{ncount:05d}.bin")
+    chunked_container.ContainerWriter(str(directory / "bssn_cgh.CHK.cc")).close()
+
+    entries = binary_data_archive.list_binary_data(str(directory))
+    names = [os.path.basename(entry.filename.split("::")[-1]) for entry in entries]
+    assert sorted(names) == sorted(fields)
+    archived = [entry for entry in entries if "::" in entry.filename]
+    assert [entry.filename for entry in archived] == [str(directory / "run.cc") + "::" + f"Lev01-00_chi_{n:05d}.bin" for n in (1, 2)]
+    assert archived[1].time == 500.0 and archived[1].shape == (5, 3, 4) and archived[1].level == 1
+    assert binary_data_archive.find_archives(str(directory)) == [str(directory / "run.cc")]
+
+    chi = binary_data_archive.list_binary_data(str(directory), variable="chi", tmin=100.0)
+    assert [entry.ncount for entry in chi] == [1, 2]
+    with binary_data_archive.open_binary_data(chi[0].filename) as dump:
+        assert np.array_equal(dump.data, fields["Lev01-00_chi_00001.bin"])
@@ -0,0 +1,65 @@
+import os
+
+import numpy as np
+import pytest
+
+import binary_data_catalog
+from helpers import write_dump
+
+BBOX = [-1.0, 1.0, -1.0, 1.0, 0.0, 1.0]
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    data = np.zeros((2, 2, 2))
+    for ncount, time in [(0, 0.0), (1, 250.0), (2, 500.0)]:
+        write_dump(tmp_path / f"Lev03-00_chi_{ncount:05d}.bin", time, data, BBOX)
+        write_dump(tmp_path / f"Lev02-01_05_chi_{ncount:05d}.bin", time, data, BBOX)
+    write_dump(tmp_path / "Lev03_phi_00001.bin", 250.0, data, BBOX)
+    write_dump(tmp_path / "LevSH-xp_chi_00001.bin", 250.0, data, BBOX)
+    (tmp_path / "notes.txt").write_text("not a dump")
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("Lev03-01_chi_00012.bin", dict(level=3, grid=1, rank=None, variable="chi", ncount=12)),
+        ("Lev03-01_07_chi_00012.bin", dict(level=3, grid=1, rank=7, variable="chi", ncount=12)),
+        ("Lev03_Gam_x_00012.bin", dict(level=3, grid=None, rank=None, variable="Gam_x", ncount=12)),
+        ("LevSH-xp_chi_00012.bin", dict(level=None, shell="xp", variable="chi", ncount=12)),
+        ("run_Lev00-00_chi_00012.bin", dict(tag="run", level=0, grid=0, variable="chi")),
+    ],
+)
+def test_parse_binary_filename(name, expected):
+    fields = binary_data_catalog.parse_binary_filename(name)
+    assert {key: fields[key] for key in expected} == expected
+
+
+def test_query_by_variable_level_and_time(run_dir):
+    with binary_data_catalog.BinaryDataCatalog(str(run_dir)) as catalog:
+        entries = catalog.query(variable="chi", level=3, tmin=200.0, tmax=400.0)
+        assert [os.path.basename(e.filename) for e in entries] == ["Lev03-00_chi_00001.bin"]
+        assert entries[0].time == 250.0
+        assert entries[0].shape == (2, 2, 2)
+        assert entries[0].data_offset == 68
+        assert catalog.distinct("variable") == ["chi", "phi"]
+        assert len(catalog.query(rank=5)) == 3
+        assert len(catalog.query(shell="xp")) == 1
+    assert os.path.exists(run_dir / binary_data_catalog.CATALOG_FILENAME)
+
+
+def test_update_is_incremental(run_dir):
+    catalog = binary_data_catalog.BinaryDataCatalog(str(run_dir), update=False)
+    assert catalog.update() == (8, 0)
+    assert catalog.update() == (0, 0)
+
+    os.remove(run_dir / "Lev03_phi_00001.bin")
+    write_dump(run_dir / "Lev03-00_chi_00003.bin", 750.0, np.zeros((2, 2, 2)), BBOX)
+    assert catalog.update() == (1, 1)
+    assert catalog.query(variable="phi") == []
+    catalog.close()
+
+    reopened = binary_data_catalog.BinaryDataCatalog(str(run_dir))
+    assert [e.ncount for e in reopened.query(variable="chi", level=3)] == [0, 1, 2, 3]
+    reopened.close()
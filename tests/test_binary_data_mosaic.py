@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import binary_data_mosaic
+from helpers import write_dump
+
+
+def write_tiles(directory, data, dx, centering, splits, ghost=1):
+    """Cut data (nz, ny, nx) into overlapping x/y tiles like Dump_CPU_Data."""
+    nz, ny, nx = data.shape
+    shift = 0.5 * dx if centering == "Cell" else 0.0
+    names = []
+    for rank, ((i0, i1), (j0, j1)) in enumerate(splits):
+        i0, j0 = max(i0 - ghost, 0), max(j0 - ghost, 0)
+        i1, j1 = min(i1 + ghost, nx), min(j1 + ghost, ny)
+        tile = data[:, j0:j1, i0:i1]
+        # coordinates of the first and last point of the tile
+        lo = np.array([i0, j0, 0]) * dx + shift
+        hi = (np.array([i1, j1, nz]) - 1) * dx + shift
+        if centering == "Cell":
+            lo, hi = lo - 0.5 * dx, hi + 0.5 * dx
+        path = directory / f"Lev01-{rank:02d}_{rank:02d}_phi_00007.bin"
+        write_dump(path, 3.5, tile, [lo[0], hi[0], lo[1], hi[1], lo[2], hi[2]])
+        names.append(str(path))
+    return names
+
+
+SPLITS = [((0, 3), (0, 2)), ((3, 6), (0, 2)), ((0, 3), (2, 4)), ((3, 6), (2, 4))]
+
+
+@pytest.fixture
+def data():
+    return np.arange(3 * 4 * 6, dtype=np.float64).reshape((3, 4, 6))
+
+
+@pytest.mark.parametrize("centering", ["Cell", "Vertex"])
+def test_mosaic_reassembles_level(tmp_path, data, centering):
+    write_tiles(tmp_path, data, 0.5, centering, SPLITS)
+    mosaic = binary_data_mosaic.open_level(str(tmp_path), "phi", 1, 7, centering=centering)
+    assert mosaic.shape == (6, 4, 3)
+    assert mosaic.time == 3.5
+    assert np.allclose(mosaic.spacing, 0.5)
+    assert np.array_equal(mosaic.data, data)
+    assert np.array_equal(mosaic.read_plane(1, axis="z"), data[1])
+    assert np.array_equal(mosaic.read_plane(4, axis="x"), data[:, :, 4])
+
+
+def test_only_intersecting_tiles_are_read(tmp_path, data, monkeypatch):
+    write_tiles(tmp_path, data, 0.5, "Cell", SPLITS)
+    mosaic = binary_data_mosaic.open_level(str(tmp_path), "phi", 1, 7)
+    touched = []
+    for tile in mosaic.tiles:
+        original = tile.read_box
+        monkeypatch.setattr(tile, "read_box", lambda *box, t=tile, f=original: touched.append(t) or f(*box))
+    box = mosaic.read_box((0, 2), (0, 1), (0, 3))
+    assert np.array_equal(box, data[:, 0:1, 0:2])
+    assert touched == [mosaic.tiles[0]]
+
+
+def test_find_tiles_ignores_gathered_dumps(tmp_path, data):
+    names = write_tiles(tmp_path, data, 0.5, "Cell", SPLITS)
+    write_dump(tmp_path / "Lev01-00_phi_00007.bin", 3.5, data, [0, 3, 0, 2, 0, 1.5])
+    assert binary_data_mosaic.find_tiles(str(tmp_path), "phi", 1, 7) == sorted(names)
+    with pytest.raises(FileNotFoundError):
+        binary_data_mosaic.open_level(str(tmp_path), "phi", 2, 7)
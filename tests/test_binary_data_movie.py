@@ -0,0 +1,91 @@
+import os
+import stat
+
+import matplotlib.image
+import numpy as np
+import pytest
+
+import binary_data_archive
+import binary_data_movie
+from helpers import write_dump
+
+FRAME_SIZE = (160, 120)
+
+
+@pytest.fixture
+def series(tmp_path):
+    x = np.linspace(-1.0, 1.0, 8)
+    names = []
+    for n in range(5):
+        data = np.cos(x[None, None, :] - 0.3 * n) * np.cos(x[None, :, None]) * np.ones((4, 1, 1))
+        name = tmp_path / f"Lev00-00_chi_{n:05d}.bin"
+        write_dump(name, 2.0 * n, data, [-1.0, 1.0, -1.0, 1.0, 0.0, 1.0])
+        names.append(str(name))
+    write_dump(tmp_path / "Lev00-00_03_chi_00001.bin", 2.0, np.zeros((4, 8, 8)), [-1.0, 1.0, -1.0, 1.0, 0.0, 1.0])
+    return tmp_path, names
+
+
+def read_frames(directory):
+    return [matplotlib.image.imread(os.path.join(directory, name)) for name in sorted(os.listdir(directory))]
+
+
+def test_png_sequence_serial_and_parallel_agree(series, tmp_path):
+    _, names = series
+    options = dict(frame_size=FRAME_SIZE, centering="Cell", symmetry="equatorial-symmetry")
+    assert binary_data_movie.render_movie(names, str(tmp_path / "serial"), workers=1, **options) == 5
+    assert binary_data_movie.render_movie(names, str(tmp_path / "parallel"), workers=2, **options) == 5
+    serial = read_frames(tmp_path / "serial")
+    parallel = read_frames(tmp_path / "parallel")
+    assert all(frame.shape == (120, 160, 4) for frame in serial)
+    assert all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+    assert not np.array_equal(serial[0], serial[1])
+
+
+def test_ffmpeg_writer_receives_raw_frames(series, tmp_path):
+    _, names = series
+    fake = tmp_path / "fake-ffmpeg"
+    fake.write_text('#!/bin/sh\nfor last; do :; done\ncat > "$last"\n')
+    fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+    movie = tmp_path / "chi.mp4"
+    binary_data_movie.render_movie(names, str(movie), clim=(-1.0, 1.0), frame_size=FRAME_SIZE, ffmpeg=str(fake))
+    assert movie.stat().st_size == 5 * 160 * 120 * 4
+
+
+def test_missing_encoder(series, tmp_path):
+    _, names = series
+    with pytest.raises(FileNotFoundError):
+        binary_data_movie.render_movie(names, str(tmp_path / "chi.mp4"), ffmpeg="no-such-ffmpeg-binary")
+
+
+def test_generate_movie_uses_gathered_dumps_in_time_order(series, tmp_path):
+    directory, names = series
+    out = tmp_path / "frames"
+    count = binary_data_movie.generate_movie(str(directory), str(out), "chi", frame_size=FRAME_SIZE)
+    assert count == len(names)
+    with pytest.raises(FileNotFoundError):
+        binary_data_movie.generate_movie(str(directory), str(out), "trK")
+
+
+def test_archived_dumps_render_like_files(series, tmp_path):
+    directory, names = series
+    binary_data_archive.pack_binary_data(str(directory), str(tmp_path / "run.cc"), processes=1, rank=None)
+    renderer = binary_data_movie.SliceFrameRenderer("chi", (-1.0, 1.0), FRAME_SIZE)
+    archived = str(tmp_path / "run.cc") + "::" + os.path.basename(names[2])
+    assert np.array_equal(renderer.render(names[2]), renderer.render(archived))
+
+
+def test_slice_limits(series):
+    _, names = series
+    vmin, vmax = binary_data_movie.slice_limits(names, "equatorial-symmetry")
+    assert -1.0 <= vmin < vmax <= 1.0
+
+
+def test_generate_movie_reads_archived_dumps(series, tmp_path):
+    directory, names = series
+    binary_data_archive.pack_binary_data(str(directory), str(directory / "run.cc"), processes=1, rank=None)
+    loose = binary_data_movie.render_movie(names, str(tmp_path / "loose"), frame_size=FRAME_SIZE, clim=(-1.0, 1.0))
+    for name in names:
+        os.remove(name)
+    count = binary_data_movie.generate_movie(str(directory), str(tmp_path / "frames"), "chi", frame_size=FRAME_SIZE, clim=(-1.0, 1.0), title="")
+    assert count == loose == len(names)
+    assert all(np.array_equal(a, b) for a, b in zip(read_frames(tmp_path / "loose"), read_frames(tmp_path / "frames")))
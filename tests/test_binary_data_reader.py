@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import binary_data_reader
+from helpers import write_dump
+
+
+@pytest.fixture
+def dump(tmp_path):
+    data = np.arange(4 * 3 * 5, dtype=np.float64).reshape((4, 3, 5))
+    path = tmp_path / "Lev00-00_chi_00001.bin"
+    write_dump(path, 12.5, data, [-1.0, 1.0, -2.0, 2.0, 0.0, 3.0])
+    return str(path), data
+
+
+def test_header_is_parsed(dump):
+    path, _ = dump
+    reader = binary_data_reader.BinaryDataFile(path)
+    assert reader.time == 12.5
+    assert reader.shape == (5, 3, 4)
+    assert reader.rmin == (-1.0, -2.0, 0.0)
+    assert reader.rmax == (1.0, 2.0, 3.0)
+    assert reader.data_offset == 68
+
+
+def test_memmap_payload_in_zyx_order(dump):
+    path, data = dump
+    with binary_data_reader.BinaryDataFile(path) as reader:
+        assert isinstance(reader.data, np.memmap)
+        assert np.array_equal(reader.data, data)
+
+
+@pytest.mark.parametrize("axis,index", [("z", 2), ("y", 1), ("x", 4)])
+def test_read_plane(dump, axis, index):
+    path, data = dump
+    reader = binary_data_reader.BinaryDataFile(path)
+    expected = {"z": lambda: data[index], "y": lambda: data[:, index, :], "x": lambda: data[:, :, index]}[axis]()
+    assert np.array_equal(reader.read_plane(index, axis=axis), expected)
+
+
+def test_read_line_and_box(dump):
+    path, data = dump
+    reader = binary_data_reader.BinaryDataFile(path)
+    assert np.array_equal(reader.read_line(2, 3), data[3, 2, :])
+    box = reader.read_box((1, 4), (0, 2), (1, 3))
+    assert np.array_equal(box, data[1:3, 0:2, 1:4])
+
+
+def test_truncated_file_raises(dump, tmp_path):
+    path, _ = dump
+    short = tmp_path / "short.bin"
+    short.write_bytes(open(path, "rb").read()[:-8])
+    with pytest.raises(ValueError):
+        binary_data_reader.BinaryDataFile(str(short))
+
+
+def test_unknown_axis_raises(dump):
+    path, _ = dump
+    with pytest.raises(ValueError):
+        binary_data_reader.BinaryDataFile(path).read_plane(0, axis="w")
+
+
+@pytest.mark.parametrize("j,k", [(3, 0), (-1, 0), (0, 4), (0, -1)])
+def test_read_line_out_of_range_raises(dump, j, k):
+    path, _ = dump
+    with pytest.raises(IndexError):
+        binary_data_reader.BinaryDataFile(path).read_line(j, k)
+
+
+@pytest.mark.parametrize("axis,index", [("z", -1), ("z", 4), ("y", 3), ("y", -1), ("x", 5), ("x", -1)])
+def test_read_plane_out_of_range_raises(dump, axis, index):
+    path, _ = dump
+    with pytest.raises(IndexError):
+        binary_data_reader.BinaryDataFile(path).read_plane(index, axis=axis)
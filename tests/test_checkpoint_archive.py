@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pytest
+
+import chunked_container
+from helpers import GRIDS, write_checkpoint
+from tools import checkpoint_archive
+
+LAYOUT = {"symmetry": "equatorial-symmetry"}
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    path = tmp_path / "bssn_cgh.CHK"
+    write_checkpoint(path, 3.0, GRIDS, [[1.0, 0.0, 0.0]], [[(8, 8, 4)], [(20, 20, 10)]], 2)
+    return str(path)
+
+
+def test_blocks_follow_the_checkpoint_layout(checkpoint):
+    blocks, metadata = checkpoint_archive.layout_blocks(checkpoint, 1 << 20, **LAYOUT)
+    names = [name for name, _, _ in blocks]
+    assert names == ["header", "lev00/patch00/var00", "lev00/patch00/var01", "lev01/patch00/var00", "lev01/patch00/var01"]
+    assert metadata["layout"] == "cgh"
+    assert blocks[-1][2] == 20 * 20 * 10 * 8
+
+
+@pytest.mark.parametrize("codec,processes", [("zlib", 1), ("lzma", 2)])
+def test_pack_and_restore_byte_identical(checkpoint, tmp_path, codec, processes):
+    packed = str(tmp_path / "bssn_cgh.CHK.cc")
+    container = checkpoint_archive.pack(checkpoint, packed, codec=codec, processes=processes, chunk_size=4096, **LAYOUT)
+    assert "lev01/patch00/var01#0" in container.names
+    assert checkpoint_archive.verify(packed, processes) == []
+
+    restored = tmp_path / "restored.CHK"
+    checkpoint_archive.unpack(packed, str(restored))
+    assert restored.read_bytes() == open(checkpoint, "rb").read()
+
+
+def test_corruption_is_reported_per_block(checkpoint, tmp_path):
+    packed = tmp_path / "bssn_cgh.CHK.cc"
+    container = checkpoint_archive.pack(checkpoint, str(packed), codec="none", processes=1, **LAYOUT)
+    block = container.blocks[2]
+    raw = bytearray(packed.read_bytes())
+    raw[block["stored_offset"] + 5] ^= 0xFF
+    packed.write_bytes(bytes(raw))
+    assert checkpoint_archive.verify(str(packed), 1) == [block["name"]]
+    with pytest.raises(ValueError):
+        chunked_container.ContainerFile(str(packed)).restore(str(tmp_path / "restored.CHK"))
+
+
+def test_checksums_of_raw_checkpoint(checkpoint):
+    sums = checkpoint_archive.write_checksums(checkpoint, 1 << 20, 1, **LAYOUT)
+    assert len(json.loads(sums.read_text())["blocks"]) == 5
+    assert checkpoint_archive.verify(checkpoint, 1) == []
+
+    with open(checkpoint, "r+b") as f:
+        f.seek(-8, 2)
+        np.array([-1.0]).tofile(f)
+    assert checkpoint_archive.verify(checkpoint, 1) == ["lev01/patch00/var01"]
+
+
+def test_unrecognised_layout_falls_back_to_chunks(tmp_path):
+    path = tmp_path / "odd_cgh.CHK"
+    path.write_bytes(b"\0" * 100)
+    blocks, metadata = checkpoint_archive.layout_blocks(str(path), 64)
+    assert metadata == {"layout": "chunks"}
+    assert [size for _, _, size in blocks] == [64, 36]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import checkpoint_reader
+from helpers import GRIDS, write_checkpoint
+
+
+def test_hierarchy_and_equatorial_buffer_zones(tmp_path):
+    path = tmp_path / "bssn_cgh.CHK"
+    # level 0 has no buffer without a shell; level 1 gets 6 buffer points
+    # on every side except below the z = 0 symmetry plane
+    shapes = [[(8, 8, 4)], [(20, 20, 10)]]
+    fields = write_checkpoint(path, 42.5, GRIDS, [[1.0, 0.0, 0.0], [-1.0, 0.0, 0.0]], shapes, 3)
+
+    chk = checkpoint_reader.CheckpointFile(str(path), symmetry="equatorial-symmetry")
+    assert chk.time == 42.5
+    assert (chk.levels, chk.movls, chk.bh_number) == (2, 1, 2)
+    assert chk.grids == [1, 1]
+    assert np.array_equal(chk.porgls[1], [[1.0, 0.0, 0.0], [-1.0, 0.0, 0.0]])
+    assert [[p.shape for p in patches] for patches in chk.patches] == shapes
+    assert chk.patches[1][0].rmin == (-5.0, -5.0, 0.0)
+    assert chk.patches[1][0].rmax == (5.0, 5.0, 5.0)
+    assert chk.variables == ["var00", "var01", "var02"]
+
+    for lev, patch, var, data in fields:
+        block = chk.read(lev, patch, var)
+        assert isinstance(block, np.memmap)
+        assert np.array_equal(block, data)
+    assert "level 1" in chk.summary()
+
+
+def test_merged_boxes_and_named_variables(tmp_path):
+    path = tmp_path / "bssn_cgh.CHK"
+    # two overlapping boxes on level 1 merge into one 10x8x4 box
+    grids = [GRIDS[0], [([-2, -2, 0, 2, 2, 2], [8, 8, 4], [0, 0, 0]), ([-1, -2, 0, 3, 2, 2], [8, 8, 4], [0, 0, 0])]]
+    shapes = [[(8, 8, 4)], [(22, 20, 16)]]
+    names = checkpoint_reader.BSSN_CHECKPOINT_VARIABLES
+    fields = write_checkpoint(path, 1.0, grids, [], shapes, len(names))
+
+    chk = checkpoint_reader.CheckpointFile(str(path), symmetry=0)
+    assert [[p.shape for p in patches] for patches in chk.patches] == shapes
+    assert chk.variables[0] == "phi0" and chk.variables[-1] == "dtSfzo"
+    assert np.array_equal(chk.read(1, 0, "Lapo"), fields[-1 - 6][3])
+
+
+def test_mismatched_layout_raises(tmp_path):
+    path = tmp_path / "bssn_cgh.CHK"
+    write_checkpoint(path, 1.0, GRIDS, [], [[(8, 8, 4)], [(20, 20, 10)]], 2)
+    with pytest.raises(ValueError):
+        checkpoint_reader.CheckpointFile(str(path), symmetry=0)
+    with pytest.raises(ValueError):
+        checkpoint_reader.CheckpointFile(str(path), symmetry=1, variables=["a", "b", "c"])
+    chk = checkpoint_reader.CheckpointFile(str(path), patch_shapes=[[(8, 8, 4)], [(20, 20, 10)]])
+    assert chk.variables == ["var00", "var01"]
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+
+import binary_data_archive
+import figure_manifest
+from helpers import write_dump
+
+PARAMETERS = {"fast": False, "centering": "Cell"}
+
+
+def make_source(tmp_path):
+    path = tmp_path / "Lev00-00_chi_00001.bin"
+    write_dump(path, 1.0, np.zeros((2, 2, 2)), [0, 1, 0, 1, 0, 1])
+    return str(path)
+
+
+def make_figure(figure_dir, name):
+    path = figure_dir / name
+    path.write_bytes(b"figure")
+    return str(path)
+
+
+def test_key_depends_on_file_and_parameters(tmp_path):
+    source = make_source(tmp_path)
+    key = figure_manifest.source_key(source, PARAMETERS)
+    assert figure_manifest.source_key(source, dict(PARAMETERS)) == key
+    assert figure_manifest.source_key(source, {**PARAMETERS, "fast": True}) != key
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert figure_manifest.source_key(source, PARAMETERS) != key
+
+
+def test_archive_members_are_keyed_by_their_index_record(tmp_path):
+    source = make_source(tmp_path)
+    write_dump(tmp_path / "Lev00-00_chi_00002.bin", 2.0, np.zeros((2, 2, 2)), [0, 1, 0, 1, 0, 1])
+    archive = str(tmp_path / "run.cc")
+    binary_data_archive.pack_binary_data(str(tmp_path), archive, processes=1)
+    first, second = archive + "::Lev00-00_chi_00001.bin", archive + "::Lev00-00_chi_00002.bin"
+
+    key = figure_manifest.source_key(first, PARAMETERS)
+    assert key != figure_manifest.source_key(source, PARAMETERS)
+    assert key != figure_manifest.source_key(second, PARAMETERS)
+
+    # re-packing with one dump changed keeps the key of the other
+    other = figure_manifest.source_key(second, PARAMETERS)
+    write_dump(tmp_path / "Lev00-00_chi_00002.bin", 2.0, np.ones((2, 2, 2)), [0, 1, 0, 1, 0, 1])
+    binary_data_archive.pack_binary_data(str(tmp_path), archive, processes=1)
+    assert figure_manifest.source_key(first, PARAMETERS) == key
+    assert figure_manifest.source_key(second, PARAMETERS) != other
+
+
+def test_manifest_round_trip_and_staleness(tmp_path):
+    source = make_source(tmp_path)
+    figure_dir = tmp_path / "figure"
+    figure_dir.mkdir()
+    key = figure_manifest.source_key(source, PARAMETERS)
+
+    manifest = figure_manifest.FigureManifest(str(figure_dir))
+    assert not manifest.is_current(source, key)
+    outputs = [make_figure(figure_dir, "a.pdf"), make_figure(figure_dir, "b.pdf")]
+    manifest.record(source, key, outputs)
+    manifest.save()
+
+    reloaded = figure_manifest.FigureManifest(str(figure_dir))
+    assert reloaded.is_current(source, key)
+    assert not reloaded.is_current(source, "other key")
+    os.remove(outputs[1])
+    assert not reloaded.is_current(source, key)
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / figure_manifest.MANIFEST_FILENAME).write_text("{ not json")
+    assert figure_manifest.FigureManifest(str(tmp_path)).entries == {}
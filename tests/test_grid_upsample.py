@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import grid_upsample
+
+
+def test_cell_and_vertex_coordinates():
+    assert np.allclose(grid_upsample.grid_coordinates(0.0, 4.0, 4, "Cell"), [0.5, 1.5, 2.5, 3.5])
+    assert np.allclose(grid_upsample.grid_coordinates(0.0, 4.0, 5, "Vertex"), [0, 1, 2, 3, 4])
+    with pytest.raises(ValueError):
+        grid_upsample.grid_coordinates(0.0, 1.0, 3, "Face")
+
+
+@pytest.mark.parametrize("centering", ["Cell", "Vertex"])
+def test_cubic_polynomials_are_reproduced(centering):
+    ny, nx = 9, 12
+    x = grid_upsample.grid_coordinates(-2.0, 3.0, nx, centering)
+    y = grid_upsample.grid_coordinates(-1.0, 1.0, ny, centering)
+    f = lambda X, Y: X**3 - 2 * X * Y**2 + Y + 0.5
+    data = f(*np.meshgrid(x, y))
+    x_new, y_new, fine = grid_upsample.upsample_plane(data, (-2.0, -1.0), (3.0, 1.0), 2.5, centering)
+    assert fine.shape == (int(2.5 * ny), int(2.5 * nx))
+    assert x_new[0] == pytest.approx(x[0]) and x_new[-1] == pytest.approx(x[-1])
+    assert np.allclose(fine, f(*np.meshgrid(x_new, y_new)))
+
+
+def test_weights_are_cached_and_read_only():
+    grid_upsample.spline_weights.cache_clear()
+    first = grid_upsample.spline_weights(10, 25)
+    assert grid_upsample.spline_weights(10, 25) is first
+    assert grid_upsample.spline_weights.cache_info().hits == 1
+    assert not first.flags.writeable
+    assert np.allclose(first.sum(axis=1), 1.0)
+
+
+def test_single_point_axis():
+    x_new, y_new, fine = grid_upsample.upsample_plane(np.full((1, 4), 2.0), (0.0, 0.0), (4.0, 1.0), 2.0)
+    assert fine.shape == (2, 8)
+    assert np.allclose(fine, 2.0)
@@ -0,0 +1,168 @@
+import os
+
+import numpy as np
+import pytest
+
+import monitor_data
+
+PSI4_TEXT = (
+    "# File created on Mon Jan  6 10:00:00 2025\n"
+    "#\n"
+    "         # time        R02m-02         I02m-02\n"
+    "0              1.5             -2e-05         \n"
+    "0.25           nan             3.25           \n"
+)
+
+
+@pytest.fixture
+def psi4_file(tmp_path):
+    path = tmp_path / "bssn_psi4.dat"
+    path.write_text(PSI4_TEXT)
+    return str(path)
+
+
+def test_named_columns_from_header(psi4_file):
+    monitor = monitor_data.load_monitor_data(psi4_file)
+    assert monitor.columns == ["time", "R02m-02", "I02m-02"]
+    assert monitor.data.shape == (2, 3)
+    assert np.array_equal(monitor.time, [0.0, 0.25])
+    assert np.array_equal(monitor["I02m-02"], [-2e-05, 3.25])
+    assert np.isnan(monitor["R02m-02"][1])
+    with pytest.raises(KeyError):
+        monitor["R03m000"]
+
+
+def test_unnamed_columns_and_partial_last_line(tmp_path):
+    path = tmp_path / "bssn_BH.dat"
+    path.write_text("#\n         # time\n0 1 2 3\n1 4 5 6\n2 7 8")
+    monitor = monitor_data.load_monitor_data(str(path), use_cache=False)
+    assert monitor.columns == ["time", "column1", "column2", "column3"]
+    assert monitor.data.shape == (2, 4)
+
+
+def test_sidecar_is_used_and_invalidated(psi4_file, monkeypatch):
+    first = monitor_data.load_monitor_data(psi4_file)
+    assert os.path.exists(psi4_file + monitor_data.MONITOR_CACHE_SUFFIX)
+
+    def fail(filename):
+        raise AssertionError("text file parsed although the sidecar is valid")
+
+    monkeypatch.setattr(monitor_data, "parse_monitor_file", fail)
+    cached = monitor_data.load_monitor_data(psi4_file)
+    assert cached.columns == first.columns
+    np.testing.assert_array_equal(cached.data, first.data)
+    monkeypatch.undo()
+
+    with open(psi4_file, "a") as f:
+        f.write("0.5            4.0             5.0            \n")
+    assert len(monitor_data.load_monitor_data(psi4_file)) == 3
+
+
+def test_demultiplex_is_a_strided_view_and_drops_truncated_block():
+    # 3 detectors, 4 complete output times and one partial block
+    rows = np.array([[j, 10 * i + j] for j in range(4) for i in range(3)] + [[4, 0]], dtype=float)
+    blocks = monitor_data.demultiplex(rows, 3)
+    assert blocks.shape == (3, 4, 2)
+    assert np.shares_memory(blocks, rows)
+    assert np.array_equal(blocks[2, :, 1], [20, 21, 22, 23])
+    assert np.array_equal(blocks[0, :, 0], [0, 1, 2, 3])
+    with pytest.raises(ValueError):
+        monitor_data.demultiplex(rows, 0)
+
+
+@pytest.mark.parametrize("grid_set,expected", [("Patch", (9, 0)), ("Shell-Patch", (10, 1))])
+def test_constraint_levels(grid_set, expected):
+    assert monitor_data.constraint_levels(9, grid_set) == expected
+
+
+def write_segment(path, times, detectors=2):
+    rows = "".join(f"{t} {10 * d + t}\n" for t in times for d in range(detectors))
+    path.write_text("#\n         # time value\n" + rows)
+
+
+def test_series_stitches_restart_segments(tmp_path):
+    # the first run got to t=5 but the checkpoint was written at t=3
+    write_segment(tmp_path / "bssn_ADMQs.dat", [0, 1, 2, 3, 4, 5])
+    write_segment(tmp_path / "1_bssn_ADMQs.dat", [3, 4, 5, 6, 7])
+    (tmp_path / "2_bssn_ADMQs.dat").write_text("#\n# time value\n8 18\n")  # truncated block
+    (tmp_path / "bssn_BH.dat").write_text("#\n# time\n0 1\n")
+
+    assert [p.split("/")[-1] for p in monitor_data.find_monitor_segments(str(tmp_path), "bssn_ADMQs.dat")] == [
+        "bssn_ADMQs.dat",
+        "1_bssn_ADMQs.dat",
+        "2_bssn_ADMQs.dat",
+    ]
+    series = monitor_data.load_monitor_series(str(tmp_path), "bssn_ADMQs.dat", block_size=2)
+    assert series.columns == ["time", "value"]
+    blocks = series.demultiplex(2)
+    assert np.array_equal(blocks[0, :, 0], np.arange(8))
+    assert np.array_equal(blocks[1, :, 1], 10 + np.arange(8))
+
+    # unchanged segments are served from the in-process cache
+    assert monitor_data.load_monitor_series(str(tmp_path), "bssn_ADMQs.dat", block_size=2) is series
+    with open(tmp_path / "1_bssn_ADMQs.dat", "a") as f:
+        f.write("8 8\n8 18\n")
+    assert len(monitor_data.load_monitor_series(str(tmp_path), "bssn_ADMQs.dat", block_size=2)) == 18
+
+    with pytest.raises(FileNotFoundError):
+        monitor_data.load_monitor_series(str(tmp_path), "bssn_psi4.dat")
+
+
+def test_follower_reads_only_complete_appended_blocks(tmp_path):
+    path = tmp_path / "bssn_psi4.dat"
+    follower = monitor_data.MonitorFollower(str(tmp_path), "bssn_psi4.dat", block_size=2)
+    assert follower.poll() == 0
+
+    path.write_text("# File created\n#\n         # time R02m002\n0 1\n0 2\n1 3\n1")
+    assert follower.poll() == 1
+    assert follower.columns == ["time", "R02m002"]
+
+    with open(path, "a") as f:
+        f.write(" 4\n2 5\n")
+    assert follower.poll() == 1
+    assert np.array_equal(follower.demultiplex()[1, :, 1], [2, 4])
+    assert follower.poll() == 0
+
+
+def test_follower_switches_segments_and_rolls(tmp_path):
+    write_segment(tmp_path / "bssn_ADMQs.dat", [0, 1, 2, 3])
+    follower = monitor_data.MonitorFollower(str(tmp_path), "bssn_ADMQs.dat", block_size=2, max_samples=5)
+    assert follower.poll() == 4
+
+    # restart from the checkpoint at t=2
+    write_segment(tmp_path / "1_bssn_ADMQs.dat", [2, 3, 4, 5, 6])
+    follower.poll()
+    assert len(follower) == 5
+    assert np.array_equal(follower.demultiplex()[0, :, 0], [2, 3, 4, 5, 6])
+
+    # a large burst keeps only the last max_samples samples
+    with open(tmp_path / "1_bssn_ADMQs.dat", "a") as f:
+        f.write("".join(f"{t} {t}\n{t} {10 + t}\n" for t in range(7, 2000)))
+    assert follower.poll() == 1993
+    assert np.array_equal(follower.demultiplex()[1, :, 1], 10 + np.arange(1995, 2000))
+
+
+def test_run_data_loads_each_file_once(tmp_path, monkeypatch):
+    write_segment(tmp_path / "bssn_psi4.dat", [0, 1, 2], detectors=3)
+    calls = []
+    load = monitor_data.load_monitor_series
+    monkeypatch.setattr(
+        monitor_data, "load_monitor_series", lambda *args: calls.append(args[1]) or load(*args)
+    )
+
+    run = monitor_data.RunData(str(tmp_path))
+    blocks = run.blocks("bssn_psi4.dat", 3)
+    assert blocks.shape == (3, 3, 2)
+    for _ in range(5):
+        assert run.blocks("bssn_psi4.dat", 3) is blocks
+    assert calls == ["bssn_psi4.dat"]
+    assert run.path("bssn_psi4.dat") == os.path.join(str(tmp_path), "bssn_psi4.dat")
+
+    assert monitor_data.open_run(run) is run
+    assert monitor_data.open_run(str(tmp_path)).directory == str(tmp_path)
+
+    run.cache["spectrum"] = 1
+    run.refresh()
+    assert run.cache == {}
+    run.blocks("bssn_psi4.dat", 3)
+    assert calls == ["bssn_psi4.dat", "bssn_psi4.dat"]
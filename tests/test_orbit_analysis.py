@@ -0,0 +1,98 @@
+import json
+
+import numpy as np
+import pytest
+
+import orbit_analysis
+import run_summary
+
+T_C = 1000.0
+AMPLITUDE = 0.02 * T_C ** 0.375
+
+
+def inspiral(eccentricity=0.0, dt=0.5, t_end=999.0):
+    """bssn_BH.dat rows of an equal-mass quasi-circular PN inspiral in the xy plane."""
+    time = np.arange(0.0, t_end, dt)
+    omega = AMPLITUDE * (T_C - time) ** -0.375
+    omega = omega * (1.0 + 2.0 * eccentricity * np.cos(0.7 * omega[0] * time))
+    phase = np.concatenate(([0.0], np.cumsum(0.5 * (omega[1:] + omega[:-1]) * dt)))
+    radius = omega ** (-2.0 / 3.0)
+    relative = np.stack([radius * np.cos(phase), radius * np.sin(phase), np.zeros_like(phase)], axis=1)
+    return np.column_stack([time, -0.5 * relative, 0.5 * relative]), omega, phase
+
+
+def test_positions_and_pairwise_separations():
+    rng = np.random.default_rng(3)
+    data = rng.standard_normal((50, 10))
+    positions = orbit_analysis.puncture_positions(data, 3)
+    assert positions.shape == (3, 50, 3)
+    assert np.shares_memory(positions, data)
+    assert np.array_equal(positions[2, :, 1], data[:, 8])
+
+    pairs, separations = orbit_analysis.pairwise_separations(positions)
+    assert pairs == [(0, 1), (0, 2), (1, 2)]
+    for (i, j), separation in zip(pairs, separations):
+        expected = np.sqrt(((data[:, 3 * j + 1 : 3 * j + 4] - data[:, 3 * i + 1 : 3 * i + 4]) ** 2).sum(axis=1))
+        assert np.allclose(separation, expected)
+
+
+def test_phase_and_frequency_of_a_circular_inspiral():
+    data, omega, phase = inspiral()
+    positions = orbit_analysis.puncture_positions(data, 2)
+    measured = orbit_analysis.orbital_phase(positions[1] - positions[0])
+    assert np.allclose(measured, phase, atol=1e-9)
+    frequency = orbit_analysis.orbital_frequency(data[:, 0], measured)
+    early = data[:, 0] < 900.0
+    assert np.allclose(frequency[early], omega[early], rtol=1e-3)
+
+
+def test_phase_is_independent_of_the_orbital_plane():
+    data, _, phase = inspiral(t_end=500.0)
+    relative = data[:, 4:7] - data[:, 1:4]
+    tilt = np.array([[1.0, 0.0, 0.0], [0.0, 0.6, -0.8], [0.0, 0.8, 0.6]])
+    assert np.allclose(orbit_analysis.orbital_phase(relative @ tilt.T), phase, atol=1e-9)
+
+
+def test_merger_time_is_interpolated():
+    time = np.arange(5.0)
+    separation = np.array([4.0, 3.0, 2.0, 1.5, 0.5])
+    assert orbit_analysis.merger_time(time, separation, 1.0) == pytest.approx(3.5)
+    assert orbit_analysis.merger_time(time, separation, 5.0) == 0.0
+    assert orbit_analysis.merger_time(time, separation, 0.1) is None
+
+
+@pytest.mark.parametrize("eccentricity", [0.0, 0.02])
+def test_eccentricity_estimate(eccentricity):
+    data, omega, _ = inspiral(eccentricity)
+    fit = orbit_analysis.eccentricity_estimate(data[:, 0], omega)
+    assert fit["eccentricity"] == pytest.approx(eccentricity, abs=5e-3)
+    if eccentricity == 0.0:
+        assert fit["t_c"] == pytest.approx(T_C)
+        assert fit["amplitude"] == pytest.approx(AMPLITUDE)
+
+
+def test_analyze_orbit_and_summary_file(tmp_path):
+    data, omega, phase = inspiral()
+    monitor = tmp_path / "bssn_BH.dat"
+    np.savetxt(monitor, data, header="\n time", comments="#")
+
+    summary = orbit_analysis.write_orbit_summary(str(tmp_path), str(tmp_path), 2, threshold=3.0)
+    (entry,) = summary["pairs"]
+    t_merge = T_C - (AMPLITUDE / 3.0 ** -1.5) ** (8.0 / 3.0)
+    assert entry["pair"] == [0, 1]
+    assert entry["merger_time"] == pytest.approx(t_merge, abs=0.05)
+    assert entry["initial_separation"] == pytest.approx(0.02 ** (-2.0 / 3.0))
+    assert entry["orbits"] == pytest.approx(np.interp(t_merge, data[:, 0], phase) / (2 * np.pi), rel=1e-3)
+    assert entry["eccentricity_fit"]["eccentricity"] < 2e-3
+
+    with open(tmp_path / run_summary.RUN_SUMMARY_FILENAME) as file:
+        assert json.load(file)["orbit"] == summary
+
+
+def test_run_summary_sections_are_kept(tmp_path):
+    assert run_summary.read_run_summary(str(tmp_path)) == {}
+    run_summary.update_run_summary(str(tmp_path), "orbit", {"pairs": []})
+    run_summary.update_run_summary(str(tmp_path), "kick", {"velocity": 1.0})
+    run_summary.update_run_summary(str(tmp_path), "orbit", {"pairs": [1]})
+    assert run_summary.read_run_summary(str(tmp_path)) == {"orbit": {"pairs": [1]}, "kick": {"velocity": 1.0}}
+    assert [path.name for path in tmp_path.iterdir()] == [run_summary.RUN_SUMMARY_FILENAME]
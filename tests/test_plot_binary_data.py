@@ -0,0 +1,42 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+import plot_binary_data
+from helpers import write_dump
+
+
+@pytest.fixture
+def dumps(tmp_path):
+    (tmp_path / "bin").mkdir()
+    for sub in ["contour plot", "density plot", "surface plot"]:
+        (tmp_path / "fig" / sub).mkdir(parents=True)
+    x = np.linspace(-1.0, 1.0, 10)
+    names = []
+    for n in range(3):
+        data = (n + 1) * np.exp(-(x[:, None, None] ** 2 + x[None, :, None] ** 2 + x[None, None, :] ** 2))
+        name = tmp_path / "bin" / f"Lev00-00_chi_{n:05d}.bin"
+        write_dump(name, 10.0 * n, data, [-1.0 - n, 1.0 + n, -1.0, 1.0, -1.0, 1.0])
+        names.append(str(name))
+    return tmp_path, names
+
+
+def test_fast_mode_reuses_figures_and_writes_png(dumps):
+    tmp_path, names = dumps
+    for name in names:
+        plot_binary_data.plot_binary_data(name, str(tmp_path / "bin"), str(tmp_path / "fig"), fast=True)
+        figures = plt.get_fignums()
+    plot_binary_data.plot_binary_data(names[0], str(tmp_path / "bin"), str(tmp_path / "fig"), fast=True)
+    assert plt.get_fignums() == figures
+
+    assert len(list((tmp_path / "fig" / "contour plot").glob("*.png"))) == 3
+    assert len(list((tmp_path / "fig" / "density plot").glob("*.png"))) == 3
+    assert not list((tmp_path / "fig" / "surface plot").iterdir())
+
+    image = plot_binary_data._fast_figures.image
+    assert image.get_extent()[:2] == pytest.approx([-0.9, 0.9])
+    assert image.get_clim()[1] == pytest.approx(np.asarray(image.get_array()).max())
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import plot_pool
+
+
+def square(x):
+    return x * x
+
+
+def fail_on_three(x):
+    if x == 3:
+        raise RuntimeError("bad dump")
+    return x
+
+
+def backend_and_limit():
+    import matplotlib
+
+    limit = None
+    if plot_pool.resource is not None:
+        limit = plot_pool.resource.getrlimit(plot_pool.resource.RLIMIT_AS)[0]
+    return matplotlib.get_backend().lower(), limit
+
+
+def test_results_come_back_in_task_order():
+    results = plot_pool.render_in_pool(square, [(x,) for x in range(20)], workers=3)
+    assert [value for value, _ in results] == [x * x for x in range(20)]
+    assert all(error is None for _, error in results)
+
+
+def test_failure_is_reported_without_stopping_other_tasks():
+    results = plot_pool.render_in_pool(fail_on_three, [(x,) for x in range(6)], workers=2)
+    assert [value for value, _ in results] == [0, 1, 2, None, 4, 5]
+    assert "bad dump" in results[3][1]
+
+
+def test_no_tasks():
+    assert plot_pool.render_in_pool(square, [], workers=4) == []
+
+
+@pytest.mark.skipif(plot_pool.resource is None, reason="needs the resource module")
+def test_workers_use_agg_and_memory_cap():
+    [((backend, limit), error)] = plot_pool.render_in_pool(backend_and_limit, [()], workers=2, memory_limit_mb=4096)
+    assert error is None
+    assert backend == "agg"
+    assert limit == 4096 << 20
@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from helpers import write_dump
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def run_dir(tmp_path):
+    with open(os.path.join(REPO, "AMSS_NCKU_Input.py"), newline="") as f:
+        text = f.read()
+    text += "\nOutput_directory = 'bin'\nDetector_Number = 2\ngrid_level = 2\n"
+    (tmp_path / "AMSS_NCKU_Input.py").write_text(text)
+    out = tmp_path / "AMSS_NCKU_output" / "bin"
+    out.mkdir(parents=True)
+    with open(out / "bssn_ADMQs.dat", "w") as f:
+        f.write("# File created\n#\n# time ADMmass ADMPx ADMPy ADMPz ADMSx ADMSy ADMSz\n")
+        for t in np.arange(0.0, 10.0, 0.5):
+            for _ in range(2):
+                f.write(" ".join(str(v) for v in [t] + [1.0] * 7) + "\n")
+    write_dump(out / "Lev00-00_chi_00001.bin", 5.0, np.zeros((2, 2, 2)), [0, 1, 0, 1, 0, 1])
+    return tmp_path
+
+
+def run(code):
+    env = dict(os.environ, MPLBACKEND="Agg", PYTHONPATH=REPO)
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=REPO, check=True)
+
+
+def test_info_stage_skips_plotting_imports(run_dir):
+    result = run(
+        "import sys, AMSS_NCKU_Postprocess as p\n"
+        f"assert p.main([{str(run_dir)!r}, '--stages', 'info']) == 0\n"
+        "print('heavy:', 'matplotlib' in sys.modules, 'scipy' in sys.modules)\n"
+    )
+    assert "bssn_ADMQs.dat" in result.stdout and "40 rows, t = 0.0 to 9.5" in result.stdout
+    assert "bssn_psi4.dat" in result.stdout and "missing" in result.stdout
+    assert "Binary dumps    = 1 files" in result.stdout
+    assert "heavy: False False" in result.stdout
+
+
+def test_plot_stage_uses_run_parameters(run_dir):
+    run(
+        "import AMSS_NCKU_Postprocess as p\n"
+        f"assert p.main([{str(run_dir)!r}, '--stages', 'adm', '--figure-dir', {str(run_dir / 'fig')!r}]) == 0\n"
+    )
+    figures = os.listdir(run_dir / "fig")
+    assert sorted(figures) == sorted(f"ADM_{q}_Dector_{i}.pdf" for q in ["Mass", "Angular_Momentum"] for i in range(2))
+    assert not os.path.exists(run_dir / "figure")
+
+
+def test_missing_input_file(tmp_path):
+    result = run(f"import AMSS_NCKU_Postprocess as p\nprint(p.main([{str(tmp_path)!r}]))")
+    assert "has no AMSS_NCKU_Input.py" in result.stdout
+    assert result.stdout.strip().endswith("1")
@@ -0,0 +1,138 @@
+import json
+from math import comb, factorial
+
+import numpy as np
+import pytest
+
+import monitor_data
+import radiated_fluxes
+import waveform_integration
+import waveform_store
+from helpers import write_psi4
+
+
+def spin_weighted_harmonic(s, l, m, theta, phi):
+    """sY_lm (Goldberg et al. 1967, with the sign convention of the flux formulae)."""
+    total = 0.0
+    for r in range(l - s + 1):
+        k = r + s - m
+        if 0 <= k <= l + s:
+            total = total + comb(l - s, r) * comb(l + s, k) * (-1) ** (l - r - s) / np.tan(theta / 2) ** (2 * r + s - m)
+    norm = np.sqrt(factorial(l + m) * factorial(l - m) * (2 * l + 1) / (4 * np.pi * factorial(l + s) * factorial(l - s)))
+    return (-1) ** m * norm * np.sin(theta / 2) ** (2 * l) * total * np.exp(1j * m * phi)
+
+
+def test_harmonic_convention():
+    theta = np.array([0.3, 1.1, 2.0])
+    assert np.allclose(spin_weighted_harmonic(-2, 2, 2, theta, 0.7),
+                       np.sqrt(5 / (64 * np.pi)) * (1 + np.cos(theta)) ** 2 * np.exp(1.4j))
+    assert np.allclose(spin_weighted_harmonic(-2, 2, -1, theta, 0.7),
+                       np.sqrt(5 / (16 * np.pi)) * np.sin(theta) * (1 - np.cos(theta)) * np.exp(-0.7j))
+
+
+def test_energy_and_momentum_flux_match_sphere_integrals():
+    modes = waveform_store.mode_list(4)
+    rng = np.random.default_rng(2)
+    news = (rng.standard_normal((1, len(modes), 3)) + 1j * rng.standard_normal((1, len(modes), 3)))
+
+    x, weight = np.polynomial.legendre.leggauss(40)
+    theta, phi = np.arccos(x)[:, None], np.linspace(0, 2 * np.pi, 64, endpoint=False)[None, :]
+    weight = weight[:, None] * (2 * np.pi / 64)
+    harmonics = np.array([spin_weighted_harmonic(-2, l, m, theta, phi) for l, m in modes])
+    normal = np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta) + 0 * phi])
+
+    field = np.einsum("kt,kab->tab", news[0], harmonics)
+    power = np.abs(field) ** 2 / (16 * np.pi)
+    expected_energy = np.einsum("tab,ab->t", power, weight)
+    expected_momentum = np.einsum("tab,iab,ab->it", power, normal, weight)
+
+    assert np.allclose(radiated_fluxes.energy_flux(news)[0], expected_energy, rtol=1e-10)
+    assert np.allclose(radiated_fluxes.momentum_flux(news, modes)[0], expected_momentum, atol=1e-10 * expected_energy.max())
+
+
+def test_angular_momentum_of_a_rotating_quadrupole():
+    # h_2,+-2 ~ exp(-+2i Omega t): a source spinning about +z carries dJz/dt = dE/dt / Omega
+    omega, t = 0.1, np.linspace(0.0, 50.0, 11)
+    modes = [(2, -2), (2, 2)]
+    strain = np.stack([np.exp(2j * omega * t), np.exp(-2j * omega * t)])[None]
+    news = np.stack([2j * omega * np.exp(2j * omega * t), -2j * omega * np.exp(-2j * omega * t)])[None]
+
+    flux = radiated_fluxes.angular_momentum_flux(news, strain, modes)[0]
+    energy = radiated_fluxes.energy_flux(news)[0]
+    assert np.allclose(flux[2], energy / omega) and np.allclose(flux[:2], 0.0)
+    assert np.allclose(radiated_fluxes.momentum_flux(news, modes), 0.0)
+
+    # rotating the source about z rotates (Jx, Jy) the same way
+    modes = waveform_store.mode_list(3)
+    rng = np.random.default_rng(4)
+    strain = rng.standard_normal((1, len(modes), 5)) + 1j * rng.standard_normal((1, len(modes), 5))
+    news = rng.standard_normal((1, len(modes), 5)) + 1j * rng.standard_normal((1, len(modes), 5))
+    turn = np.exp(-1j * np.array([m for l, m in modes]) * 0.4)[None, :, None]
+    base = radiated_fluxes.angular_momentum_flux(news, strain, modes)[0]
+    rotated = radiated_fluxes.angular_momentum_flux(news * turn, strain * turn, modes)[0]
+    assert np.allclose(rotated[0], np.cos(0.4) * base[0] - np.sin(0.4) * base[1])
+    assert np.allclose(rotated[1], np.sin(0.4) * base[0] + np.cos(0.4) * base[1])
+    assert np.allclose(rotated[2], base[2])
+
+
+def test_integration_methods():
+    t = np.tile(np.arange(2000) * 0.25, (2, 1))
+    psi4 = np.exp(-(((t - 250.0) / 60.0) ** 2)) * np.exp(0.3j * t)
+    store = waveform_store.WaveformStore(t, psi4[:, None, :], [(2, 2)])
+
+    news, strain = radiated_fluxes.integrate_psi4(store, 0.1)
+    engine = waveform_integration.FixedFrequencyIntegration(2000, 0.25, 0.1, window_gain=False)
+    assert np.allclose(strain, engine.strain(store.data))
+    inner = slice(400, 1600)
+    assert np.allclose(np.gradient(news, 0.25, axis=-1)[..., inner], store.data[..., inner], atol=1e-3)
+    assert np.allclose(np.gradient(strain, 0.25, axis=-1)[..., inner], news[..., inner], atol=1e-2)
+
+    trapezoid, _ = radiated_fluxes.integrate_psi4(store, method="trapezoid")
+    assert np.allclose(trapezoid[..., inner], news[..., inner], atol=5e-3)
+
+    with pytest.raises(ValueError, match="needs omega_cut"):
+        radiated_fluxes.integrate_psi4(store)
+    with pytest.raises(ValueError, match="unknown integration method"):
+        radiated_fluxes.integrate_psi4(store, 0.1, method="quad")
+
+
+def test_flux_summary_and_table(tmp_path):
+    time = np.arange(800) * 0.5
+    envelope = 0.01 * np.exp(-(((time - 200.0) / 40.0) ** 2))
+    psi4 = np.zeros((2, 5, len(time)), dtype=complex)
+    psi4[:, 4] = envelope * np.exp(-0.3j * time)                      # (2, 2)
+    psi4[:, 3] = 0.2 * envelope * np.exp(-0.15j * time)               # (2, 1): asymmetric, recoils
+    psi4[1] *= 1.1
+    write_psi4(tmp_path / "bssn_psi4.dat", time, psi4)
+
+    run = monitor_data.RunData(str(tmp_path), use_cache=False)
+    fluxes = radiated_fluxes.write_flux_summary(run, str(tmp_path), 2, 0.1, [100.0, 50.0], 1.0,
+                                                table_filename=str(tmp_path / "fluxes.dat"))
+    summary = json.loads((tmp_path / "run_summary.json").read_text())["fluxes"]
+    assert summary["method"] == "ffi" and summary["modes"] == 5 and len(summary["detectors"]) == 2
+
+    energy = fluxes["energy"][:, -1]
+    assert np.all(np.diff(fluxes["energy"], axis=-1) >= -1e-15)
+    assert energy[1] == pytest.approx(1.21 * energy[0], rel=1e-6)
+    first = summary["detectors"][0]
+    assert first["radius"] == 100.0 and first["energy"] == pytest.approx(energy[0])
+    kick = -fluxes["momentum"][0, :, -1] / (1.0 - energy[0])
+    assert np.allclose(first["kick_velocity"], kick)
+    assert first["kick_km_s"] == pytest.approx(np.linalg.norm(kick) * radiated_fluxes.SPEED_OF_LIGHT_KM_S)
+    assert 0.0 < first["kick_km_s"] < 1e4
+
+    table = monitor_data.load_monitor_series(str(tmp_path), "fluxes.dat", block_size=2, use_cache=False)
+    assert table.columns[:3] == ["time", "dE/dt", "E"]
+    assert np.allclose(table.demultiplex(2)[1][:, 2], fluxes["energy"][1])
+
+
+def test_frequency_cutoff_without_log_keeps_the_strain_log(tmp_path, capsys):
+    import plot_GW_strain_amplitude_xiaoqu as strain_plot
+
+    with open(tmp_path / "frequency_cut.txt", "w") as file_cut:
+        logged = strain_plot.frequency_cutoff(file_cut)
+    text = (tmp_path / "frequency_cut.txt").read_text()
+    capsys.readouterr()
+    assert strain_plot.frequency_cutoff() == logged
+    assert capsys.readouterr().out == ""
+    assert (tmp_path / "frequency_cut.txt").read_text() == text and "omega_cut" in text
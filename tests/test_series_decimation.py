@@ -0,0 +1,53 @@
+import numpy as np
+
+import series_decimation
+
+
+def test_short_series_are_untouched():
+    x = np.arange(10.0)
+    y = np.sin(x)
+    dx, dy = series_decimation.decimate(x, y, target=100)
+    assert dx is x and dy is y
+
+
+def test_peaks_and_end_points_are_kept():
+    t = np.linspace(0.0, 1000.0, 100_001)
+    y = np.sin(0.37 * t) * np.exp(-((t - 700.0) / 50.0) ** 2)
+    y[12_345] = 5.0
+    y[54_321] = -7.0
+    dt, dy = series_decimation.decimate(t, y, target=1000)
+    assert len(dt) <= 1002
+    assert np.all(np.diff(dt) > 0)
+    assert dt[0] == t[0] and dt[-1] == t[-1]
+    assert dy.max() == y.max() == 5.0 and dy.min() == y.min() == -7.0
+    assert 12_345 in series_decimation.minmax_indices(y, 1000)
+
+
+def test_every_bin_keeps_its_extremes():
+    rng = np.random.default_rng(1)
+    y = rng.standard_normal(1001)
+    indices = series_decimation.minmax_indices(y, 20)
+    width = -(-1001 // 10)
+    for start in range(0, 1001, width):
+        block = y[start : start + width]
+        assert start + np.argmin(block) in indices
+        assert start + np.argmax(block) in indices
+
+
+def test_disabled_with_non_positive_target():
+    y = np.arange(10_000.0)
+    assert len(series_decimation.decimate(y, y, target=0)[1]) == 10_000
+
+
+def test_band_covers_the_original_band():
+    t = np.linspace(0.0, 500.0, 50_001)
+    y = np.sin(0.5 * t)
+    error = 0.1 + 0.05 * np.cos(3.0 * t)
+    bt, low, high = series_decimation.decimate_band(t, y - error, y + error, target=400)
+    assert len(bt) <= 402 and bt[0] == t[0] and bt[-1] == t[-1]
+    assert np.all(np.diff(bt) >= 0)
+    assert np.all(np.interp(t, bt, low) <= y - error + 1e-12)
+    assert np.all(np.interp(t, bt, high) >= y + error - 1e-12)
+
+    x = t[:10]
+    assert series_decimation.decimate_band(x, y[:10], y[:10], target=400)[0] is x
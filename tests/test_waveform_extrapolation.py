@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+import monitor_data
+import waveform_extrapolation
+import waveform_store
+
+RADII = waveform_store.detector_radii(5, 50.0, 150.0)
+MASS = 1.0
+
+
+def waveform_at(u, radius):
+    """Chirp with amplitude and phase corrections of second order in 1/r."""
+    amplitude = np.exp(-((u - 60.0) / 25.0) ** 2) * (1.0 + 3.0 / radius - 40.0 / radius**2)
+    phase = 0.3 * u + 0.001 * u**2 + 5.0 / radius + 80.0 / radius**2
+    return amplitude * np.exp(1j * phase)
+
+
+@pytest.fixture
+def store():
+    time = np.tile(np.arange(0.0, 300.0, 0.05), (len(RADII), 1))
+    shift = waveform_extrapolation.tortoise_radius(RADII, MASS)
+    modes = [(2, 2), (2, -2)]
+    data = np.stack([waveform_at(time - shift[:, None], RADII[:, None]),
+                     np.conj(waveform_at(time - shift[:, None], RADII[:, None]))], axis=1)
+    return waveform_store.WaveformStore(time, data, modes)
+
+
+def test_retarded_time_shift():
+    assert np.isclose(waveform_extrapolation.tortoise_radius(100.0, 1.0), 100.0 + 2.0 * np.log(49.0))
+    assert np.array_equal(waveform_extrapolation.retarded_time_shift(RADII), RADII)
+
+
+def test_align_retarded_time():
+    time = np.tile(np.arange(0.0, 10.0, 0.5), (2, 1))
+    values = np.stack([2.0 * time, 3.0 * time + 1.0], axis=1)          # (detector, 2, time)
+    u, aligned = waveform_extrapolation.align_retarded_time(time, values, np.array([1.25, 3.0]))
+    assert u[0] == pytest.approx(-1.25) and u[-1] <= 6.5 and len(u) == 16
+    assert np.allclose(aligned[0, 0], 2.0 * (u + 1.25))
+    assert np.allclose(aligned[1, 1], 3.0 * (u + 3.0) + 1.0)
+    with pytest.raises(ValueError, match="in common"):
+        waveform_extrapolation.align_retarded_time(time, values, np.array([0.0, 20.0]))
+
+
+def test_fit_inverse_radius():
+    values = np.array([[1.0], [2.0]]) + np.array([[0.5], [-4.0]]) / RADII + np.array([[30.0], [7.0]]) / RADII**2
+    coefficients = waveform_extrapolation.fit_inverse_radius(values.T, RADII, 2)
+    assert coefficients.shape == (3, 2)
+    assert np.allclose(coefficients[:, 0], [1.0, 0.5, 30.0]) and np.allclose(coefficients[:, 1], [2.0, -4.0, 7.0])
+    with pytest.raises(ValueError, match="at least 4 detectors"):
+        waveform_extrapolation.fit_inverse_radius(values.T[:3], RADII[:3], 3)
+
+
+def test_extrapolation_recovers_the_waveform_at_infinity(store):
+    result = waveform_extrapolation.extrapolate_waveform(store, RADII, MASS)
+    assert result.modes == [(2, 2), (2, -2)] and result.data.shape == (2, len(result.time))
+
+    exact = waveform_at(result.time, np.inf)
+    assert np.allclose(result.series(2, 2), exact, atol=1e-5)
+    assert np.allclose(result.series(2, -2), np.conj(exact), atol=1e-5)
+
+    # the order-1 fit misses the 1/r^2 terms, which the spread reports
+    index = result.mode_index(2, 2)
+    peak = np.argmax(result.amplitude[index])
+    assert result.amplitude_error[index, peak] > 1e-4
+    assert np.all(result.phase_error[index] > 1e-3)
+    low = waveform_extrapolation.extrapolate_waveform(store, RADII, MASS, order=1)
+    assert np.allclose(result.amplitude_error, np.abs(result.amplitude - low.amplitude))
+
+    single = result.store()
+    assert single.detector_number == 1 and np.array_equal(single[0, 2, 2], result.series(2, 2))
+
+
+def test_extrapolation_errors(store):
+    three = waveform_store.WaveformStore(store.time[:3], store.data[:3], store.modes)
+    with pytest.raises(ValueError, match="5 radii for 3 detectors"):
+        waveform_extrapolation.extrapolate_waveform(three, RADII)
+    with pytest.raises(ValueError, match="at least 6 detectors"):
+        waveform_extrapolation.extrapolate_waveform(store, RADII, MASS, order=5)
+    with pytest.raises(KeyError, match="l=3 m=0"):
+        waveform_extrapolation.extrapolate_waveform(store, RADII, MASS).series(3, 0)
+
+
+def test_written_waveform_reads_back_as_one_detector(store, tmp_path):
+    result = waveform_extrapolation.extrapolate_waveform(store, RADII, MASS)
+    waveform_extrapolation.write_extrapolated_waveform(tmp_path / "bssn_psi4.dat", result)
+    loaded = waveform_store.load_psi4_store(monitor_data.RunData(str(tmp_path), use_cache=False), 1)
+    assert loaded.modes == [(2, -2), (2, 2)]
+    assert np.allclose(loaded[0, 2, 2], result.series(2, 2), rtol=1e-12, atol=1e-14)
+    assert np.allclose(loaded.time[0], result.time)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+import scipy.signal
+
+import monitor_data
+import plot_GW_strain_amplitude_xiaoqu as strain_plot
+import waveform_frequency
+import waveform_store
+from helpers import write_psi4
+
+DT = 0.25
+
+
+def chirp_phase(t, rate=1.0):
+    return rate * (0.2 * t + 5e-4 * t**2)
+
+
+def test_phase_and_frequency_between_samples():
+    t = np.arange(2000) * DT
+    frequency = waveform_frequency.InstantaneousFrequency(t, np.exp(1j * chirp_phase(t)))
+    query = np.array([10.1, 123.45, 300.0])
+    assert np.allclose(frequency.phase_at(query), chirp_phase(query), atol=1e-5)
+    assert np.allclose(frequency.angular_frequency_at(query), 0.2 + 1e-3 * query, atol=1e-6)
+    assert np.allclose(frequency.frequency_at(query), (0.2 + 1e-3 * query) / (2 * np.pi), atol=1e-6)
+    assert frequency.frequency_at(123.45).shape == ()
+    assert frequency.frequency_at(-5.0) == pytest.approx(frequency.frequency[0])
+    assert frequency.frequency_at(1e6) == pytest.approx(frequency.frequency[-1])
+
+
+def test_real_part_matches_the_hilbert_chain():
+    t = np.arange(800) / 4.0
+    signal = np.cos(chirp_phase(t))
+    legacy = np.gradient(np.unwrap(np.angle(scipy.signal.hilbert(signal))), t) / (2 * np.pi)
+    frequency = waveform_frequency.InstantaneousFrequency(t, signal)
+    assert np.allclose(frequency.frequency, legacy)
+    assert np.allclose(frequency.frequency_at(t[100:110]), legacy[100:110])
+
+    _, instantaneous = strain_plot.instantaneous_frequency(signal, 4.0)
+    assert np.allclose(instantaneous, legacy)
+    assert strain_plot.get_frequency_at_t1(signal, 4.0, t[300]) == pytest.approx(legacy[300])
+    between = strain_plot.get_frequency_at_t1(signal, 4.0, t[300] + 0.1)
+    assert between == pytest.approx(0.6 * legacy[300] + 0.4 * legacy[301])
+
+
+def test_batched_queries_over_detectors_and_modes():
+    t = np.arange(1200) * DT
+    rates = np.array([1.0, 1.5, 2.0])[:, None, None]
+    m = np.array([-2, 2])[None, :, None]
+    data = np.exp(1j * np.sign(m) * chirp_phase(t, rates))                    # (detector, mode, time)
+    frequency = waveform_frequency.InstantaneousFrequency(t, data, modes=[(2, -2), (2, 2)])
+
+    query = np.array([50.0, 100.1])
+    all_series = frequency.angular_frequency_at(query)
+    assert all_series.shape == (3, 2, 2)
+    assert np.allclose(all_series, np.sign(m) * rates * (0.2 + 1e-3 * query), atol=1e-5)
+
+    per_detector = np.array([10.0, 20.0, 30.0])
+    selected = frequency.angular_frequency_at(per_detector[:, None], 2, 2)
+    assert selected.shape == (3, 1)
+    assert np.allclose(selected[:, 0], rates[:, 0, 0] * (0.2 + 1e-3 * per_detector), atol=1e-5)
+    with pytest.raises(KeyError, match="l=3 m=0"):
+        frequency.frequency_at(1.0, 3, 0)
+
+
+def test_frequency_store_is_cached(tmp_path):
+    t = np.arange(400) * 0.5
+    psi4 = np.exp(1j * chirp_phase(t) * np.arange(1, 6)[None, :, None]) * np.ones((2, 1, 1))
+    write_psi4(tmp_path / "bssn_psi4.dat", t, psi4)
+    run = monitor_data.RunData(str(tmp_path), use_cache=False)
+
+    store = waveform_frequency.frequency_store(run, 2)
+    assert waveform_frequency.frequency_store(run, 2) is store
+    assert store.modes == waveform_store.mode_list(2)
+    assert np.allclose(store.angular_frequency_at(100.0, 2, 1), 4 * (0.2 + 0.1), atol=1e-5)
+    real = waveform_frequency.frequency_store(run, 2, component="real")
+    assert real is not store and np.allclose(real.angular_frequency_at(100.0, 2, 1), 4 * (0.2 + 0.1), atol=1e-2)
+    with pytest.raises(ValueError, match="unknown component"):
+        waveform_frequency.InstantaneousFrequency(t, psi4, component="abs")
+
+
+def test_kept_signal_frequency_is_queried_directly():
+    t = np.arange(800) / 4.0
+    signal = np.cos(chirp_phase(t))
+    frequency = strain_plot.signal_frequency(signal, 4.0)
+    expected = strain_plot.get_frequency_at_t1(signal, 4.0, t[300])
+    assert strain_plot.get_frequency_at_t1(frequency, 4.0, t[300]) == expected
+    assert np.allclose(strain_plot.get_frequency_at_t1(frequency, 4.0, t[[10, 20]]), frequency.frequency[[10, 20]])
+
+
+def test_retarded_zero_frequency_of_all_detectors(tmp_path, monkeypatch):
+    t = np.arange(2000) * DT
+    rates = np.array([1.0, 1.5])[:, None, None]
+    m = np.array([-2, -1, 0, 1, 2])[None, :, None]
+    write_psi4(tmp_path / "bssn_psi4.dat", t, np.exp(1j * m * chirp_phase(t, rates)))
+    monkeypatch.setattr(strain_plot.input_data, "Detector_Number", 2)
+    monkeypatch.setattr(strain_plot.input_data, "Detector_Rmin", 50.0)
+    monkeypatch.setattr(strain_plot.input_data, "Detector_Rmax", 100.0)
+    monkeypatch.setattr(strain_plot.input_data, "GW_L_max", 2, raising=False)
+    run = monitor_data.RunData(str(tmp_path), use_cache=False)
+
+    frequency, modes = strain_plot.retarded_zero_frequency(run, None)
+    assert modes == waveform_store.mode_list(2) and frequency.shape == (2, 5)
+    t1 = np.array([100.0, 50.0])
+    expected = rates[:, 0, 0] * (0.2 + 1e-3 * t1) / (2 * np.pi)
+    assert np.allclose(frequency[:, modes.index((2, 2))], 2 * expected, rtol=1e-2)
+    assert np.allclose(frequency[:, modes.index((2, -1))], expected, rtol=1e-2)
+
+    shifted, _ = strain_plot.retarded_zero_frequency(run, 1.0)
+    assert np.all(shifted[:, modes.index((2, 2))] > frequency[:, modes.index((2, 2))])
+    assert ("frequency_store", 2, 2, "real") in run.cache
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+import monitor_data
+import waveform_integration
+import waveform_store
+from helpers import mode_names, write_psi4
+
+
+def test_mode_list_and_column_count():
+    assert waveform_store.mode_list(2) == [(2, -2), (2, -1), (2, 0), (2, 1), (2, 2)]
+    assert len(waveform_store.mode_list(4)) == 21
+    assert [waveform_store.l_max_from_columns(n) for n in (11, 25, 43)] == [2, 3, 4]
+    for ncolumn in (10, 13, 24):
+        with pytest.raises(ValueError, match="do not match"):
+            waveform_store.l_max_from_columns(ncolumn)
+
+
+def test_layout_from_names_and_from_count():
+    names = mode_names(3)
+    layout = waveform_store.psi4_layout(names)
+    assert [(l, m) for l, m, _, _ in layout] == waveform_store.mode_list(3)
+    assert layout[0][2:] == (1, 2) and layout[-1][2:] == (23, 24)
+
+    reordered = ["time"] + names[13:] + names[1:13]
+    layout = waveform_store.psi4_layout(reordered, l_max=2)
+    assert [(l, m) for l, m, _, _ in layout] == waveform_store.mode_list(2)
+    assert layout[0][2:] == (13, 14)
+
+    unnamed = ["time"] + [f"column{k}" for k in range(1, 25)]
+    assert waveform_store.psi4_layout(unnamed) == waveform_store.psi4_layout(names)
+
+    with pytest.raises(ValueError, match="real and imaginary"):
+        waveform_store.psi4_layout(["time", "R02m002"])
+
+
+@pytest.fixture
+def run(tmp_path):
+    rng = np.random.default_rng(5)
+    time = np.arange(64) * 0.5
+    psi4 = rng.standard_normal((3, 12, 64)) + 1j * rng.standard_normal((3, 12, 64))
+    write_psi4(tmp_path / "bssn_psi4.dat", time, psi4)
+    return monitor_data.RunData(str(tmp_path), use_cache=False), time, psi4
+
+
+def test_store_of_all_modes(run):
+    run, time, psi4 = run
+    store = waveform_store.psi4_store(run, 3)
+    assert store.modes == waveform_store.mode_list(3) and store.l_max == 3
+    assert store.data.shape == (3, 12, 64) and store.data.flags.c_contiguous
+    assert np.array_equal(store.time[2], time)
+    assert np.array_equal(store.data, psi4)
+    assert np.array_equal(store[1, 3, -2], psi4[1, 6])
+    assert np.array_equal(store.mode(2, 2), psi4[:, 4])
+    assert np.array_equal(store.m[:5], [-2, -1, 0, 1, 2])
+    assert waveform_store.psi4_store(run, 3) is store
+    with pytest.raises(KeyError, match="l=4 m=0"):
+        store.mode(4, 0)
+
+    l2 = waveform_store.psi4_store(run, 3, l_max=2)
+    assert l2.modes == waveform_store.mode_list(2)
+    assert np.array_equal(l2.data, psi4[:, :5])
+    selected = store.select([(3, 3), (2, -2)])
+    assert np.array_equal(selected.data, psi4[:, [11, 0]])
+
+
+def test_strain_of_all_modes_in_one_pass(run):
+    run, time, psi4 = run
+    strain = waveform_store.strain_store(run, 3, 0.2)
+    assert waveform_store.strain_store(run, 3, 0.2) is strain
+    engine = waveform_integration.FixedFrequencyIntegration(len(time), 0.5, 0.2)
+    assert np.allclose(strain[2, 3, 1], engine.strain(psi4[2, 9]))
+
+
+def test_detector_radii():
+    assert np.allclose(waveform_store.detector_radii(12, 50.0, 160.0)[[0, 1, -1]], [160.0, 150.0, 50.0])
+    assert np.array_equal(waveform_store.detector_radii(1, 50.0, 160.0), [160.0])
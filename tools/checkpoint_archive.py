@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Verify, compress and restore checkpoint::writecheck_cgh checkpoints.
+
+Usage (from the repository root):
+
+    python -m tools.checkpoint_archive checksum bssn_cgh.CHK
+    python -m tools.checkpoint_archive verify   bssn_cgh.CHK
+    python -m tools.checkpoint_archive pack     bssn_cgh.CHK bssn_cgh.CHK.cc --codec lzma
+    python -m tools.checkpoint_archive verify   bssn_cgh.CHK.cc
+    python -m tools.checkpoint_archive unpack   bssn_cgh.CHK.cc bssn_cgh.CHK
+
+Blocks follow the checkpoint layout: the hierarchy header, then one block per
+(level, patch, variable) field, split into chunks of at most --chunk-mb.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import checkpoint_reader
+import chunked_container
+
+CHECKSUM_SUFFIX = ".sums.json"
+
+
+def checkpoint_blocks(chk: checkpoint_reader.CheckpointFile) -> list[tuple[str, int, int]]:
+    """Named byte ranges of a checkpoint: header plus one per (level, patch, variable)."""
+    blocks = [("header", 0, chk.header_size)]
+    for patches in chk.patches:
+        for patch in patches:
+            field_bytes = patch.size * 8
+            for index, name in enumerate(chk.variables):
+                blocks.append(
+                    (f"lev{patch.level:02d}/patch{patch.index:02d}/{name}", patch.offset + index * field_bytes, field_bytes)
+                )
+    return blocks
+
+
+def layout_blocks(path: str, chunk_size: int, **layout) -> tuple[list[tuple[str, int, int]], dict]:
+    """Blocks of a checkpoint, falling back to plain chunks if its patch list cannot be rebuilt."""
+    size = os.path.getsize(path)
+    try:
+        chk = checkpoint_reader.CheckpointFile(path, **layout)
+    except ValueError as error:
+        print(f"[checkpoint-archive] layout not recognised ({error}); using plain chunks", file=sys.stderr)
+        return chunked_container.split_blocks([], size, chunk_size), {"layout": "chunks"}
+    metadata = {"layout": "cgh", "time": chk.time, "levels": chk.levels, "variables": chk.variables}
+    return chunked_container.split_blocks(checkpoint_blocks(chk), size, chunk_size), metadata
+
+
+def write_checksums(path: str, chunk_size: int, processes: int | None, **layout) -> Path:
+    """Write <checkpoint>.sums.json with the CRC32 of every block."""
+    blocks, _ = layout_blocks(path, chunk_size, **layout)
+    sums = chunked_container.block_checksums(path, blocks, processes)
+    record = {
+        "size": os.path.getsize(path),
+        "blocks": [{"name": n, "offset": o, "size": s, "crc32": c} for (n, o, s), c in zip(blocks, sums)],
+    }
+    out = Path(path + CHECKSUM_SUFFIX)
+    out.write_text(json.dumps(record, indent=1), encoding="utf-8")
+    return out
+
+
+def verify(path: str, processes: int | None) -> list[str]:
+    """Names of corrupted blocks of a container or of a checkpoint with a checksum file."""
+    try:
+        return chunked_container.ContainerFile(path).verify(processes)
+    except ValueError:
+        pass
+
+    sums_path = Path(path + CHECKSUM_SUFFIX)
+    if not sums_path.exists():
+        raise FileNotFoundError(f"no checksums for {path}; run the checksum command first")
+    record = json.loads(sums_path.read_text(encoding="utf-8"))
+    if os.path.getsize(path) != record["size"]:
+        return ["<file size>"]
+    blocks = [(b["name"], b["offset"], b["size"]) for b in record["blocks"]]
+    sums = chunked_container.block_checksums(path, blocks, processes)
+    return [b["name"] for b, crc in zip(record["blocks"], sums) if crc != b["crc32"]]
+
+
+def pack(
+    path: str,
+    destination: str,
+    codec: str = "zlib",
+    level: int = 6,
+    processes: int | None = None,
+    chunk_size: int = chunked_container.DEFAULT_CHUNK_SIZE,
+    **layout,
+) -> chunked_container.ContainerFile:
+    blocks, metadata = layout_blocks(path, chunk_size, **layout)
+    metadata["source"] = os.path.basename(path)
+    return chunked_container.write_container(
+        path, destination, blocks, codec, level, processes, metadata, chunk_size
+    )
+
+
+def unpack(container: str, destination: str) -> None:
+    chunked_container.ContainerFile(container).restore(destination)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Checkpoint integrity check and compressed re-layout")
+    parser.add_argument("command", choices=["checksum", "verify", "pack", "unpack"])
+    parser.add_argument("source")
+    parser.add_argument("destination", nargs="?")
+    parser.add_argument("--codec", choices=chunked_container.CONTAINER_CODECS, default="zlib")
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--chunk-mb", type=int, default=chunked_container.DEFAULT_CHUNK_SIZE >> 20)
+    parser.add_argument("--symmetry", default="equatorial-symmetry", choices=list(checkpoint_reader.CHECKPOINT_SYMMETRY))
+    parser.add_argument("--centering", default="Cell", choices=["Cell", "Vertex"])
+    parser.add_argument("--with-shell", action="store_true")
+    args = parser.parse_args()
+
+    chunk_size = args.chunk_mb << 20
+    layout = {"symmetry": args.symmetry, "centering": args.centering, "with_shell": args.with_shell}
+
+    if args.command == "checksum":
+        print(f"[checkpoint-archive] wrote {write_checksums(args.source, chunk_size, args.processes, **layout)}")
+    elif args.command == "verify":
+        bad = verify(args.source, args.processes)
+        for name in bad:
+            print(f"[checkpoint-archive] corrupted block: {name}")
+        print(f"[checkpoint-archive] {'FAILED' if bad else 'OK'}: {args.source}")
+        return 1 if bad else 0
+    elif args.command == "pack":
+        destination = args.destination or args.source + ".cc"
+        container = pack(args.source, destination, args.codec, args.level, args.processes, chunk_size, **layout)
+        stored = os.path.getsize(destination)
+        print(
+            f"[checkpoint-archive] {args.source}: {container.source_size} -> {stored} bytes "
+            f"in {len(container.blocks)} blocks ({stored / max(container.source_size, 1):.1%})"
+        )
+    else:
+        destination = args.destination or args.source.removesuffix(".cc")
+        if destination == args.source:
+            parser.error("give a destination for containers without the .cc suffix")
+        unpack(args.source, destination)
+        print(f"[checkpoint-archive] restored {destination}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,9 @@ from __future__ import annotations
 import math
 import re
 from dataclasses import dataclass
-from typing import Iterable
+from typing import Iterable, Sequence
+
+import numpy as np
 
 FLOAT_PATTERN = re.compile(r"[-+]?(?:\d+\.\d*|\d*\.\d+|\d+)(?:[eE][-+]?\d+)?")
 
@@ -49,19 +51,29 @@ def _is_close(a: float, b: float, rtol: float, atol: float) -> bool:
     return math.isclose(a, b, rel_tol=rtol, abs_tol=atol)
 
 
-def compare_float_sequences(expected: list[float], actual: list[float], rtol: float, atol: float) -> CompareResult:
+def compare_float_sequences(
+    expected: Sequence[float], actual: Sequence[float], rtol: float, atol: float
+) -> CompareResult:
     if len(expected) != len(actual):
         return CompareResult(False, f"length mismatch: expected={len(expected)} actual={len(actual)}")
 
-    for i, (e, a) in enumerate(zip(expected, actual)):
-        if not _is_close(e, a, rtol, atol):
-            return CompareResult(
-                False,
-                (
-                    f"value mismatch at index {i}: expected={e:.16e} "
-                    f"actual={a:.16e} abs_diff={abs(e - a):.3e}"
-                ),
-            )
+    # math.isclose on whole arrays; only the first mismatch is reported
+    e = np.asarray(expected, dtype=np.float64)
+    a = np.asarray(actual, dtype=np.float64)
+    # inf only matches the same inf and nan never matches, as with math.isclose
+    with np.errstate(invalid="ignore"):
+        within = np.abs(e - a) <= np.maximum(rtol * np.maximum(np.abs(e), np.abs(a)), atol)
+        close = (e == a) | (np.isfinite(e) & np.isfinite(a) & within)
+    mismatches = np.flatnonzero(~close)
+    if len(mismatches):
+        i = int(mismatches[0])
+        return CompareResult(
+            False,
+            (
+                f"value mismatch at index {i}: expected={e[i]:.16e} "
+                f"actual={a[i]:.16e} abs_diff={abs(e[i] - a[i]):.3e}"
+            ),
+        )
 
     return CompareResult(True, "all values are within tolerance")
 
@@ -0,0 +1,247 @@
+
+#################################################
+##
+## Extrapolation of the waveforms of all detectors to null infinity
+##
+## The detectors sit at finite radii r_d, so r psi4 (or r h) still carries
+## 1/r corrections. Each detector is shifted to the retarded time
+## u = t - r*_d (the tortoise coordinate of the strain plot), the amplitude
+## A and the unwrapped phase phi of every mode are interpolated onto one
+## common u grid, and at every sample
+##
+##   A(u, r)   = A_0(u)   + A_1(u) / r   + ... + A_N(u) / r^N
+##   phi(u, r) = phi_0(u) + phi_1(u) / r + ... + phi_N(u) / r^N
+##
+## is fitted by least squares over the detectors. The design matrix only
+## depends on the radii, so all samples, modes, amplitudes and phases are
+## solved in one lstsq call per order. The values at infinity are A_0 and
+## phi_0; their error is estimated from the spread between the fits of
+## order N and N-1.
+##
+## Typical use:
+##   store  = waveform_store.psi4_store( run, input_data.Detector_Number, input_data.GW_L_max )
+##   radii  = waveform_store.detector_radii( input_data.Detector_Number, input_data.Detector_Rmin, input_data.Detector_Rmax )
+##   result = waveform_extrapolation.extrapolate_waveform( store, radii, total_mass )
+##   psi4_22, error_22 = result.series( 2, 2 ), result.amplitude_error[ result.mode_index( 2, 2 ) ]
+##
+#################################################
+
+import numpy
+
+import waveform_store
+
+
+#########################################################################################
+
+## Default polynomial order in 1/r (needs at least order + 1 detectors)
+
+EXTRAPOLATION_ORDER = 2
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## tortoise_radius(radius, total_mass)
+## Tortoise coordinate r* = r + 2M ln( r/(2M) - 1 ) of the strain plot.
+
+def tortoise_radius( radius, total_mass ):
+    radius = numpy.asarray( radius, dtype=numpy.float64 )
+    return radius + 2.0 * total_mass * numpy.log( radius / ( 2.0 * total_mass ) - 1.0 )
+
+## retarded_time_shift(radii, total_mass=None)
+## Shift t - u of each detector: the tortoise radius, or the radius itself
+## without a total mass (the plots do this for more than two punctures).
+
+def retarded_time_shift( radii, total_mass=None ):
+    if total_mass is None:
+        return numpy.asarray( radii, dtype=numpy.float64 )
+    return tortoise_radius( radii, total_mass )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## align_retarded_time(time, values, shift)
+## Interpolate the waveforms of all detectors onto a common retarded-time grid.
+##
+##  - time:   sample times (detector, time), uniformly spaced with the same step
+##  - values: real array (detector, ..., time)
+##  - shift:  t - u of each detector
+##
+## Returns u (the grid, spanning the retarded times covered by every detector,
+## with the sample step of the data) and values on it, (detector, ..., u).
+## The linear interpolation of all detectors is one gather along the time axis.
+
+def align_retarded_time( time, values, shift ):
+
+    time   = numpy.asarray( time,  dtype=numpy.float64 )
+    shift  = numpy.asarray( shift, dtype=numpy.float64 )
+    values = numpy.asarray( values )
+    if time.shape[-1] < 2:
+        raise ValueError( "at least two samples per detector are needed" )
+
+    dt      = time[0, 1] - time[0, 0]
+    u_start = numpy.max( time[:, 0]  - shift )
+    u_end   = numpy.min( time[:, -1] - shift )
+    if u_end <= u_start:
+        raise ValueError( "the detectors have no retarded time in common" )
+    u = u_start + dt * numpy.arange( int( ( u_end - u_start ) / dt + 1.0e-9 ) + 1 )
+
+    ## fractional sample index of u in the data of each detector
+    position = ( u[None, :] + shift[:, None] - time[:, :1] ) / dt
+    index    = numpy.clip( numpy.floor( position ).astype( numpy.int64 ), 0, time.shape[-1] - 2 )
+    fraction = position - index
+
+    flat   = values.reshape( values.shape[0], -1, values.shape[-1] )
+    lower  = numpy.take_along_axis( flat, index[:, None, :],     axis=-1 )
+    upper  = numpy.take_along_axis( flat, index[:, None, :] + 1, axis=-1 )
+    result = lower + fraction[:, None, :] * ( upper - lower )
+
+    return u, result.reshape( values.shape[:-1] + ( len(u), ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## fit_inverse_radius(values, radii, order)
+## Least-squares fit of values[detector, ...] = sum_k c_k / r^k, k = 0 ... order,
+## for all trailing indices at once. Returns c shaped (order + 1, ...).
+
+def fit_inverse_radius( values, radii, order ):
+
+    values = numpy.asarray( values, dtype=numpy.float64 )
+    radii  = numpy.asarray( radii,  dtype=numpy.float64 )
+    if len(radii) < order + 1:
+        raise ValueError( f"a fit of order {order} in 1/r needs at least {order + 1} detectors, got {len(radii)}" )
+
+    ## powers of r_min/r (all in (0, 1]) keep the design matrix well conditioned
+    scale       = numpy.min( radii )
+    power       = numpy.arange( order + 1 )
+    design      = ( scale / radii[:, None] )**power
+    solution, _, _, _ = numpy.linalg.lstsq( design, values.reshape( len(radii), -1 ), rcond=None )
+    solution   *= ( scale**power )[:, None]
+
+    return solution.reshape( ( order + 1, ) + values.shape[1:] )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## ExtrapolatedWaveform
+## Waveform at null infinity, all modes on the common retarded-time grid.
+##
+##  - time:            retarded time u
+##  - data:            complex waveform A_0 exp(i phi_0), shaped (mode, u)
+##  - amplitude_error: |A_0(order N) - A_0(order N-1)|,     shaped (mode, u)
+##  - phase_error:     |phi_0(order N) - phi_0(order N-1)|, shaped (mode, u)
+##  - modes, order, radii
+##
+## store() wraps the result as a one-detector WaveformStore (e.g. for the FFI).
+
+class ExtrapolatedWaveform:
+
+    def __init__( self, time, amplitude, phase, amplitude_error, phase_error, modes, order, radii ):
+
+        self.time            = time
+        self.amplitude       = amplitude
+        self.phase           = phase
+        self.data            = amplitude * numpy.exp( 1j * phase )
+        self.amplitude_error = amplitude_error
+        self.phase_error     = phase_error
+        self.modes           = [ ( int(l), int(m) ) for l, m in modes ]
+        self.index           = { mode: k for k, mode in enumerate( self.modes ) }
+        self.order           = order
+        self.radii           = radii
+
+    def mode_index( self, l, m ):
+        try:
+            return self.index[ ( l, m ) ]
+        except KeyError:
+            raise KeyError( f"mode l={l} m={m} was not extrapolated" ) from None
+
+    def series( self, l, m ):
+        return self.data[ self.mode_index( l, m ) ]
+
+    def store( self ):
+        return waveform_store.WaveformStore( self.time[None, :], self.data[None], self.modes )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## extrapolate_waveform(store, radii, total_mass=None, order=EXTRAPOLATION_ORDER)
+## Extrapolate every mode of a WaveformStore (r psi4 or r h of all detectors)
+## to null infinity.
+##
+##  - radii:      extraction radius of each detector (waveform_store.detector_radii)
+##  - total_mass: mass for the tortoise coordinate; None aligns in t - r
+##  - order:      highest power of 1/r; the error estimate compares with order - 1
+
+def extrapolate_waveform( store, radii, total_mass=None, order=EXTRAPOLATION_ORDER ):
+
+    radii = numpy.asarray( radii, dtype=numpy.float64 )
+    if len(radii) != store.detector_number:
+        raise ValueError( f"{len(radii)} radii for {store.detector_number} detectors" )
+    if order < 1:
+        raise ValueError( "the extrapolation order must be at least 1 (the error compares orders N and N-1)" )
+    if store.detector_number < order + 1:
+        raise ValueError( f"extrapolation of order {order} needs at least {order + 1} detectors, got {store.detector_number}" )
+
+    ## amplitude and unwrapped phase of all (detector, mode), aligned in retarded time
+    amplitude_phase = numpy.stack( [ numpy.abs( store.data ), numpy.unwrap( numpy.angle( store.data ), axis=-1 ) ], axis=1 )
+    u, aligned      = align_retarded_time( store.time, amplitude_phase, retarded_time_shift( radii, total_mass ) )
+    amplitude, phase = aligned[:, 0], aligned[:, 1]
+
+    ## unwrapping starts from an arbitrary branch on each detector: shift every detector
+    ## by whole turns to the phase of the first one at the amplitude peak of each mode
+    peak      = numpy.argmax( amplitude[0], axis=-1 )[None, :, None]
+    reference = numpy.take_along_axis( phase, numpy.broadcast_to( peak, phase.shape[:2] + (1,) ), axis=-1 )
+    phase    -= 2.0 * numpy.pi * numpy.round( ( reference - reference[:1] ) / ( 2.0 * numpy.pi ) )
+
+    ## one least-squares solve per order for all samples, modes, amplitudes and phases
+    high = fit_inverse_radius( aligned, radii, order     )[0]
+    low  = fit_inverse_radius( aligned, radii, order - 1 )[0]
+
+    return ExtrapolatedWaveform( u, high[0], high[1], numpy.abs( high[0] - low[0] ), numpy.abs( high[1] - low[1] ),
+                                 store.modes, order, radii )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## write_extrapolated_waveform(filename, result)
+## Text table of an ExtrapolatedWaveform: u, then R<l>m<m> I<l>m<m> for all
+## modes (the column names of bssn_psi4.dat, so waveform_store can read it
+## back as one detector), then dA<l>m<m> dP<l>m<m> (amplitude and phase errors).
+
+def write_extrapolated_waveform( filename, result ):
+
+    names   = [ "time" ]
+    columns = [ result.time ]
+    for ( l, m ), series in zip( result.modes, result.data ):
+        names   += [ f"R{l:02d}m{m:03d}", f"I{l:02d}m{m:03d}" ]
+        columns += [ series.real, series.imag ]
+    for ( l, m ), amplitude_error, phase_error in zip( result.modes, result.amplitude_error, result.phase_error ):
+        names   += [ f"dA{l:02d}m{m:03d}", f"dP{l:02d}m{m:03d}" ]
+        columns += [ amplitude_error, phase_error ]
+
+    header = ( f"Waveform extrapolated to null infinity, order {result.order} in 1/r, "
+               f"radii {', '.join( f'{r:g}' for r in result.radii )}\n\n" + " ".join( names ) )
+    numpy.savetxt( filename, numpy.column_stack( columns ), fmt="%.15e", header=header )
+
+    return
+
+#########################################################################################
+
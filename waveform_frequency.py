@@ -0,0 +1,143 @@
+
+#################################################
+##
+## Instantaneous phase and frequency of waveforms, computed once per series
+## and queried at any number of times
+##
+## The phase of every (detector, mode) series is the unwrapped argument of
+## its analytic signal: the complex waveform itself, or for a real component
+## the Hilbert transform (one batched scipy transform for all series). Phase
+## and frequency d(phase)/dt are stored once; phase_at / frequency_at then
+## answer arrays of query times by linear interpolation between the samples,
+## for all series at once.
+##
+## Typical use:
+##   frequency = waveform_frequency.frequency_store( run, input_data.Detector_Number, input_data.GW_L_max )
+##   f_22      = frequency.frequency_at( t1, 2, 2 )          ## all detectors at t1 (or t1[detector])
+##   omega_all = frequency.angular_frequency_at( times )      ## all detectors and modes at each time
+##
+#################################################
+
+import numpy
+import scipy.signal
+
+import monitor_data
+import waveform_store
+
+
+#########################################################################################
+
+## Components of a complex waveform a phase can be taken from
+
+FREQUENCY_COMPONENTS = ( "complex", "real", "imag" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## InstantaneousFrequency(time, data, component="complex", modes=None)
+## Phase and frequency of a batch of uniformly sampled series.
+##
+##  - time:      sample times, shaped (time,) or like the leading axes of data plus (time,)
+##  - data:      series (..., time); real data always go through the Hilbert transform
+##  - component: "complex" uses the complex series as the analytic signal,
+##               "real" / "imag" the Hilbert transform of that part (as the plots did)
+##  - modes:     (l, m) along axis -2 of data, to select series by mode
+##
+## phase / angular_frequency / frequency hold the whole (..., time) arrays;
+## the *_at(times, l=None, m=None) methods interpolate them at query times.
+
+class InstantaneousFrequency:
+
+    def __init__( self, time, data, component="complex", modes=None ):
+
+        data = numpy.asarray( data )
+        if component not in FREQUENCY_COMPONENTS:
+            raise ValueError( f"unknown component {component!r}, expected one of {FREQUENCY_COMPONENTS}" )
+        if data.shape[-1] < 2:
+            raise ValueError( "at least two samples are needed" )
+        if numpy.iscomplexobj( data ) and component != "complex":
+            data = getattr( data, component )
+
+        analytic = data if numpy.iscomplexobj( data ) else scipy.signal.hilbert( data, axis=-1 )
+
+        self.time              = numpy.broadcast_to( numpy.asarray( time, dtype=numpy.float64 ), data.shape )
+        first                  = self.time[ (0,) * ( data.ndim - 1 ) ]
+        self.dt                = float( first[1] - first[0] )
+        self.phase             = numpy.unwrap( numpy.angle( analytic ), axis=-1 )
+        self.angular_frequency = numpy.gradient( self.phase, self.dt, axis=-1 )
+        self.frequency         = self.angular_frequency / ( 2.0 * numpy.pi )
+        self.modes             = None if modes is None else [ ( int(l), int(m) ) for l, m in modes ]
+
+    def mode_index( self, l, m ):
+        if self.modes is None:
+            raise KeyError( "the series have no modes" )
+        try:
+            return self.modes.index( ( l, m ) )
+        except ValueError:
+            raise KeyError( f"mode l={l} m={m} not in the series" ) from None
+
+    ## interpolate(values, times, l=None, m=None)
+    ## values (..., time) at the query times, shaped (..., query). times is a number
+    ## (result without the query axis), an array (query,) asked of every series, or
+    ## an array whose leading axes broadcast against the series, e.g. one time per
+    ## detector t1[:, None]. With l, m only that mode is used (axis -2 of the
+    ## series dropped). Times outside the samples take the end values.
+
+    def interpolate( self, values, times, l=None, m=None ):
+
+        time = self.time
+        if l is not None:
+            index  = self.mode_index( l, m )
+            values = values[..., index, :]
+            time   = time[..., index, :]
+
+        times  = numpy.asarray( times, dtype=numpy.float64 )
+        scalar = ( times.ndim == 0 )
+        if scalar:
+            times = times[None]
+        shape  = numpy.broadcast_shapes( values.shape[:-1], times.shape[:-1] )
+        times  = numpy.broadcast_to( times, shape + times.shape[-1:] )
+        values = numpy.broadcast_to( values, shape + values.shape[-1:] )
+        start  = numpy.broadcast_to( time[..., :1], shape + (1,) )
+
+        position = numpy.clip( ( times - start ) / self.dt, 0.0, values.shape[-1] - 1.0 )
+        lower    = numpy.minimum( numpy.floor( position ).astype( numpy.int64 ), values.shape[-1] - 2 )
+        fraction = position - lower
+        result   = ( 1.0 - fraction ) * numpy.take_along_axis( values, lower, axis=-1 ) \
+                   +        fraction  * numpy.take_along_axis( values, lower + 1, axis=-1 )
+
+        return result[..., 0] if scalar else result
+
+    def phase_at( self, times, l=None, m=None ):
+        return self.interpolate( self.phase, times, l, m )
+
+    def angular_frequency_at( self, times, l=None, m=None ):
+        return self.interpolate( self.angular_frequency, times, l, m )
+
+    def frequency_at( self, times, l=None, m=None ):
+        return self.interpolate( self.frequency, times, l, m )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## frequency_store(run, detector_number, l_max=None, component="complex")
+## InstantaneousFrequency of psi4 of all detectors and modes of a run (a data
+## directory or monitor_data.RunData), computed once and kept in run.cache.
+
+def frequency_store( run, detector_number, l_max=None, component="complex" ):
+
+    run = monitor_data.open_run( run )
+    key = ( "frequency_store", detector_number, l_max, component )
+    if key not in run.cache:
+        psi4 = waveform_store.psi4_store( run, detector_number, l_max )
+        run.cache[key] = InstantaneousFrequency( psi4.time[:, None, :], psi4.data, component, psi4.modes )
+    return run.cache[key]
+
+#########################################################################################
+
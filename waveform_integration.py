@@ -0,0 +1,119 @@
+
+#################################################
+##
+## Fixed-frequency integration (FFI) of psi4 into the strain h, batched over
+## detectors and modes
+##
+## psi4 is the second time derivative of the strain and is integrated twice
+## in the frequency domain:
+##
+##   h(omega) = - psi4(omega) / omega_f^2,   omega_f = sign(omega) max( |omega|, omega_cut )
+##
+## with the same preprocessing as compute_frequency_spectrum in
+## plot_GW_strain_amplitude_xiaoqu.py (mean removed, Tukey window, zero
+## padding, window gain correction). psi4 is taken as complex data, so the
+## real and the imaginary part (h+ and hx) share one transform, and all
+## (detector, mode) series go through one multi-threaded scipy.fft call per
+## batch along the time axis. The window and the 1/omega_f^2 factors are
+## computed once per engine.
+##
+## The news N = int psi4 dt (the radiated fluxes) uses the same transform
+## with the single-integral factor 1/(i omega_f).
+##
+#################################################
+
+import os
+import numpy
+import scipy.fft
+import scipy.signal
+
+
+#########################################################################################
+
+## Zero padding factor and Tukey window parameter (as in the strain plot)
+
+FFI_ZERO_PAD_FACTOR = 4
+FFI_WINDOW_ALPHA    = 0.1
+
+## Upper bound of the spectrum held in memory at once [bytes]; larger inputs are
+## transformed in batches of rows
+
+FFI_BATCH_BYTES = 256 * 1024 * 1024
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## FixedFrequencyIntegration(nsample, dt, omega_cut, zero_pad_factor=FFI_ZERO_PAD_FACTOR,
+##                           window_alpha=FFI_WINDOW_ALPHA, workers=None, window_gain=True)
+## FFI engine for series of nsample samples with spacing dt.
+##
+##  - omega_cut: cutoff angular frequency, a number or an array broadcasting
+##               against the leading axes of the data, e.g. shape (detector, 1)
+##  - workers:   FFT threads (None: all cores)
+##  - window_gain: divide by the mean of the window, as the strain plot does; this
+##               scales the whole series, so analyses needing absolute amplitudes
+##               (the radiated fluxes) switch it off
+##
+## strain(psi4) maps psi4[..., time] (complex) to its double time integral
+## h[..., time]; the strain plot shows Re h as h+ and Im h as hx. news(psi4)
+## is the single time integral, integrate(psi4, order) any number of them.
+
+class FixedFrequencyIntegration:
+
+    def __init__( self, nsample, dt, omega_cut, zero_pad_factor=FFI_ZERO_PAD_FACTOR,
+                  window_alpha=FFI_WINDOW_ALPHA, workers=None, window_gain=True ):
+
+        self.nsample = int( nsample )
+        self.npad    = int( zero_pad_factor ) * self.nsample
+        self.dt      = float( dt )
+        self.workers = workers or os.cpu_count() or 1
+
+        self.window  = scipy.signal.windows.tukey( self.nsample, alpha=window_alpha ) if window_alpha is not None \
+                       else numpy.ones( self.nsample )
+        self.omega   = 2.0 * numpy.pi * scipy.fft.fftfreq( self.npad, self.dt )
+
+        omega_cut    = numpy.asarray( omega_cut, dtype=numpy.float64 )[..., None]
+        self.omega_f = numpy.where( numpy.abs(self.omega) < omega_cut,
+                                    numpy.where( self.omega >= 0, omega_cut, -omega_cut ), self.omega )
+        self.gain    = numpy.mean( self.window ) if window_gain else 1.0
+        self.factors = {}
+
+    def factor( self, order ):
+        ## (1/(i omega_f))^order, with the window gain correction folded in (-1/omega_f^2 for the strain)
+        if order not in self.factors:
+            self.factors[order] = ( -1j / self.omega_f )**order / self.gain
+            if order % 2 == 0:
+                self.factors[order] = self.factors[order].real
+        return self.factors[order]
+
+    def strain( self, psi4 ):
+        return self.integrate( psi4, 2 )
+
+    def news( self, psi4 ):
+        return self.integrate( psi4, 1 )
+
+    def integrate( self, psi4, order ):
+
+        psi4 = numpy.asarray( psi4 )
+        if psi4.shape[-1] != self.nsample:
+            raise ValueError( f"expected {self.nsample} samples along the last axis, got {psi4.shape[-1]}" )
+
+        shape  = numpy.broadcast_shapes( psi4.shape[:-1], self.omega_f.shape[:-1] )
+        psi4   = numpy.broadcast_to( psi4, shape + (self.nsample,) ).reshape( -1, self.nsample )
+        factor = numpy.broadcast_to( self.factor( order ), shape + (self.npad,) ).reshape( -1, self.npad )
+        h      = numpy.empty( psi4.shape, dtype=numpy.complex128 )
+
+        rows = max( 1, FFI_BATCH_BYTES // ( 16 * self.npad ) )
+        for start in range( 0, len(psi4), rows ):
+            block    = psi4[start:start+rows]
+            block    = ( block - block.mean( axis=-1, keepdims=True ) ) * self.window
+            spectrum = scipy.fft.fft( block, n=self.npad, axis=-1, workers=self.workers )
+            spectrum *= factor[start:start+rows]
+            h[start:start+rows] = scipy.fft.ifft( spectrum, axis=-1, workers=self.workers, overwrite_x=True )[:, :self.nsample]
+
+        return h.reshape( shape + (self.nsample,) )
+
+#########################################################################################
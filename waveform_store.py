@@ -0,0 +1,213 @@
+
+#################################################
+##
+## Multi-mode waveform store: psi4 (or the strain) of all detectors and all
+## (l, m) modes as one contiguous complex array (detector, mode, time)
+##
+## bssn_psi4.dat holds one row per detector and output time, with a
+## (real, imaginary) column pair per mode, l = 2 ... GW_L_max and
+## m = -l ... l (bssn_class.C: column names R02m-02 I02m-02 R02m-01 ...).
+## The layout is taken from the column names of the header when the file
+## has them, otherwise from the number of columns.
+##
+## Typical use:
+##   store = waveform_store.psi4_store( run, input_data.Detector_Number, input_data.GW_L_max )
+##   psi4_22 = store.series( detector, 2, 2 )       ## complex time series
+##   psi4_l2 = store.select( [ (2, m) for m in range(-2, 3) ] )
+##   strain  = store.strain( omega_cut )             ## all detectors and modes in one FFI pass
+##
+#################################################
+
+import re
+import numpy
+
+import monitor_data
+import waveform_integration
+
+
+#########################################################################################
+
+## Column names of a psi4 mode in the header: R<l>m<m>, I<l>m<m>
+
+PSI4_COLUMN_PATTERN = re.compile( r"^([RI])(\d+)m([-+]?\d+)$" )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## mode_list(l_max, l_min=2)
+## The (l, m) modes of the monitor file in column order.
+
+def mode_list( l_max, l_min=2 ):
+    return [ ( l, m ) for l in range( l_min, l_max + 1 ) for m in range( -l, l + 1 ) ]
+
+## l_max_from_columns(ncolumn)
+## Largest l of a psi4 file with ncolumn columns (time plus a pair per mode);
+## ValueError if no l_max gives that many columns.
+
+def l_max_from_columns( ncolumn ):
+
+    nmode = ( ncolumn - 1 ) // 2
+    l_max = int( round( ( nmode + 4 )**0.5 ) ) - 1           ## sum_{l=2}^{L} (2l+1) = (L+1)^2 - 4
+    if ncolumn < 11 or ( ncolumn - 1 ) % 2 or len( mode_list( l_max ) ) != nmode:
+        raise ValueError( f"{ncolumn} columns do not match the psi4 modes of any l_max" )
+    return l_max
+
+## psi4_layout(columns, l_max=None)
+## Column layout of a psi4 file: list of (l, m, real column, imaginary column).
+## columns are the column names of the file (column 0 is the time); without
+## mode names the modes l = 2 ... are assigned in order. With l_max only the
+## modes l <= l_max are kept.
+
+def psi4_layout( columns, l_max=None ):
+
+    pairs = {}
+    for index, name in enumerate( columns ):
+        match = PSI4_COLUMN_PATTERN.match( name )
+        if match:
+            part, l, m = match.group(1), int( match.group(2) ), int( match.group(3) )
+            pairs.setdefault( ( l, m ), {} )[part] = index
+
+    if pairs:
+        incomplete = [ mode for mode, parts in pairs.items() if len(parts) != 2 ]
+        if incomplete:
+            raise ValueError( f"psi4 modes without real and imaginary column: {incomplete}" )
+        layout = [ ( l, m, parts["R"], parts["I"] ) for ( l, m ), parts in pairs.items() ]
+    else:
+        modes  = mode_list( l_max_from_columns( len(columns) ) )
+        layout = [ ( l, m, 1 + 2*k, 2 + 2*k ) for k, ( l, m ) in enumerate( modes ) ]
+
+    if l_max is not None:
+        layout = [ entry for entry in layout if entry[0] <= l_max ]
+    return sorted( layout, key=lambda entry: ( entry[0], entry[1] ) )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## WaveformStore(time, data, modes)
+## Complex waveforms of all detectors and modes.
+##
+##  - time:  sample times, shaped (detector, time)
+##  - data:  complex array (detector, mode, time), C-contiguous
+##  - modes: list of (l, m) along the mode axis
+##
+## series(detector, l, m) (or store[detector, l, m]) is one complex time series
+## (a view), mode(l, m) the (detector, time) view of one mode, select(modes) a
+## new store with the given modes.
+
+class WaveformStore:
+
+    def __init__( self, time, data, modes ):
+
+        self.time  = time
+        self.data  = numpy.ascontiguousarray( data, dtype=numpy.complex128 )
+        self.modes = [ ( int(l), int(m) ) for l, m in modes ]
+        self.index = { mode: k for k, mode in enumerate( self.modes ) }
+        if self.data.shape[1] != len( self.modes ):
+            raise ValueError( f"{self.data.shape[1]} waveforms for {len(self.modes)} modes" )
+
+    @property
+    def detector_number( self ):
+        return self.data.shape[0]
+
+    @property
+    def l_max( self ):
+        return max( l for l, m in self.modes )
+
+    @property
+    def l( self ):
+        return numpy.array( [ l for l, m in self.modes ] )
+
+    @property
+    def m( self ):
+        return numpy.array( [ m for l, m in self.modes ] )
+
+    def mode_index( self, l, m ):
+        try:
+            return self.index[ ( l, m ) ]
+        except KeyError:
+            raise KeyError( f"mode l={l} m={m} not in the store (l_max = {self.l_max})" ) from None
+
+    def mode( self, l, m ):
+        return self.data[:, self.mode_index( l, m )]
+
+    def series( self, detector, l, m ):
+        return self.data[detector, self.mode_index( l, m )]
+
+    def __getitem__( self, key ):
+        detector, l, m = key
+        return self.series( detector, l, m )
+
+    def select( self, modes ):
+        indices = [ self.mode_index( l, m ) for l, m in modes ]
+        return WaveformStore( self.time, self.data[:, indices], modes )
+
+    def strain( self, omega_cut, workers=None ):
+        ## double time integral of every waveform by fixed-frequency integration (one batched pass)
+        engine = waveform_integration.FixedFrequencyIntegration( self.data.shape[-1], self.time[0, 1] - self.time[0, 0],
+                                                                 omega_cut, workers=workers )
+        return WaveformStore( self.time, engine.strain( self.data ), self.modes )
+
+#########################################################################################
+
+
+
+#########################################################################################
+
+## load_psi4_store(run, detector_number, l_max=None)
+## WaveformStore of bssn_psi4.dat of a run (a data directory or monitor_data.RunData).
+
+def load_psi4_store( run, detector_number, l_max=None ):
+
+    run    = monitor_data.open_run( run )
+    series = run.series( "bssn_psi4.dat", detector_number )
+    layout = psi4_layout( series.columns, l_max )
+    blocks = run.blocks( "bssn_psi4.dat", detector_number )
+
+    real   = [ entry[2] for entry in layout ]
+    imag   = [ entry[3] for entry in layout ]
+    data   = numpy.empty( ( blocks.shape[0], len(layout), blocks.shape[1] ), dtype=numpy.complex128 )
+    data.real = blocks[:, :, real].transpose( 0, 2, 1 )
+    data.imag = blocks[:, :, imag].transpose( 0, 2, 1 )
+
+    return WaveformStore( blocks[:, :, 0], data, [ ( l, m ) for l, m, _, _ in layout ] )
+
+## psi4_store(run, detector_number, l_max=None)
+## load_psi4_store, kept in run.cache so all analyses of a run share one store.
+
+def psi4_store( run, detector_number, l_max=None ):
+
+    run = monitor_data.open_run( run )
+    key = ( "psi4_store", detector_number, l_max )
+    if key not in run.cache:
+        run.cache[key] = load_psi4_store( run, detector_number, l_max )
+    return run.cache[key]
+
+## strain_store(run, detector_number, omega_cut, l_max=None, workers=None)
+## Strain of all detectors and modes of a run (psi4_store integrated by FFI),
+## computed once per omega_cut and kept in run.cache, so the per-detector
+## plots share one batched transform.
+
+def strain_store( run, detector_number, omega_cut, l_max=None, workers=None ):
+
+    run = monitor_data.open_run( run )
+    key = ( "strain_store", detector_number, l_max, float( omega_cut ) )
+    if key not in run.cache:
+        run.cache[key] = psi4_store( run, detector_number, l_max ).strain( omega_cut, workers )
+    return run.cache[key]
+
+## detector_radii(detector_number, r_min, r_max)
+## Extraction radii of the detectors, detector 0 outermost (as in the plots).
+
+def detector_radii( detector_number, r_min, r_max ):
+
+    if detector_number == 1:
+        return numpy.array( [ float( r_max ) ] )
+    return r_max - ( r_max - r_min ) / ( detector_number - 1 ) * numpy.arange( detector_number )
+
+#########################################################################################